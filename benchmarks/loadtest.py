@@ -0,0 +1,291 @@
+"""Fleet-scale load test of the coordinator stack against a local stand-in API.
+
+Spins up N coordinators with distinct EANs in a throwaway Home Assistant
+instance and drives each through initial fetch, a full update cycle and a
+backfill, all against a local aiohttp server that imitates the EGD API with
+injected latency. The recorder is not loaded; a stand-in behind the shared
+statistics writer counts the statistics rows and recorder jobs, so the
+numbers cover the integration's own work.
+
+Usage, from the repository root:
+
+    python -m benchmarks.loadtest --entries 10 100 1000 --latency 0.05
+
+Peak RSS is the process high-water mark, so for exact per-size figures run
+one ``--entries`` value per invocation.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+
+from custom_components.egd_smart_meter.api import EGDClient
+from custom_components.egd_smart_meter.breaker import _BREAKERS
+from custom_components.egd_smart_meter.const import (
+    CONF_RECHECK_DAYS,
+    DEFAULT_RECHECK_DAYS,
+    OAUTH_TOKEN_ENDPOINT,
+)
+from custom_components.egd_smart_meter.coordinator import EGDCoordinator
+from custom_components.egd_smart_meter.statistics_writer import RecorderApi, get_statistics_writer
+
+SLOT = timedelta(minutes=15)
+
+
+@dataclass
+class RunResult:
+    entries: int
+    wall_time: float
+    requests: dict[str, int]
+    peak_rss_mb: float
+    loop_lag_max_ms: float
+    loop_lag_p99_ms: float
+    statistics_rows: int
+    statistics_rows_per_second: float
+    recorder_jobs: int
+
+
+class FakeEGDApi:
+    """Local stand-in for the token and data endpoints of the EGD API.
+
+    The server runs its own event loop in a separate thread, so generating
+    responses does not show up as lag on the loop under test.
+    """
+
+    def __init__(self, latency: float, jitter: float = 0.0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.requests: Counter[str] = Counter()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner: web.AppRunner | None = None
+
+    def start(self) -> str:
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _start(self) -> str:
+        app = web.Application()
+        app.router.add_post(OAUTH_TOKEN_ENDPOINT, self._token)
+        app.router.add_get("/rest/spotreby", self._data)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def _delay(self) -> None:
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self.requests["token"] += 1
+        await self._delay()
+        return web.json_response({"access_token": "load-test", "expires": 3600})
+
+    async def _data(self, request: web.Request) -> web.Response:
+        self.requests["data"] += 1
+        await self._delay()
+
+        query = request.query
+        start = datetime.strptime(query["from"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        end = datetime.strptime(query["to"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        total = int((end - start) / SLOT) + 1
+        page_start = int(query.get("PageStart", 0))
+        page_size = int(query.get("PageSize", total))
+        scale = 0.3 if query.get("profile") == "ISC1" else 1.0
+        rng = random.Random(f"{query['ean']}{query.get('profile')}{page_start}")
+
+        data = [
+            {
+                "timestamp": (start + index * SLOT).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "value": round(rng.uniform(0, 4) * scale, 3),
+                "status": "IU012",
+            }
+            for index in range(page_start, min(page_start + page_size, total))
+        ]
+        return web.json_response([{"total": total, "units": "KW", "data": data}])
+
+
+class LoopLagMonitor:
+    """Sample event-loop lag as the overshoot of a periodic sleep."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - scheduled, 0.0))
+
+
+class StatisticsSink:
+    """Stand-in for the recorder that counts statistics rows and jobs.
+
+    It replaces the recorder functions of the shared statistics writer, so
+    reads of last sums and waits for the recorder queue run the same code
+    paths as with a real recorder; reads find no rows.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.jobs = 0
+
+    def attach(self, hass: HomeAssistant) -> None:
+        get_statistics_writer(hass)._recorder = RecorderApi(
+            lambda hass: self,
+            lambda *args: {},
+            self._add_external_statistics,
+            lambda *args: {},
+        )
+
+    def _add_external_statistics(self, hass, metadata, statistics) -> None:
+        self.rows += len(statistics)
+        self.jobs += 1
+
+    def async_adjust_statistics(self, statistic_id, start, adjustment, unit) -> None:
+        self.jobs += 1
+
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+    async def async_block_till_done(self) -> None:
+        return None
+
+
+async def _drive(
+    coordinator: EGDCoordinator,
+    backfill_days: int,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    async with semaphore:
+        await coordinator.fetch_initial_data(None)
+        # Force a full update cycle including production and the correction re-check
+        coordinator._last_date = None
+        await coordinator._async_update_data()
+        if backfill_days:
+            end = date.today() - timedelta(days=2)
+            await coordinator.backfill.async_start(
+                end - timedelta(days=backfill_days - 1), end, throttle=0
+            )
+            await coordinator.backfill._task
+
+
+async def run(
+    entries: int,
+    latency: float,
+    backfill_days: int,
+    concurrency: int,
+    recheck_days: int = DEFAULT_RECHECK_DAYS,
+) -> RunResult:
+    _BREAKERS.clear()
+    api = FakeEGDApi(latency, jitter=latency / 2)
+    base_url = api.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        sink = StatisticsSink()
+        sink.attach(hass)
+        coordinators = []
+        for index in range(entries):
+            client_id = f"client-{index}"
+            client = EGDClient(client_id, "secret", base_url, f"{base_url}/rest")
+            coordinator = EGDCoordinator(
+                hass,
+                client_id,
+                "secret",
+                f"8591824{index:011d}",
+                {CONF_RECHECK_DAYS: recheck_days},
+                client,
+            )
+            coordinators.append(coordinator)
+
+        monitor = LoopLagMonitor()
+        monitor.start()
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(_drive(c, backfill_days, semaphore) for c in coordinators))
+            get_statistics_writer(hass).async_flush()
+            wall_time = time.perf_counter() - started
+        finally:
+            await monitor.stop()
+            for coordinator in coordinators:
+                await coordinator.close()
+            api.stop()
+            await hass.async_stop(force=True)
+
+    lags = sorted(monitor.samples) or [0.0]
+    p99 = statistics.quantiles(lags, n=100, method="inclusive")[98] if len(lags) >= 2 else lags[0]
+    return RunResult(
+        entries=entries,
+        wall_time=round(wall_time, 3),
+        requests=dict(api.requests),
+        # ru_maxrss is in kilobytes on Linux
+        peak_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        loop_lag_max_ms=round(lags[-1] * 1000, 1),
+        loop_lag_p99_ms=round(p99 * 1000, 1),
+        statistics_rows=sink.rows,
+        statistics_rows_per_second=round(sink.rows / wall_time, 1) if wall_time else 0.0,
+        recorder_jobs=sink.jobs,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency", type=float, default=0.05, help="API latency in seconds")
+    parser.add_argument("--backfill-days", type=int, default=31)
+    parser.add_argument("--recheck-days", type=int, default=DEFAULT_RECHECK_DAYS)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+
+    for entries in args.entries:
+        result = asyncio.run(
+            run(entries, args.latency, args.backfill_days, args.concurrency, args.recheck_days)
+        )
+        if args.json:
+            print(json.dumps(asdict(result)))
+            continue
+        print(
+            f"{result.entries:>5} entries  {result.wall_time:>8.2f} s  "
+            f"requests {result.requests}  rss {result.peak_rss_mb} MB  "
+            f"lag max/p99 {result.loop_lag_max_ms}/{result.loop_lag_p99_ms} ms  "
+            f"{result.statistics_rows} rows ({result.statistics_rows_per_second}/s) "
+            f"in {result.recorder_jobs} recorder jobs"
+        )
+
+
+if __name__ == "__main__":
+    main()
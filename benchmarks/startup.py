@@ -0,0 +1,180 @@
+"""Import-time and setup-latency budget of the integration.
+
+Measures two things a Home Assistant start pays for this integration:
+
+* the import time of the integration package on top of the Home Assistant
+  modules that are always loaded before it, each run in a fresh interpreter;
+* the latency of ``async_setup_entry`` for new config entries against the
+  local stand-in API of the load test. The recorder is replaced by a no-op
+  stand-in; in a real instance it is loaded long before any integration.
+
+Exits non-zero when a median exceeds its threshold. Usage, from the
+repository root:
+
+    python -m benchmarks.startup --max-import-ms 25 --max-setup-ms 250
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+from homeassistant.core import HomeAssistant
+
+from benchmarks.loadtest import FakeEGDApi, StatisticsSink
+from custom_components.egd_smart_meter.breaker import _BREAKERS
+from custom_components.egd_smart_meter.const import (
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_EAN,
+    DATA_PENDING_CLIENTS,
+)
+
+PACKAGE = "custom_components.egd_smart_meter"
+
+# Loaded by Home Assistant itself before any custom integration is imported
+PRELOADED = (
+    "aiohttp",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+
+_IMPORT_SCRIPT = """
+import importlib, sys, time
+for name in sys.argv[2:]:
+    importlib.import_module(name)
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - started)
+"""
+
+
+@dataclass
+class StartupResult:
+    import_ms: float
+    coordinator_import_ms: float
+    setup_ms: float
+    setup_max_ms: float
+
+
+class StubEntry:
+    """The parts of a ConfigEntry that ``async_setup_entry`` touches."""
+
+    def __init__(self, index: int, base_url: str) -> None:
+        self.entry_id = f"entry-{index}"
+        self.data = {
+            CONF_CLIENT_ID: f"client-{index}",
+            CONF_CLIENT_SECRET: "secret",
+            CONF_EAN: f"8591824{index:011d}",
+        }
+        self.options: dict = {}
+        self.base_url = base_url
+
+    def async_on_unload(self, func) -> None:
+        return None
+
+    def add_update_listener(self, listener):
+        return lambda: None
+
+
+class StubConfigEntries:
+    async def async_forward_entry_setups(self, entry, platforms) -> None:
+        return None
+
+    async def async_unload_platforms(self, entry, platforms) -> bool:
+        return True
+
+
+def measure_import(module: str, repeat: int) -> float:
+    """Median import time of ``module`` in seconds, each in a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SCRIPT, module, *PRELOADED],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(float(output))
+    return statistics.median(samples)
+
+
+async def measure_setup(entries: int, latency: float) -> list[float]:
+    """Latency of ``async_setup_entry`` in seconds for each of ``entries`` entries."""
+    from custom_components.egd_smart_meter import async_setup_entry, async_unload_entry
+    from custom_components.egd_smart_meter.api import EGDClient
+
+    _BREAKERS.clear()
+    api = FakeEGDApi(latency)
+    base_url = api.start()
+    samples = []
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config_entries = StubConfigEntries()
+        StatisticsSink().attach(hass)
+
+        try:
+            for index in range(entries):
+                entry = StubEntry(index, base_url)
+                client = EGDClient(
+                    entry.data[CONF_CLIENT_ID], "secret", base_url, f"{base_url}/rest"
+                )
+                hass.data.setdefault(DATA_PENDING_CLIENTS, {})[entry.data[CONF_CLIENT_ID]] = client
+
+                started = time.perf_counter()
+                await async_setup_entry(hass, entry)
+                samples.append(time.perf_counter() - started)
+                await async_unload_entry(hass, entry)
+        finally:
+            api.stop()
+            await hass.async_stop(force=True)
+    return samples
+
+
+def run(entries: int, latency: float, repeat: int) -> StartupResult:
+    import_time = measure_import(PACKAGE, repeat)
+    coordinator_import_time = measure_import(f"{PACKAGE}.coordinator", repeat)
+    setup = asyncio.run(measure_setup(entries, latency))
+    return StartupResult(
+        import_ms=round(import_time * 1000, 1),
+        coordinator_import_ms=round(coordinator_import_time * 1000, 1),
+        setup_ms=round(statistics.median(setup) * 1000, 1),
+        setup_max_ms=round(max(setup) * 1000, 1),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="API latency in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per import")
+    parser.add_argument("--max-import-ms", type=float, default=25.0)
+    parser.add_argument("--max-setup-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    result = run(args.entries, args.latency, args.repeat)
+    print(
+        f"import {result.import_ms} ms (coordinator {result.coordinator_import_ms} ms)  "
+        f"setup median/max {result.setup_ms}/{result.setup_max_ms} ms"
+    )
+    failures = []
+    if result.import_ms > args.max_import_ms:
+        failures.append(f"import {result.import_ms} ms > {args.max_import_ms} ms")
+    if result.setup_ms > args.max_setup_ms:
+        failures.append(f"setup {result.setup_ms} ms > {args.max_setup_ms} ms")
+    if failures:
+        print("Budget exceeded: " + "; ".join(failures), file=sys.stderr)
+        print(asdict(result), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,30 @@
 """EGD Smart Meter API client with OAuth2 authentication."""
 
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, tzinfo
 from typing import Any
 
 import aiohttp
 
+from .breaker import CircuitBreaker, CircuitState, get_breaker
+from .cache import TTLCache
 from .const import (
     BASE_URL_DATA,
     BASE_URL_TOKEN,
     LOGGER,
     OAUTH_TOKEN_ENDPOINT,
+    PAGE_SIZE,
     PROFILE_CONSUMPTION,
+    RESPONSE_CACHE_MAX_DAYS,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
 )
+from .logbudget import LogLimiter, ParseStats
+from .offload import run_inline
+from .windows import day_span, local_today, plan_windows
 
 
 @dataclass
@@ -23,22 +35,126 @@ class MeasurementData:
 
 
 class EGDApiError(Exception):
-    pass
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        # HTTP status of the response, None when no response was received
+        self.status = status
 
 
 class EGDAuthError(EGDApiError):
     pass
 
 
+class EGDCircuitOpenError(EGDApiError):
+    pass
+
+
+@dataclass
+class BatchChunk:
+    start_date: date
+    end_date: date
+    records: list[MeasurementData]
+    error: EGDApiError | None = None
+
+
+def parse_measurements(data: list[Any]) -> tuple[list[MeasurementData], int, ParseStats]:
+    """Parse a decoded data response.
+
+    Returns the measurements, the total record count reported for pagination
+    and counters of what was parsed or skipped. Nothing is logged per record.
+    Pure, so it can run in an executor or another process.
+    """
+    results: list[MeasurementData] = []
+    total_records = 0
+    stats = ParseStats()
+
+    for item in data:
+        if not isinstance(item, dict):
+            stats.skipped += 1
+            continue
+
+        # Get total count if available (for pagination)
+        total_records = item.get("total", 0) or total_records
+
+        # Extract actual data points from nested "data" field
+        for record in item.get("data", []):
+            if not isinstance(record, dict):
+                stats.skipped += 1
+                continue
+            ts_str = record.get("timestamp")
+            if not ts_str:
+                stats.skipped += 1
+                continue
+
+            try:
+                timestamp = datetime.strptime(ts_str, "%Y-%m-%dT%H:%M:%S.%fZ")
+            except (TypeError, ValueError):
+                stats.malformed += 1
+                stats.add_sample(ts_str)
+                continue
+
+            # Convert kW (15-min power) to kWh (energy)
+            # 15 minutes = 0.25 hours, so kW * 0.25 = kWh, or kW / 4
+            raw_value = record.get("value")
+            kwh_value = raw_value / 4.0 if raw_value is not None else None
+            status = record.get("status", "IU012")
+            stats.by_status[status] += 1
+
+            results.append(
+                MeasurementData(
+                    timestamp=timestamp,
+                    value=kwh_value,
+                    status=status,
+                )
+            )
+
+    stats.records = len(results)
+    return results, total_records, stats
+
+
+def parse_body(body: bytes) -> tuple[list[MeasurementData], int, ParseStats]:
+    """Decode and parse a data response body, see ``parse_measurements``.
+
+    Both steps run in one call, so an offloaded page costs a single job and
+    only the raw bytes travel to the worker.
+    """
+    data = json.loads(body)
+    if not isinstance(data, list):
+        raise ValueError(f"unexpected data format {type(data).__name__}: {str(data)[:200]}")
+    return parse_measurements(data)
+
+
+_MALFORMED_LOG = LogLimiter()
+
+
 class EGDClient:
     """EGD API client with OAuth2 authentication."""
 
-    def __init__(self, client_id: str, client_secret: str) -> None:
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        base_url_token: str = BASE_URL_TOKEN,
+        base_url_data: str = BASE_URL_DATA,
+    ) -> None:
         self._client_id = client_id
         self._client_secret = client_secret
+        self._base_url_token = base_url_token
+        self._base_url_data = base_url_data
         self._access_token: str | None = None
         self._token_expires: datetime | None = None
         self._session: aiohttp.ClientSession | None = None
+        # Called whenever a new access token was fetched, e.g. to persist it
+        self.token_callback: Callable[[], None] | None = None
+        # Runs CPU-heavy stages given their record count, see offload.Offloader
+        self.offload: Callable[..., Awaitable[Any]] = run_inline
+        # Days of requested windows are local to this zone, UTC days when unset
+        self.time_zone: tzinfo | None = None
+        # Identical window requests share one fetch; finalised ones are cached briefly
+        self._inflight: dict[tuple, asyncio.Task[list[MeasurementData]]] = {}
+        self._cache: TTLCache[list[MeasurementData]] = TTLCache(
+            RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+        )
 
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
@@ -46,9 +162,59 @@ class EGDClient:
         return self._session
 
     async def close(self) -> None:
+        for task in self._inflight.values():
+            task.cancel()
+        self._cache.clear()
         if self._session and not self._session.closed:
             await self._session.close()
 
+    @property
+    def client_id(self) -> str:
+        return self._client_id
+
+    @property
+    def client_secret(self) -> str:
+        return self._client_secret
+
+    @property
+    def access_token(self) -> str | None:
+        return self._access_token
+
+    @property
+    def token_expires(self) -> datetime | None:
+        return self._token_expires
+
+    def set_token(self, token: str, expires: datetime) -> None:
+        """Use a previously obtained access token until it expires."""
+        self._access_token = token
+        self._token_expires = expires
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Circuit breaker of the data API host."""
+        return get_breaker(self._base_url_data)
+
+    @staticmethod
+    def _check_breaker(url: str) -> CircuitBreaker:
+        breaker = get_breaker(url)
+        if not breaker.allow_request():
+            if breaker.state == CircuitState.HALF_OPEN:
+                raise EGDCircuitOpenError(
+                    f"EGD API at {breaker.host} is unavailable, a recovery probe is in progress"
+                )
+            raise EGDCircuitOpenError(
+                f"EGD API at {breaker.host} is unavailable, retrying in {breaker.retry_in:.0f} s"
+            )
+        return breaker
+
+    @staticmethod
+    def _record_status(breaker: CircuitBreaker, status: int) -> None:
+        # Server side errors and throttling count against the host, client errors do not
+        if status >= 500 or status == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
     async def _get_access_token(self) -> str:
         """Get or refresh OAuth2 access token."""
         now = datetime.now()
@@ -57,7 +223,7 @@ class EGDClient:
             return self._access_token
 
         session = await self._get_session()
-        url = f"{BASE_URL_TOKEN}{OAUTH_TOKEN_ENDPOINT}"
+        url = f"{self._base_url_token}{OAUTH_TOKEN_ENDPOINT}"
 
         payload = {
             "grant_type": "client_credentials",
@@ -66,22 +232,31 @@ class EGDClient:
             "scope": "namerena_data_openapi",
         }
 
-        async with session.post(url, json=payload) as response:
-            if response.status == 401:
-                raise EGDAuthError("Invalid client credentials")
-            if response.status != 200:
-                text = await response.text()
-                raise EGDApiError(f"Token error {response.status}: {text}")
+        breaker = self._check_breaker(url)
+        try:
+            async with session.post(url, json=payload) as response:
+                self._record_status(breaker, response.status)
+                if response.status == 401:
+                    raise EGDAuthError("Invalid client credentials")
+                if response.status != 200:
+                    text = await response.text()
+                    raise EGDApiError(f"Token error {response.status}: {text}")
 
-            data = await response.json()
-            self._access_token = data.get("access_token")
-            expires_in = data.get("expires", 41017000)
-            self._token_expires = now + timedelta(seconds=expires_in)
+                data = await response.json()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            breaker.record_failure()
+            raise EGDApiError(f"Token request failed: {err}") from err
 
-            if not self._access_token:
-                raise EGDApiError("No access token in response")
+        self._access_token = data.get("access_token")
+        expires_in = data.get("expires", 41017000)
+        self._token_expires = now + timedelta(seconds=expires_in)
 
-            return self._access_token
+        if not self._access_token:
+            raise EGDApiError("No access token in response")
+
+        if self.token_callback is not None:
+            self.token_callback()
+        return self._access_token
 
     async def _request(
         self,
@@ -89,8 +264,14 @@ class EGDClient:
         url: str,
         params: dict[str, Any] | None = None,
         retry_on_401: bool = True,
+        size: int = 0,
+        parse: Callable[[bytes], Any] = json.loads,
     ) -> Any:
-        """Make authenticated API request with auto-retry on token expiry."""
+        """Make authenticated API request with auto-retry on token expiry.
+
+        The body is decoded by ``parse``; ``size`` is the expected number of
+        records, large bodies are decoded through ``offload``.
+        """
         token = await self._get_access_token()
         session = await self._get_session()
 
@@ -99,20 +280,33 @@ class EGDClient:
             "Accept": "application/json",
         }
 
-        async with session.request(method, url, headers=headers, params=params) as response:
-            if response.status == 401:
-                self._access_token = None
-                self._token_expires = None
-                if retry_on_401:
-                    # Retry once with fresh token
-                    LOGGER.debug("Token expired, retrying with fresh token")
-                    return await self._request(method, url, params, retry_on_401=False)
-                raise EGDAuthError("Access token expired or invalid")
-            if response.status != 200:
-                text = await response.text()
-                raise EGDApiError(f"API error {response.status}: {text}")
-
-            return await response.json()
+        breaker = self._check_breaker(url)
+        try:
+            async with session.request(method, url, headers=headers, params=params) as response:
+                self._record_status(breaker, response.status)
+                if response.status == 401:
+                    self._access_token = None
+                    self._token_expires = None
+                    if retry_on_401:
+                        # Retry once with fresh token
+                        LOGGER.debug("Token expired, retrying with fresh token")
+                        return await self._request(
+                            method, url, params, retry_on_401=False, size=size, parse=parse
+                        )
+                    raise EGDAuthError("Access token expired or invalid")
+                if response.status != 200:
+                    text = await response.text()
+                    raise EGDApiError(f"API error {response.status}: {text}", response.status)
+
+                body = await response.read()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            breaker.record_failure()
+            raise EGDApiError(f"Request to {url} failed: {err}") from err
+
+        try:
+            return await self.offload(size, parse, body)
+        except ValueError as err:
+            raise EGDApiError(f"Invalid response from {url}: {err}") from err
 
     async def get_consumption_data(
         self,
@@ -120,94 +314,99 @@ class EGDClient:
         start_date: date,
         end_date: date,
         page_start: int = 0,
+        profile: str = PROFILE_CONSUMPTION,
+        stats: ParseStats | None = None,
     ) -> list[MeasurementData]:
         """Get quarter-hour consumption data.
 
         API returns values in kW for 15-minute intervals.
         Convert to kWh by dividing by 4 (since 15 min = 0.25 hour).
+
+        Concurrent calls for the same window share one fetch, and short windows
+        of finalised days are served from a cache for ``RESPONSE_CACHE_TTL``
+        seconds. Parse counters are added to ``stats`` of the call that
+        actually fetched.
         """
-        url = f"{BASE_URL_DATA}/spotreby"
+        if page_start:
+            return await self._fetch_consumption_data(
+                ean, start_date, end_date, page_start, profile, stats
+            )
+
+        key = (ean, profile, start_date, end_date)
+        if (cached := self._cache.get(key)) is not None:
+            LOGGER.debug(
+                "Serving %s %s from %s to %s from cache", ean, profile, start_date, end_date
+            )
+            return list(cached)
 
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch_consumption_data(ean, start_date, end_date, 0, profile, stats)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+        # A cancelled caller must not cancel the fetch other callers wait for
+        return list(await asyncio.shield(task))
+
+    def _fetch_done(self, key: tuple, task: asyncio.Task[list[MeasurementData]]) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        _, _, start_date, end_date = key
+        finalised = end_date <= local_today(self.time_zone) - timedelta(days=2)
+        if finalised and (end_date - start_date).days < RESPONSE_CACHE_MAX_DAYS:
+            self._cache.put(key, task.result())
+
+    async def _fetch_consumption_data(
+        self,
+        ean: str,
+        start_date: date,
+        end_date: date,
+        page_start: int,
+        profile: str,
+        stats: ParseStats | None,
+    ) -> list[MeasurementData]:
+        url = f"{self._base_url_data}/spotreby"
+
+        # Exactly the quarter-hours of the days, local days included
+        window_start, window_end = day_span(start_date, end_date, self.time_zone)
         params = {
             "ean": ean,
-            "profile": PROFILE_CONSUMPTION,
-            "from": f"{start_date.isoformat()}T00:00:00.000Z",
-            "to": f"{end_date.isoformat()}T23:59:59.999Z",
+            "profile": profile,
+            "from": window_start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "to": (window_end - timedelta(seconds=1)).strftime("%Y-%m-%dT%H:%M:%S.999Z"),
             "PageStart": page_start,
-            "PageSize": 3000,
+            "PageSize": PAGE_SIZE,
         }
 
-        data = await self._request("GET", url, params=params)
-        results = []
-
-        # API returns a list with one object containing the data
-        if not isinstance(data, list):
+        # Full pages are decoded and parsed off the event loop once they reach the threshold
+        expected = min(PAGE_SIZE, (window_end - window_start) // timedelta(minutes=15))
+        results, total_records_in_response, page_stats = await self._request(
+            "GET", url, params=params, size=expected, parse=parse_body
+        )
+        if stats is not None:
+            stats.merge(page_stats)
+        LOGGER.debug(
+            "Page at %d of %s (total %s): %s",
+            page_start,
+            ean,
+            total_records_in_response,
+            page_stats,
+        )
+        if page_stats.malformed and (suppressed := _MALFORMED_LOG.allow(ean)) is not None:
             LOGGER.warning(
-                "Unexpected data format from API: %s, content: %s", type(data), str(data)[:200]
-            )
-            return results
-
-        if not data:
-            LOGGER.debug("API returned empty list for %s from %s to %s", ean, start_date, end_date)
-            return results
-
-        total_records_in_response = 0
-        for item in data:
-            if not isinstance(item, dict):
-                LOGGER.debug("Skipping non-dict item in API response: %s", type(item))
-                continue
-
-            # Get total count if available (for pagination)
-            total_records = item.get("total", 0)
-            if total_records:
-                total_records_in_response = total_records
-
-            units = item.get("units", "UNKNOWN")
-
-            # Extract actual data points from nested "data" field
-            data_points = item.get("data", [])
-            LOGGER.debug(
-                "API response for %s: total=%s, units=%s, data_points=%d",
+                "Skipped %d records with malformed timestamps for %s, e.g. %s "
+                "(%d similar warnings suppressed)",
+                page_stats.malformed,
                 ean,
-                total_records,
-                units,
-                len(data_points),
+                page_stats.samples,
+                suppressed,
             )
 
-            valid_records = 0
-            for record in data_points:
-                if not isinstance(record, dict):
-                    continue
-                ts_str = record.get("timestamp")
-                if not ts_str:
-                    continue
-
-                try:
-                    timestamp = datetime.strptime(ts_str, "%Y-%m-%dT%H:%M:%S.%fZ")
-                except ValueError:
-                    LOGGER.warning("Invalid timestamp format: %s, skipping", ts_str)
-                    continue
-
-                # Convert kW (15-min power) to kWh (energy)
-                # 15 minutes = 0.25 hours, so kW * 0.25 = kWh, or kW / 4
-                raw_value = record.get("value")
-                kwh_value = raw_value / 4.0 if raw_value is not None else None
-
-                results.append(
-                    MeasurementData(
-                        timestamp=timestamp,
-                        value=kwh_value,
-                        status=record.get("status", "IU012"),
-                    )
-                )
-                valid_records += 1
-
-            LOGGER.debug(
-                "Processed %d valid records from %d data points for %s",
-                valid_records,
-                len(data_points),
-                ean,
-            )
+        if not results:
+            LOGGER.debug("API returned no data for %s from %s to %s", ean, start_date, end_date)
+            return results
 
         # Check if there are more pages to fetch
         if total_records_in_response > 0 and page_start + len(results) < total_records_in_response:
@@ -216,11 +415,8 @@ class EGDClient:
                 page_start + len(results),
                 total_records_in_response,
             )
-            next_page_results = await self.get_consumption_data(
-                ean=ean,
-                start_date=start_date,
-                end_date=end_date,
-                page_start=page_start + len(results),
+            next_page_results = await self._fetch_consumption_data(
+                ean, start_date, end_date, page_start + len(results), profile, stats
             )
             results.extend(next_page_results)
 
@@ -231,19 +427,47 @@ class EGDClient:
         ean: str,
         start_date: date,
         end_date: date,
+        profile: str = PROFILE_CONSUMPTION,
     ) -> list[MeasurementData]:
         """Get consumption data in batches to avoid rate limits.
 
-        API limit: max 3000 records (~1 month of quarter-hour data).
-        Split large date ranges into monthly chunks.
+        API limit: max 3000 records per page. Large date ranges are split into
+        windows that each fit exactly one page.
         """
         all_results: list[MeasurementData] = []
-        current_start = start_date
         batch_count = 0
 
+        async for chunk in self.iter_consumption_data_batch(ean, start_date, end_date, profile):
+            batch_count += 1
+            if isinstance(chunk.error, EGDCircuitOpenError):
+                LOGGER.debug("Skipped batch %d: %s", batch_count, chunk.error)
+                continue
+            if chunk.error is not None:
+                LOGGER.error("Failed to fetch batch %d: %s", batch_count, chunk.error)
+                # Continue with next batch, don't fail completely
+                continue
+            all_results.extend(chunk.records)
+            LOGGER.debug("Batch %d: fetched %d records", batch_count, len(chunk.records))
+
+        return all_results
+
+    async def iter_consumption_data_batch(
+        self,
+        ean: str,
+        start_date: date,
+        end_date: date,
+        profile: str = PROFILE_CONSUMPTION,
+    ) -> AsyncIterator[BatchChunk]:
+        """Yield consumption data one planned window at a time.
+
+        Only a single chunk is held in memory, so callers can stream
+        arbitrarily long ranges. Failed chunks are yielded with ``error``
+        set instead of aborting the iteration. A single summary of the whole
+        job is logged at the end, even if the caller stops early.
+        """
         # Ensure end_date is not in the future and not today/yesterday
         # API requires data to be at least 1 day old
-        max_allowed_date = date.today() - timedelta(days=2)
+        max_allowed_date = local_today(self.time_zone) - timedelta(days=2)
         effective_end_date = min(end_date, max_allowed_date)
 
         if effective_end_date < start_date:
@@ -252,42 +476,38 @@ class EGDClient:
                 end_date.isoformat(),
                 effective_end_date.isoformat(),
             )
-            return all_results
+            return
 
-        while current_start <= effective_end_date:
-            # Calculate end of current month or effective_end_date
-            if current_start.month == 12:
-                next_month = current_start.replace(year=current_start.year + 1, month=1, day=1)
-            else:
-                next_month = current_start.replace(month=current_start.month + 1, day=1)
-
-            current_end = min(next_month - timedelta(days=1), effective_end_date)
+        job_stats = ParseStats()
+        windows = failed = 0
+        try:
+            for current_start, current_end in plan_windows(
+                start_date, effective_end_date, time_zone=self.time_zone
+            ):
+                windows += 1
+                LOGGER.debug("Fetching batch: %s to %s", current_start, current_end)
 
+                try:
+                    records = await self.get_consumption_data(
+                        ean=ean,
+                        start_date=current_start,
+                        end_date=current_end,
+                        profile=profile,
+                        stats=job_stats,
+                    )
+                except EGDApiError as err:
+                    failed += 1
+                    yield BatchChunk(current_start, current_end, [], err)
+                else:
+                    yield BatchChunk(current_start, current_end, records)
+        finally:
             LOGGER.info(
-                "Fetching batch %d: %s to %s",
-                batch_count + 1,
-                current_start.isoformat(),
-                current_end.isoformat(),
+                "Fetched %s %s from %s to %s in %d windows (%d failed): %s",
+                ean,
+                profile,
+                start_date,
+                effective_end_date,
+                windows,
+                failed,
+                job_stats,
             )
-
-            try:
-                batch_data = await self.get_consumption_data(
-                    ean=ean,
-                    start_date=current_start,
-                    end_date=current_end,
-                )
-                all_results.extend(batch_data)
-                LOGGER.info("Batch %d: fetched %d records", batch_count + 1, len(batch_data))
-            except EGDApiError as err:
-                LOGGER.error("Failed to fetch batch %d: %s", batch_count + 1, err)
-                # Continue with next batch, don't fail completely
-
-            batch_count += 1
-            current_start = next_month
-
-        LOGGER.info(
-            "Batch loading complete: %d batches, %d total records",
-            batch_count,
-            len(all_results),
-        )
-        return all_results
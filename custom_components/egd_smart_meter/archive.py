@@ -0,0 +1,362 @@
+"""Memory-mapped fixed-slot archive of quarter-hour measurements.
+
+Every quarter-hour has a fixed position: ``(day - base_day) * 96 + slot``,
+where days are UTC days and ``slot = hour * 4 + minute // 15``. Values are
+stored as native float32 (kWh, NaN when missing) in ``<name>.values`` after a
+small header, statuses as uint8 codes in ``<name>.status``. A float64
+prefix-sum index of valid (``IU012``) values is kept in ``<name>.cumsum`` so
+any range total is a single subtraction. A running count of filled slots,
+kept in memory and rebuilt on open, does the same for range coverage. All
+files are memory mapped so lookups are O(1) and range reads are zero-copy
+views.
+
+All methods do blocking file I/O and must run in the executor.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+from .api import MeasurementData
+
+SLOTS_PER_DAY = 96
+SLOT_MINUTES = 15
+GROW_DAYS = 32
+
+HEADER = struct.Struct("<4sHxxi4x")
+MAGIC = b"EGDA"
+VERSION = 1
+
+STATUS_MISSING = 0
+STATUS_UNKNOWN = 255
+
+VALUE_SIZE = 4
+STATUS_SIZE = 1
+CUMSUM_SIZE = 8
+
+
+def encode_status(status: str) -> int:
+    """Encode an API status such as ``IU012`` as a single byte."""
+    if status.startswith("IU") and status[2:].isdigit():
+        code = int(status[2:])
+        if STATUS_MISSING < code < STATUS_UNKNOWN:
+            return code
+    return STATUS_UNKNOWN
+
+
+VALID_STATUS = encode_status("IU012")
+
+
+def decode_status(code: int) -> str | None:
+    """Decode a status byte back to its API string, None for empty slots."""
+    if code == STATUS_MISSING:
+        return None
+    if code == STATUS_UNKNOWN:
+        return "UNKNOWN"
+    return f"IU{code:03d}"
+
+
+def _utc(timestamp: datetime) -> datetime:
+    """Normalise timestamps; naive ones come from the API and are UTC."""
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(UTC).replace(tzinfo=None)
+
+
+def slot_of_day(timestamp: datetime) -> int:
+    timestamp = _utc(timestamp)
+    return timestamp.hour * 4 + timestamp.minute // SLOT_MINUTES
+
+
+class SlotArchive:
+    """Dense per EAN/profile archive of quarter-hour values and statuses."""
+
+    def __init__(self, directory: Path, ean: str, profile: str) -> None:
+        self._values_path = directory / f"{ean}_{profile}.values"
+        self._status_path = directory / f"{ean}_{profile}.status"
+        self._cumsum_path = directory / f"{ean}_{profile}.cumsum"
+        self._lock = threading.RLock()
+        self._base_day: date | None = None
+        self._days = 0
+        self._values_file = None
+        self._status_file = None
+        self._cumsum_file = None
+        self._values_map: mmap.mmap | None = None
+        self._status_map: mmap.mmap | None = None
+        self._cumsum_map: mmap.mmap | None = None
+        self._values: memoryview | None = None
+        self._status: memoryview | None = None
+        self._cumsum: memoryview | None = None
+        # Number of filled slots in [0, index], rebuilt from the status file on open
+        self._present = array("I")
+
+    @property
+    def base_day(self) -> date | None:
+        return self._base_day
+
+    @property
+    def slot_count(self) -> int:
+        return self._days * SLOTS_PER_DAY
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Hold while using views from ``read_range`` to keep writes from remapping."""
+        return self._lock
+
+    @property
+    def is_open(self) -> bool:
+        return self._values_file is not None
+
+    def open(self) -> None:
+        """Open existing archive files or create empty ones."""
+        with self._lock:
+            if self.is_open:
+                return
+            self._values_path.parent.mkdir(parents=True, exist_ok=True)
+            if not self._values_path.exists():
+                self._values_path.write_bytes(HEADER.pack(MAGIC, VERSION, 0))
+                self._status_path.write_bytes(b"")
+            rebuild_index = not self._cumsum_path.exists()
+            if rebuild_index:
+                self._cumsum_path.write_bytes(b"")
+
+            self._values_file = self._values_path.open("r+b")
+            self._status_file = self._status_path.open("r+b")
+            self._cumsum_file = self._cumsum_path.open("r+b")
+            magic, version, base_ordinal = HEADER.unpack(self._values_file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                self.close()
+                raise ValueError(f"Unsupported archive file {self._values_path}")
+
+            self._base_day = date.fromordinal(base_ordinal) if base_ordinal else None
+            self._days = os.fstat(self._status_file.fileno()).st_size // SLOTS_PER_DAY
+            if rebuild_index:
+                self._cumsum_file.truncate(self._days * SLOTS_PER_DAY * CUMSUM_SIZE)
+            self._map()
+            if rebuild_index:
+                self._update_index(0)
+            else:
+                self._update_present(0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap()
+            for file in (self._values_file, self._status_file, self._cumsum_file):
+                if file is not None:
+                    file.close()
+            self._values_file = None
+            self._status_file = None
+            self._cumsum_file = None
+            self._present = array("I")
+
+    def _map(self) -> None:
+        if not self._days:
+            return
+        self._values_map = mmap.mmap(self._values_file.fileno(), 0)
+        self._status_map = mmap.mmap(self._status_file.fileno(), 0)
+        self._cumsum_map = mmap.mmap(self._cumsum_file.fileno(), 0)
+        self._values = memoryview(self._values_map)[HEADER.size :].cast("f")
+        self._status = memoryview(self._status_map)
+        self._cumsum = memoryview(self._cumsum_map).cast("d")
+
+    def _unmap(self) -> None:
+        for view in (self._values, self._status, self._cumsum):
+            if view is not None:
+                view.release()
+        for mapping in (self._values_map, self._status_map, self._cumsum_map):
+            if mapping is not None:
+                mapping.close()
+        self._values = self._status = self._cumsum = None
+        self._values_map = self._status_map = self._cumsum_map = None
+
+    def _resize(self, days: int) -> None:
+        self._unmap()
+        self._values_file.truncate(HEADER.size + days * SLOTS_PER_DAY * VALUE_SIZE)
+        self._status_file.truncate(days * SLOTS_PER_DAY * STATUS_SIZE)
+        self._cumsum_file.truncate(days * SLOTS_PER_DAY * CUMSUM_SIZE)
+        old_slots = self.slot_count
+        self._days = days
+        self._map()
+        if old_slots and days * SLOTS_PER_DAY > old_slots:
+            # New slots are empty, carry the running total forward
+            self._cumsum[old_slots:] = array("d", [self._cumsum[old_slots - 1]]) * (
+                days * SLOTS_PER_DAY - old_slots
+            )
+
+    def _rebase(self, new_base: date) -> None:
+        """Move the base day back, shifting existing slots forward."""
+        shift = (self._base_day - new_base).days * SLOTS_PER_DAY
+        old_values = bytes(self._values) if self._values is not None else b""
+        old_status = bytes(self._status) if self._status is not None else b""
+        self._resize(self._days + shift // SLOTS_PER_DAY)
+        self._values_map[HEADER.size + shift * VALUE_SIZE :] = old_values
+        self._values_map[HEADER.size : HEADER.size + shift * VALUE_SIZE] = bytes(shift * VALUE_SIZE)
+        self._status_map[shift:] = old_status
+        self._status_map[:shift] = bytes(shift)
+        self._set_base(new_base)
+        self._update_index(0)
+
+    def _set_base(self, base_day: date) -> None:
+        self._base_day = base_day
+        self._values_file.seek(0)
+        self._values_file.write(HEADER.pack(MAGIC, VERSION, base_day.toordinal()))
+        self._values_file.flush()
+
+    def index_of(self, timestamp: datetime) -> int:
+        """Return the absolute slot index of a timestamp (may be out of range)."""
+        timestamp = _utc(timestamp)
+        if self._base_day is None:
+            raise KeyError("Archive is empty")
+        return (timestamp.date() - self._base_day).days * SLOTS_PER_DAY + slot_of_day(timestamp)
+
+    def timestamp_of(self, index: int) -> datetime:
+        """Return the UTC start of the slot at ``index``."""
+        if self._base_day is None:
+            raise KeyError("Archive is empty")
+        base = datetime.combine(self._base_day, datetime.min.time())
+        return base + timedelta(minutes=index * SLOT_MINUTES)
+
+    def write(self, records: Iterable[MeasurementData]) -> int:
+        """Store records at their fixed slots, growing the files as needed."""
+        records = list(records)
+        if not records:
+            return 0
+
+        with self._lock:
+            self.open()
+            first_day = min(_utc(item.timestamp).date() for item in records)
+            last_day = max(_utc(item.timestamp).date() for item in records)
+
+            if self._base_day is None:
+                self._set_base(first_day)
+            elif first_day < self._base_day:
+                self._rebase(first_day)
+
+            needed_days = (last_day - self._base_day).days + 1
+            if needed_days > self._days:
+                self._resize(max(needed_days, self._days + GROW_DAYS))
+
+            first_index = self.slot_count
+            for item in records:
+                index = self.index_of(item.timestamp)
+                first_index = min(first_index, index)
+                self._values[index] = math.nan if item.value is None else item.value
+                self._status[index] = encode_status(item.status)
+
+            self._update_index(first_index)
+            self._values_map.flush()
+            self._status_map.flush()
+            self._cumsum_map.flush()
+            return len(records)
+
+    def _update_index(self, first_index: int) -> None:
+        """Recompute the prefix sums from ``first_index`` to the end.
+
+        Appends only touch the tail, so the cost is proportional to the
+        newly written range rather than the whole archive.
+        """
+        if self._cumsum is None:
+            return
+        values = self._values
+        status = self._status
+        running = self._cumsum[first_index - 1] if first_index > 0 else 0.0
+        for index in range(first_index, self.slot_count):
+            # A valid status without a value would turn every later sum into NaN
+            if status[index] == VALID_STATUS and not math.isnan(values[index]):
+                running += values[index]
+            self._cumsum[index] = running
+        self._update_present(first_index)
+
+    def _update_present(self, first_index: int) -> None:
+        """Recompute the running count of filled slots from ``first_index`` to the end."""
+        present = self._present
+        first_index = min(first_index, len(present))
+        del present[first_index:]
+        if self._status is None:
+            return
+        count = present[-1] if present else 0
+        for code in self._status[first_index : self.slot_count]:
+            if code != STATUS_MISSING:
+                count += 1
+            present.append(count)
+
+    def _prefix(self, index: int) -> float:
+        """Return the total of valid values in slots ``[0, index)``."""
+        index = min(max(index, 0), self.slot_count)
+        return self._cumsum[index - 1] if index > 0 else 0.0
+
+    def sum_range(self, start: datetime, end: datetime) -> float:
+        """Return the total of valid values in ``[start, end)`` in O(1)."""
+        with self._lock:
+            self.open()
+            if self._base_day is None or self._cumsum is None:
+                return 0.0
+            return self._prefix(self.index_of(end)) - self._prefix(self.index_of(start))
+
+    def coverage_range(self, start: datetime, end: datetime) -> float:
+        """Return the fraction of slots in ``[start, end)`` that hold a reading."""
+        with self._lock:
+            self.open()
+            if self._base_day is None:
+                return 0.0
+            first, last = self.index_of(start), self.index_of(end)
+            if last <= first:
+                return 0.0
+            return (self._present_before(last) - self._present_before(first)) / (last - first)
+
+    def _present_before(self, index: int) -> int:
+        index = min(max(index, 0), len(self._present))
+        return self._present[index - 1] if index > 0 else 0
+
+    def get(self, timestamp: datetime) -> tuple[float | None, str | None]:
+        """Return ``(value, status)`` of a single slot in O(1)."""
+        with self._lock:
+            self.open()
+            if self._base_day is None:
+                return None, None
+            index = self.index_of(timestamp)
+            if not 0 <= index < self.slot_count or self._status[index] == STATUS_MISSING:
+                return None, None
+            value = self._values[index]
+            return (None if math.isnan(value) else value), decode_status(self._status[index])
+
+    def read_records(self, start: datetime, end: datetime) -> list[MeasurementData]:
+        """Return the archived slots of ``[start, end)`` as records, skipping empty ones."""
+        with self._lock:
+            values, statuses = self.read_range(start, end)
+            with values, statuses:
+                if not len(statuses):
+                    return []
+                first = max(self.index_of(start), 0)
+                return [
+                    MeasurementData(
+                        self.timestamp_of(first + offset),
+                        None if math.isnan(value) else value,
+                        decode_status(code),
+                    )
+                    for offset, (value, code) in enumerate(zip(values, statuses, strict=True))
+                    if code != STATUS_MISSING
+                ]
+
+    def read_range(self, start: datetime, end: datetime) -> tuple[memoryview, memoryview]:
+        """Return zero-copy float32 value and uint8 status views of ``[start, end)``.
+
+        The range is clipped to stored slots. Views stay valid until the next
+        write or close; copy them if they need to outlive that.
+        """
+        with self._lock:
+            self.open()
+            if self._base_day is None or self._values is None:
+                empty = memoryview(b"")
+                return empty.cast("f"), empty
+            first = max(self.index_of(start), 0)
+            last = min(self.index_of(end), self.slot_count)
+            if last <= first:
+                first = last = 0
+            return self._values[first:last], self._status[first:last]
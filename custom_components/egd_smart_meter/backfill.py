@@ -0,0 +1,316 @@
+"""Resumable background backfill of historical statistics."""
+
+import asyncio
+import time
+from contextlib import aclosing, suppress
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import EGDApiError, EGDCircuitOpenError
+from .const import (
+    BACKFILL_ERROR_DELAY,
+    DEFAULT_BACKFILL_THROTTLE,
+    DOMAIN,
+    LOGGER,
+    PROFILE_CONSUMPTION,
+    STORAGE_VERSION,
+)
+from .watchdog import staged
+from .windows import day_span, local_today
+
+if TYPE_CHECKING:
+    from .coordinator import EGDCoordinator
+
+
+class BackfillState(StrEnum):
+    IDLE = "idle"
+    RUNNING = "running"
+    WAITING = "waiting"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass
+class BackfillCheckpoint:
+    start_date: date
+    end_date: date
+    next_date: date
+    throttle: float = DEFAULT_BACKFILL_THROTTLE
+    records: int = 0
+    # Final sum imported so far and the sum before the range end, per statistic
+    base_sums: dict[str, float] = field(default_factory=dict)
+    old_end_sums: dict[str, float] | None = None
+    # Whether the rows after the range were already shifted onto the new sums
+    shifted: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for key in ("start_date", "end_date", "next_date"):
+            data[key] = data[key].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BackfillCheckpoint":
+        data = dict(data)
+        for key in ("start_date", "end_date", "next_date"):
+            data[key] = date.fromisoformat(data[key])
+        return cls(**data)
+
+
+class BackfillJob:
+    """Import history window by window, checkpointing after every window.
+
+    The checkpoint is persisted in HA storage, so a restart resumes from the
+    first window that was not imported yet. A failed window is handed to the
+    coordinator's retry queue and the job moves on; only an open circuit
+    pauses the job, for ``BACKFILL_ERROR_DELAY`` seconds.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: "EGDCoordinator") -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.state = BackfillState.IDLE
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.backfill.{coordinator.ean}"
+        )
+        self._checkpoint: BackfillCheckpoint | None = None
+        self._task: asyncio.Task | None = None
+        self._session_started = 0.0
+        self._session_days = 0
+        self._session_records = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def progress(self) -> dict[str, Any]:
+        checkpoint = self._checkpoint
+        if checkpoint is None:
+            return {"state": self.state.value}
+
+        days_total = (checkpoint.end_date - checkpoint.start_date).days + 1
+        days_done = min((checkpoint.next_date - checkpoint.start_date).days, days_total)
+        elapsed = time.monotonic() - self._session_started if self._session_started else 0.0
+        records_per_second = self._session_records / elapsed if elapsed else 0.0
+        eta = None
+        if self._session_days and days_done < days_total:
+            remaining = (days_total - days_done) * elapsed / self._session_days
+            eta = (datetime.now(timezone.utc) + timedelta(seconds=remaining)).isoformat()  # noqa: UP017
+
+        return {
+            "state": self.state.value,
+            "start_date": checkpoint.start_date.isoformat(),
+            "end_date": checkpoint.end_date.isoformat(),
+            "days_done": days_done,
+            "days_total": days_total,
+            "percent": round(100 * days_done / days_total, 1),
+            "records": checkpoint.records,
+            "records_per_second": round(records_per_second, 1),
+            "eta": eta,
+        }
+
+    async def async_resume(self) -> None:
+        """Resume an unfinished job from its stored checkpoint."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._checkpoint = BackfillCheckpoint.from_dict(data)
+        LOGGER.info(
+            "Resuming backfill for %s from %s",
+            self.coordinator.ean,
+            self._checkpoint.next_date.isoformat(),
+        )
+        self._start_task()
+
+    async def async_start(
+        self,
+        start_date: date,
+        end_date: date,
+        throttle: float = DEFAULT_BACKFILL_THROTTLE,
+    ) -> None:
+        """Start a new job, replacing any unfinished one."""
+        await self.async_stop()
+        # API requires data to be at least 1 day old, same limit as batch fetch
+        end_date = min(end_date, local_today(self.coordinator.api.time_zone) - timedelta(days=2))
+        if end_date < start_date:
+            raise ValueError("Backfill range ends before it starts")
+
+        self._checkpoint = BackfillCheckpoint(
+            start_date=start_date,
+            end_date=end_date,
+            next_date=start_date,
+            throttle=throttle,
+        )
+        await self._store.async_save(self._checkpoint.as_dict())
+        self._start_task()
+
+    async def async_cancel(self) -> None:
+        """Cancel the job and forget its checkpoint."""
+        await self.async_stop()
+        await self._store.async_remove()
+        if self._checkpoint is not None:
+            self.state = BackfillState.CANCELLED
+
+    async def async_stop(self) -> None:
+        """Stop the job but keep its checkpoint for a later resume."""
+        if self._task is None:
+            return
+        if not self._task.done():
+            self._task.cancel()
+            self.state = BackfillState.IDLE
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def _start_task(self) -> None:
+        self._session_started = time.monotonic()
+        self._session_days = 0
+        self._session_records = 0
+        self._task = self.hass.async_create_background_task(
+            self._run(), f"{DOMAIN} backfill {self.coordinator.ean}"
+        )
+
+    @staged("backfill")
+    async def _run(self) -> None:
+        checkpoint = self._checkpoint
+        coordinator = self.coordinator
+        try:
+            await self._import_range()
+            if not checkpoint.shifted:
+                await self._shift_after_range()
+        except Exception:
+            self.state = BackfillState.FAILED
+            LOGGER.exception(
+                "Backfill for %s failed at %s, it resumes from there on the next start",
+                coordinator.ean,
+                checkpoint.next_date.isoformat(),
+            )
+            return
+        finally:
+            # Hand over whatever the job queued, even when it stops early
+            coordinator.statistics_writer.async_flush()
+
+        await self._store.async_remove()
+        self.state = BackfillState.DONE
+        LOGGER.info(
+            "Backfill for %s complete: %d records from %s to %s",
+            coordinator.ean,
+            checkpoint.records,
+            checkpoint.start_date.isoformat(),
+            checkpoint.end_date.isoformat(),
+        )
+
+    async def _import_range(self) -> None:
+        checkpoint = self._checkpoint
+        coordinator = self.coordinator
+        if checkpoint.old_end_sums is None:
+            _, end_boundary = day_span(
+                checkpoint.end_date, checkpoint.end_date, coordinator.api.time_zone
+            )
+            checkpoint.old_end_sums = {
+                statistic_id: await coordinator._async_last_sum(statistic_id, end_boundary)
+                for statistic_id in [
+                    *coordinator.sum_statistic_ids,
+                    *coordinator.net_statistic_ids.values(),
+                ]
+            }
+
+        while checkpoint.next_date <= checkpoint.end_date:
+            self.state = BackfillState.RUNNING
+            failed = False
+            chunks = coordinator.api.iter_consumption_data_batch(
+                coordinator.ean, checkpoint.next_date, checkpoint.end_date
+            )
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if isinstance(chunk.error, EGDCircuitOpenError):
+                        LOGGER.debug(
+                            "Backfill for %s paused at %s: %s",
+                            coordinator.ean,
+                            chunk.start_date.isoformat(),
+                            chunk.error,
+                        )
+                        failed = True
+                        break
+                    if chunk.error is not None:
+                        LOGGER.warning(
+                            "Backfill for %s queued %s to %s for retry: %s",
+                            coordinator.ean,
+                            chunk.start_date.isoformat(),
+                            chunk.end_date.isoformat(),
+                            chunk.error,
+                        )
+                        await coordinator.retry_queue.async_add(
+                            chunk.start_date, chunk.end_date, chunk.error
+                        )
+                    await self._import_chunk(chunk.records, chunk.start_date, chunk.end_date)
+                    if checkpoint.next_date <= checkpoint.end_date:
+                        await asyncio.sleep(checkpoint.throttle)
+
+            if not failed:
+                break
+            self.state = BackfillState.WAITING
+            await asyncio.sleep(BACKFILL_ERROR_DELAY)
+
+    async def _shift_after_range(self) -> None:
+        """Shift statistics after the range onto the new sums, exactly once."""
+        checkpoint = self._checkpoint
+        coordinator = self.coordinator
+        _, end_boundary = day_span(
+            checkpoint.end_date, checkpoint.end_date, coordinator.api.time_zone
+        )
+        # Statistics after the backfilled range were summed on top of the old total
+        for statistic_id, base_sum in checkpoint.base_sums.items():
+            old_end_sum = checkpoint.old_end_sums.get(statistic_id, 0.0)
+            await coordinator._async_adjust_sum(end_boundary, base_sum - old_end_sum, statistic_id)
+        await coordinator.async_settle_statistics()
+
+        # A resume after a restart must not shift the same rows again
+        checkpoint.shifted = True
+        await self._store.async_save(checkpoint.as_dict())
+
+    async def _import_chunk(self, records: list, start_date: date, end_date: date) -> None:
+        checkpoint = self._checkpoint
+        coordinator = self.coordinator
+        await coordinator._archive_data(PROFILE_CONSUMPTION, records)
+        final_sums = await coordinator._import_hourly_statistics(
+            records, start_date, checkpoint.base_sums
+        )
+        checkpoint.base_sums.update(final_sums)
+
+        # Net statistics need the production of the same window
+        try:
+            production = (
+                await coordinator._async_fetch_production(start_date, end_date) if records else []
+            )
+        except EGDApiError as err:
+            LOGGER.warning(
+                "Backfill for %s queued %s to %s for retry, production failed: %s",
+                coordinator.ean,
+                start_date.isoformat(),
+                end_date.isoformat(),
+                err,
+            )
+            await coordinator.retry_queue.async_add(start_date, end_date, err)
+            production = []
+        if production:
+            start, end = day_span(start_date, end_date, coordinator.api.time_zone)
+            checkpoint.base_sums.update(
+                await coordinator._import_net_statistics(start, end, checkpoint.base_sums)
+            )
+
+        days = (end_date - start_date).days + 1
+        checkpoint.records += len(records)
+        checkpoint.next_date = end_date + timedelta(days=1)
+        # The checkpoint must not run ahead of the rows the recorder holds
+        await coordinator.async_settle_statistics()
+        await self._store.async_save(checkpoint.as_dict())
+
+        self._session_days += days
+        self._session_records += len(records)
@@ -0,0 +1,119 @@
+"""Circuit breaker shared by all clients talking to the same API host."""
+
+import time
+from collections.abc import Callable
+from enum import StrEnum
+from urllib.parse import urlsplit
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RECOVERY_TIMEOUT,
+    BREAKER_RECOVERY_TIMEOUT,
+    LOGGER,
+)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one API host.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests fail fast. Once the recovery timeout elapses a single probe is let
+    through; success closes the circuit, failure reopens it with a doubled
+    timeout (capped at ``max_recovery_timeout``).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = BREAKER_RECOVERY_TIMEOUT,
+        max_recovery_timeout: float = BREAKER_MAX_RECOVERY_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self._failure_threshold = failure_threshold
+        self._base_recovery_timeout = recovery_timeout
+        self._max_recovery_timeout = max_recovery_timeout
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._recovery_timeout = recovery_timeout
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed, 0 when not open."""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(self._recovery_timeout - (self._clock() - self._opened_at), 0.0)
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.OPEN:
+            return False
+        # Half-open: let a single probe through, or a new one if it got lost
+        now = self._clock()
+        if self._probe_started is None or now - self._probe_started >= self._recovery_timeout:
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            LOGGER.info("EGD API at %s is reachable again, resuming requests", self.host)
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._recovery_timeout = self._base_recovery_timeout
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == CircuitState.HALF_OPEN:
+            self._recovery_timeout = min(self._recovery_timeout * 2, self._max_recovery_timeout)
+            self._open()
+        elif self._state == CircuitState.CLOSED and self._failures >= self._failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._probe_started = None
+        LOGGER.warning(
+            "EGD API at %s failed %d times in a row, pausing requests for %d s",
+            self.host,
+            self._failures,
+            self._recovery_timeout,
+        )
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Return the breaker shared by every client using the host of ``url``."""
+    host = urlsplit(url).netloc
+    if host not in _BREAKERS:
+        _BREAKERS[host] = CircuitBreaker(host)
+    return _BREAKERS[host]
@@ -0,0 +1,128 @@
+"""Per-day completeness index of quarter-hour readings.
+
+Every UTC day keeps two 96-bit masks, one bit per quarter-hour: slots that
+hold any reading and slots that hold a valid (``IU012``) one. A slot that is
+present but not valid is provisional, e.g. an estimate. Summaries and the
+list of days with holes are popcounts over the masks, so the data itself is
+never rescanned.
+"""
+
+from datetime import date, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import MeasurementData
+from .archive import SLOTS_PER_DAY, _utc, slot_of_day
+from .const import (
+    COMPLETENESS_MAX_DAYS,
+    COMPLETENESS_SAVE_DELAY,
+    COMPLETENESS_SUMMARY_DAYS,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+from .watchdog import blocking
+
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+
+class CompletenessIndex:
+    """Present and valid slot masks per UTC day of one EAN and profile."""
+
+    def __init__(self, hass: HomeAssistant, ean: str, profile: str) -> None:
+        # Day -> (present mask, valid mask)
+        self._days: dict[date, tuple[int, int]] = {}
+        self._store: Store[dict[str, list[str]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.completeness.{ean}_{profile}"
+        )
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self._days = {
+            date.fromisoformat(day): (int(present, 16), int(valid, 16))
+            for day, (present, valid) in data.items()
+        }
+
+    def async_update(self, records: list[MeasurementData]) -> None:
+        """Fold records into the masks and schedule a save if anything changed."""
+        with blocking("completeness"):
+            changed = self.update(records)
+        if changed:
+            self._store.async_delay_save(self._data_to_save, COMPLETENESS_SAVE_DELAY)
+
+    def update(self, records: list[MeasurementData]) -> bool:
+        days = self._days
+        before = dict(days)
+        current: date | None = None
+        present = valid = 0
+
+        for item in records:
+            timestamp = _utc(item.timestamp)
+            day = timestamp.date()
+            if day != current:
+                if current is not None:
+                    days[current] = (present, valid)
+                current = day
+                present, valid = days.get(day, (0, 0))
+            bit = 1 << slot_of_day(timestamp)
+            present |= bit
+            if item.value is not None and item.status == "IU012":
+                valid |= bit
+            else:
+                valid &= ~bit
+        if current is not None:
+            days[current] = (present, valid)
+
+        for day in sorted(days)[:-COMPLETENESS_MAX_DAYS]:
+            del days[day]
+        return days != before
+
+    def day(self, day: date) -> tuple[int, int]:
+        """Return the ``(present, valid)`` masks of a day."""
+        return self._days.get(day, (0, 0))
+
+    def incomplete_days(self, start: date, end: date) -> list[date]:
+        """Archived days in ``[start, end]`` with a missing or provisional slot.
+
+        Days without any reading were never archived; corrections only
+        revise archived days, so re-fetching them would not fill them in.
+        """
+        days = []
+        day = start
+        while day <= end:
+            present, valid = self.day(day)
+            if present and valid != FULL_DAY:
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def summary(self, end: date, days: int = COMPLETENESS_SUMMARY_DAYS) -> dict[str, Any]:
+        """Slot and day counts of the ``days`` days up to ``end``."""
+        start = end - timedelta(days=days - 1)
+        valid_slots = present_slots = 0
+        incomplete = []
+        day = start
+        while day <= end:
+            present, valid = self.day(day)
+            valid_slots += valid.bit_count()
+            present_slots += present.bit_count()
+            if valid != FULL_DAY:
+                incomplete.append(day)
+            day += timedelta(days=1)
+
+        return {
+            "days_complete": days - len(incomplete),
+            "days_incomplete": len(incomplete),
+            "valid_slots": valid_slots,
+            "provisional_slots": present_slots - valid_slots,
+            "missing_slots": days * SLOTS_PER_DAY - present_slots,
+            "percent": round(100 * valid_slots / (days * SLOTS_PER_DAY), 1),
+            "incomplete_days": [day.isoformat() for day in incomplete[-10:]],
+        }
+
+    def _data_to_save(self) -> dict[str, list[str]]:
+        return {
+            day.isoformat(): [f"{present:x}", f"{valid:x}"]
+            for day, (present, valid) in sorted(self._days.items())
+        }
@@ -2,20 +2,48 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import Any
+from zoneinfo import ZoneInfo
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 
-from .api import EGDAuthError, EGDClient
+from .api import EGDApiError, EGDAuthError, EGDCircuitOpenError, EGDClient
 from .const import (
     CONF_CLIENT_ID,
     CONF_CLIENT_SECRET,
     CONF_EAN,
+    CONF_OFFLOAD_THRESHOLD,
+    CONF_PROCESS_POOL,
+    CONF_RECHECK_DAYS,
+    CONF_TARIFF_CURRENCY,
+    CONF_TARIFF_HIGH_PRICE,
+    CONF_TARIFF_LOW_PRICE,
+    CONF_TARIFF_LOW_WINDOWS,
+    CONF_WATCHDOG,
+    DATA_PENDING_CLIENTS,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    DEFAULT_RECHECK_DAYS,
+    DEFAULT_TARIFF_CURRENCY,
     DOMAIN,
+    EAN_LENGTH,
+    EAN_PROBE_AGE_DAYS,
+    EAN_PROBE_MAX_AGE_DAYS,
     LOGGER,
+    MAX_RECHECK_DAYS,
+    METER_TIME_ZONE,
 )
+from .tariff import parse_windows
+from .token_store import get_token_store
+from .windows import local_today
 
 
 class EGDConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -27,6 +55,13 @@ class EGDConfigFlow(ConfigFlow, domain=DOMAIN):
         self._client_id: str = ""
         self._client_secret: str = ""
         self._ean: str = ""
+        # Authenticated client, handed over to the entry so setup skips the login
+        self._client: EGDClient | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> EGDOptionsFlow:
+        return EGDOptionsFlow(config_entry)
 
     async def async_step_user(
         self,
@@ -39,17 +74,20 @@ class EGDConfigFlow(ConfigFlow, domain=DOMAIN):
             self._client_id = user_input[CONF_CLIENT_ID]
             self._client_secret = user_input[CONF_CLIENT_SECRET]
 
+            await self._async_close_client()
             client = EGDClient(self._client_id, self._client_secret)
             try:
                 await client._get_access_token()
-                await client.close()
             except EGDAuthError:
                 errors["base"] = "auth"
             except Exception:
                 LOGGER.exception("Authentication error")
                 errors["base"] = "unknown"
             else:
+                self._client = client
+                await get_token_store(self.hass).async_save(client)
                 return await self.async_step_ean()
+            await client.close()
 
         return self.async_show_form(
             step_id="user",
@@ -66,17 +104,30 @@ class EGDConfigFlow(ConfigFlow, domain=DOMAIN):
         self,
         user_input: dict[str, Any] | None = None,
     ) -> ConfigFlowResult:
-        """Handle EAN input."""
+        """Handle EAN input, probing the API for a day of data."""
+        errors: dict[str, str] = {}
+
         if user_input is not None:
-            self._ean = user_input[CONF_EAN]
-            return self.async_create_entry(
-                title=f"EGD {self._ean}",
-                data={
-                    CONF_CLIENT_ID: self._client_id,
-                    CONF_CLIENT_SECRET: self._client_secret,
-                    CONF_EAN: self._ean,
-                },
-            )
+            self._ean = user_input[CONF_EAN].strip()
+            if not (self._ean.isdigit() and len(self._ean) == EAN_LENGTH):
+                errors[CONF_EAN] = "invalid_ean"
+            else:
+                await self.async_set_unique_id(self._ean)
+                self._abort_if_unique_id_configured()
+                errors = await self._async_probe_ean()
+
+            if not errors:
+                # Hand the authenticated client over so setup skips a cold login
+                self.hass.data.setdefault(DATA_PENDING_CLIENTS, {})[self._client_id] = self._client
+                self._client = None
+                return self.async_create_entry(
+                    title=f"EGD {self._ean}",
+                    data={
+                        CONF_CLIENT_ID: self._client_id,
+                        CONF_CLIENT_SECRET: self._client_secret,
+                        CONF_EAN: self._ean,
+                    },
+                )
 
         return self.async_show_form(
             step_id="ean",
@@ -88,4 +139,113 @@ class EGDConfigFlow(ConfigFlow, domain=DOMAIN):
             description_placeholders={
                 "description": "Enter the EAN (Energy Identification Number) of your metering point."
             },
+            errors=errors,
+        )
+
+    async def _async_probe_ean(self) -> dict[str, str]:
+        """Request the last published meter days for the EAN in a single request."""
+        if self._client is None:
+            self._client = EGDClient(self._client_id, self._client_secret)
+        # Same meter days as the coordinator will request
+        self._client.time_zone = ZoneInfo(METER_TIME_ZONE)
+
+        today = local_today(self._client.time_zone)
+        try:
+            data = await self._client.get_consumption_data(
+                self._ean,
+                today - timedelta(days=EAN_PROBE_MAX_AGE_DAYS),
+                today - timedelta(days=EAN_PROBE_AGE_DAYS),
+            )
+        except EGDAuthError:
+            return {"base": "auth"}
+        except EGDCircuitOpenError:
+            return {"base": "cannot_connect"}
+        except EGDApiError as err:
+            LOGGER.debug("EAN probe for %s failed: %s", self._ean, err)
+            # Only a client error says the EAN is unknown; throttling, server
+            # errors, timeouts and garbled bodies say nothing about it
+            if err.status is not None and 400 <= err.status < 500 and err.status != 429:
+                return {CONF_EAN: "invalid_ean"}
+            return {"base": "cannot_connect"}
+        except Exception:
+            LOGGER.exception("EAN probe error")
+            return {"base": "unknown"}
+
+        if not data:
+            return {CONF_EAN: "invalid_ean"}
+        return {}
+
+    async def _async_close_client(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    @callback
+    def async_remove(self) -> None:
+        """Close the client if the flow is aborted before creating an entry."""
+        if self._client is not None:
+            self.hass.async_create_task(self._async_close_client())
+
+
+class EGDOptionsFlow(OptionsFlow):
+    """Handle EGD Smart Meter options."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        # Kept here, ``OptionsFlow.config_entry`` is only provided from HA 2024.11
+        self._entry = config_entry
+
+    async def async_step_init(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> ConfigFlowResult:
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                parse_windows(user_input.get(CONF_TARIFF_LOW_WINDOWS, ""))
+            except ValueError:
+                errors[CONF_TARIFF_LOW_WINDOWS] = "invalid_tariff_windows"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        options = user_input or self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_RECHECK_DAYS,
+                        default=options.get(CONF_RECHECK_DAYS, DEFAULT_RECHECK_DAYS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_RECHECK_DAYS)),
+                    vol.Optional(
+                        CONF_OFFLOAD_THRESHOLD,
+                        default=options.get(CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PROCESS_POOL,
+                        default=options.get(CONF_PROCESS_POOL, False),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_WATCHDOG,
+                        default=options.get(CONF_WATCHDOG, False),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_TARIFF_HIGH_PRICE,
+                        default=options.get(CONF_TARIFF_HIGH_PRICE, 0.0),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_TARIFF_LOW_PRICE,
+                        default=options.get(CONF_TARIFF_LOW_PRICE, 0.0),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_TARIFF_LOW_WINDOWS,
+                        default=options.get(CONF_TARIFF_LOW_WINDOWS, ""),
+                    ): cv.string,
+                    vol.Optional(
+                        CONF_TARIFF_CURRENCY,
+                        default=options.get(CONF_TARIFF_CURRENCY, DEFAULT_TARIFF_CURRENCY),
+                    ): cv.string,
+                }
+            ),
+            errors=errors,
         )
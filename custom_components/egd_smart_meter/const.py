@@ -8,18 +8,120 @@ ATTR_PRODUCTION = "production"
 CONF_CLIENT_ID = "client_id"
 CONF_CLIENT_SECRET = "client_secret"
 CONF_EAN = "ean"
+CONF_RECHECK_DAYS = "recheck_days"
+CONF_OFFLOAD_THRESHOLD = "offload_threshold"
+CONF_PROCESS_POOL = "process_pool"
+CONF_TARIFF_HIGH_PRICE = "tariff_high_price"
+CONF_TARIFF_LOW_PRICE = "tariff_low_price"
+CONF_TARIFF_LOW_WINDOWS = "tariff_low_windows"
+CONF_TARIFF_CURRENCY = "tariff_currency"
+CONF_WATCHDOG = "watchdog"
 
 DEFAULT_SCAN_INTERVAL = 3600
 UPDATE_HOUR = 6
 
+STORAGE_VERSION = 1
+# hass.data keys shared by all entries and config flows
+DATA_TOKEN_STORE = f"{DOMAIN}_token_store"
+DATA_PENDING_CLIENTS = f"{DOMAIN}_pending_clients"
+DATA_WATCHDOG = f"{DOMAIN}_watchdog"
+DATA_STATISTICS_WRITER = f"{DOMAIN}_statistics_writer"
+# Stored tokens this close to expiry are not reused
+TOKEN_EXPIRY_MARGIN = 300
+STATISTICS_LOOKBACK_DAYS = 31
+DEFAULT_RECHECK_DAYS = 7
+MAX_RECHECK_DAYS = 30
+# Responses and imports with at least this many records leave the event loop
+DEFAULT_OFFLOAD_THRESHOLD = 1000
+DEFAULT_TARIFF_CURRENCY = "CZK"
+EAN_LENGTH = 18
+# The config flow probes the meter days from EAN_PROBE_MAX_AGE_DAYS to
+# EAN_PROBE_AGE_DAYS back in one request; yesterday is often not published yet
+EAN_PROBE_AGE_DAYS = 2
+EAN_PROBE_MAX_AGE_DAYS = 7
+
+# At most this many offending values are logged, once per interval (seconds)
+LOG_SAMPLE_LIMIT = 3
+LOG_SAMPLE_INTERVAL = 3600
+
+# Event-loop watchdog: tick interval, lag counted as a block, warning and
+# reporting windows, all in seconds
+WATCHDOG_INTERVAL = 0.5
+WATCHDOG_THRESHOLD = 0.1
+WATCHDOG_WARN_INTERVAL = 300
+WATCHDOG_WINDOW = 300
+
+# Quarter-hour demand peaks kept per month, and months kept
+PEAK_TOP_K = 5
+PEAK_MONTHS = 13
+
+DEFAULT_BACKFILL_THROTTLE = 5.0
+BACKFILL_ERROR_DELAY = 300
+
+# Failed windows are retried after 15 min, doubling up to a day, 10 attempts at most
+RETRY_BASE_DELAY = 900
+RETRY_MAX_DELAY = 86400
+RETRY_MAX_ATTEMPTS = 10
+
+# Windows of finalised days up to a week long are cached for five minutes
+RESPONSE_CACHE_SIZE = 8
+RESPONSE_CACHE_TTL = 300
+RESPONSE_CACHE_MAX_DAYS = 7
+
+# Statistics writes are collected for a few seconds and imported in bounded batches
+STATISTICS_FLUSH_DELAY = 2.0
+STATISTICS_BATCH_SIZE = 1000
+STATISTICS_MAX_PENDING = 20000
+
+# Completeness masks are kept for about two years and summarised over 30 days
+COMPLETENESS_MAX_DAYS = 800
+COMPLETENESS_SUMMARY_DAYS = 30
+COMPLETENESS_SAVE_DELAY = 10
+
+# Meter days, and so request windows, follow local time of the distributor
+METER_TIME_ZONE = "Europe/Prague"
+
 BASE_URL_TOKEN = "https://idm.distribuce24.cz"
 BASE_URL_DATA = "https://data.distribuce24.cz/rest"
 
 OAUTH_TOKEN_ENDPOINT = "/oauth/token"
 
+PAGE_SIZE = 3000
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RECOVERY_TIMEOUT = 60
+BREAKER_MAX_RECOVERY_TIMEOUT = 900
+
 PROFILE_CONSUMPTION = "ICC1"
 PROFILE_PRODUCTION = "ISC1"
 
+SERVICE_EXPORT_DATA = "export_data"
+SERVICE_GET_USAGE = "get_usage"
+SERVICE_START_BACKFILL = "start_backfill"
+SERVICE_CANCEL_BACKFILL = "cancel_backfill"
+
+ATTR_EAN = "ean"
+ATTR_PROFILE = "profile"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_FILENAME = "filename"
+ATTR_FORMAT = "format"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_GRANULARITY = "granularity"
+ATTR_THROTTLE = "throttle"
+
+GRANULARITY_HOUR = "hour"
+GRANULARITY_DAY = "day"
+GRANULARITY_WEEK = "week"
+GRANULARITY_MONTH = "month"
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_DIR = "egd_exports"
+
+EVENT_EXPORT_PROGRESS = f"{DOMAIN}_export_progress"
+
 SENSOR_TYPES = {
     ATTR_CONSUMPTION: "Consumption",
     ATTR_PRODUCTION: "Production",
@@ -0,0 +1,622 @@
+"""Data update coordinator for EGD Smart Meter."""
+
+from collections import Counter
+from collections.abc import Mapping
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .api import EGDApiError, EGDCircuitOpenError, EGDClient, MeasurementData
+from .archive import SlotArchive, _utc
+from .backfill import BackfillJob
+from .completeness import CompletenessIndex
+from .const import (
+    ATTR_CONSUMPTION,
+    ATTR_PRODUCTION,
+    CONF_OFFLOAD_THRESHOLD,
+    CONF_PROCESS_POOL,
+    CONF_RECHECK_DAYS,
+    CONF_WATCHDOG,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    DEFAULT_RECHECK_DAYS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    LOGGER,
+    METER_TIME_ZONE,
+    PROFILE_CONSUMPTION,
+    PROFILE_PRODUCTION,
+    STATISTICS_LOOKBACK_DAYS,
+)
+from .corrections import HourCorrection, find_corrections
+from .importer import aggregate_hourly, cumulative_rows, power_rows
+from .netmetering import merge_net
+from .offload import Offloader
+from .peaks import PeakTracker
+from .retry_queue import RetryQueue
+from .statistics_writer import get_statistics_writer
+from .tariff import schedule_from_options
+from .watchdog import LoopWatchdog, get_watchdog, staged
+from .windows import covering_days, day_span, local_today
+
+
+def _sum_metadata(
+    statistic_id: str,
+    name: str,
+    unit: str = "kWh",
+    unit_class: str | None = "energy",
+) -> dict[str, Any]:
+    return {
+        "has_mean": False,
+        "has_sum": True,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": statistic_id,
+        "unit_of_measurement": unit,
+        "unit_class": unit_class,
+    }
+
+
+def _mean_metadata(statistic_id: str, name: str) -> dict[str, Any]:
+    return {
+        "has_mean": True,
+        "has_sum": False,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": statistic_id,
+        "unit_of_measurement": "kW",
+        "unit_class": "power",
+    }
+
+
+class EGDCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Data update coordinator for EGD Smart Meter."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client_id: str,
+        client_secret: str,
+        ean: str,
+        options: Mapping[str, Any] | None = None,
+        client: EGDClient | None = None,
+    ) -> None:
+        options = options or {}
+        self.api = client or EGDClient(client_id, client_secret)
+        self.ean = ean
+        self._recheck_days: int = options.get(CONF_RECHECK_DAYS, DEFAULT_RECHECK_DAYS)
+        self.offloader = Offloader(
+            hass,
+            options.get(CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD),
+            options.get(CONF_PROCESS_POOL, False),
+        )
+        self.api.offload = self.offloader.run
+        self.api.time_zone = ZoneInfo(METER_TIME_ZONE)
+        self.statistic_id = f"{DOMAIN}:{ean}_consumption"
+        self.cost_statistic_id = f"{DOMAIN}:{ean}_cost"
+        self.power_statistic_id = f"{DOMAIN}:{ean}_consumption_power"
+        self.tariff = schedule_from_options(options, hass.config.time_zone)
+        self.net_statistic_ids = {
+            kind: f"{DOMAIN}:{ean}_{kind}"
+            for kind in ("net_consumption", "net_export", "self_consumption")
+        }
+        self._statistics_meta = {
+            self.statistic_id: _sum_metadata(self.statistic_id, f"EGD {ean} Consumption"),
+            self.power_statistic_id: _mean_metadata(
+                self.power_statistic_id, f"EGD {ean} Consumption power"
+            ),
+        }
+        for kind, statistic_id in self.net_statistic_ids.items():
+            name = f"EGD {ean} {kind.replace('_', ' ').capitalize()}"
+            self._statistics_meta[statistic_id] = _sum_metadata(statistic_id, name)
+        if self.tariff is not None:
+            self._statistics_meta[self.cost_statistic_id] = _sum_metadata(
+                self.cost_statistic_id, f"EGD {ean} Cost", self.tariff.currency, None
+            )
+        self._total_consumption = 0.0
+        self._total_production = 0.0
+        self._last_date: date | None = None
+        archive_dir = Path(hass.config.path(STORAGE_DIR, DOMAIN))
+        self.archives = {
+            profile: SlotArchive(archive_dir, ean, profile)
+            for profile in (PROFILE_CONSUMPTION, PROFILE_PRODUCTION)
+        }
+        self.completeness = {
+            profile: CompletenessIndex(hass, ean, profile)
+            for profile in (PROFILE_CONSUMPTION, PROFILE_PRODUCTION)
+        }
+
+        super().__init__(
+            hass,
+            LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+        )
+        self.backfill = BackfillJob(hass, self)
+        self.retry_queue = RetryQueue(hass, self)
+        self.statistics_writer = get_statistics_writer(hass)
+        self.peaks = PeakTracker(hass, ean, hass.config.time_zone)
+        self.watchdog: LoopWatchdog | None = (
+            get_watchdog(hass) if options.get(CONF_WATCHDOG, False) else None
+        )
+
+        # Initialize data immediately so sensors can read it
+        self.data = {
+            ATTR_CONSUMPTION: self._total_consumption,
+            ATTR_PRODUCTION: self._total_production,
+        }
+
+    @staged("update")
+    async def _async_update_data(self) -> dict[str, Any]:
+        # Reset to 0 for new day (today's consumption is not yet available)
+        today = local_today(self.api.time_zone)
+        if self._last_date is not None and self._last_date < today:
+            self._total_consumption = 0.0
+            LOGGER.debug("Reset consumption for new day: %s", today.isoformat())
+
+        # API requires data to be at least 1 day old, fetch yesterday's data
+        safe_date = today - timedelta(days=1)
+
+        if self._last_date is None or safe_date > self._last_date:
+            try:
+                data = await self.api.get_consumption_data(
+                    ean=self.ean,
+                    start_date=safe_date,
+                    end_date=safe_date,
+                )
+
+                daily_total = sum(
+                    item.value for item in data if item.value is not None and item.status == "IU012"
+                )
+                await self._archive_data(PROFILE_CONSUMPTION, data)
+
+                # Store yesterday's data but don't update current state
+                # Current state shows today's consumption (which is 0 until tomorrow)
+                self._last_date = safe_date
+                await self._fetch_production(safe_date)
+                await self._async_recheck_corrections(safe_date)
+                LOGGER.info(
+                    "Stored yesterday's consumption (%.2f kWh) for %s",
+                    daily_total,
+                    safe_date.isoformat(),
+                )
+
+            except EGDCircuitOpenError as err:
+                LOGGER.debug("Skipping update: %s", err)
+            except EGDApiError as err:
+                LOGGER.error("Failed to fetch data: %s", err)
+        else:
+            # Nothing new to fetch this cycle, a quiet moment for failed windows
+            await self.retry_queue.async_drain()
+
+        return {
+            ATTR_CONSUMPTION: self._total_consumption,
+            ATTR_PRODUCTION: self._total_production,
+        }
+
+    @staged("initial")
+    async def fetch_initial_data(self, entry: ConfigEntry) -> None:
+        # API requires data to be at least 1 day old, use yesterday
+        safe_date = local_today(self.api.time_zone) - timedelta(days=1)
+
+        try:
+            # Fetch only the last day for the sensor (historical data for statistics disabled)
+            data = await self.api.get_consumption_data(
+                ean=self.ean,
+                start_date=safe_date,
+                end_date=safe_date,
+            )
+
+            await self._archive_data(PROFILE_CONSUMPTION, data)
+
+            status_counts = Counter(item.status for item in data)
+            valid_count = 0
+            yesterday_total = 0.0
+            for item in data:
+                if item.value is not None and item.status == "IU012":
+                    yesterday_total += item.value
+                    valid_count += 1
+
+            # Keep _total_consumption at 0 (today's consumption is not yet available)
+            # yesterday_total is just for logging
+            if data:
+                self._last_date = safe_date
+
+            # One line per entry; startup of many entries should not flood the log
+            LOGGER.info(
+                "Fetched %d records for %s (%d valid, status %s), yesterday's consumption: "
+                "%.2f kWh. Sensor shows 0 for today (data available tomorrow).",
+                len(data),
+                self.ean,
+                valid_count,
+                dict(status_counts),
+                yesterday_total,
+            )
+
+            # Update data - sensor shows 0 for today
+            self.data = {
+                ATTR_CONSUMPTION: self._total_consumption,  # 0.0
+                ATTR_PRODUCTION: self._total_production,
+            }
+
+            # Import yesterday's data as hourly statistics for Energy Dashboard
+            await self._import_hourly_statistics(data, safe_date)
+            if await self._fetch_production(safe_date):
+                await self._import_net_statistics(
+                    *day_span(safe_date, safe_date, self.api.time_zone)
+                )
+
+        except EGDApiError as err:
+            LOGGER.error("Failed to fetch initial data: %s", err)
+
+    async def _fetch_production(self, day: date) -> list[MeasurementData] | None:
+        """Fetch a day of production into the archive; None if the fetch failed."""
+        try:
+            return await self._async_fetch_production(day, day)
+        except EGDCircuitOpenError as err:
+            LOGGER.debug("Skipping production fetch: %s", err)
+        except EGDApiError as err:
+            LOGGER.error("Failed to fetch production data: %s", err)
+        return None
+
+    async def _async_fetch_production(
+        self, start_date: date, end_date: date
+    ) -> list[MeasurementData]:
+        """Fetch a window of production into the archive for range and net queries."""
+        data = await self.api.get_consumption_data(
+            ean=self.ean,
+            start_date=start_date,
+            end_date=end_date,
+            profile=PROFILE_PRODUCTION,
+        )
+        await self._archive_data(PROFILE_PRODUCTION, data)
+        return data
+
+    @staged("net_metering")
+    async def _import_net_statistics(
+        self,
+        start: datetime,
+        end: datetime,
+        base_sums: Mapping[str, float] | None = None,
+    ) -> dict[str, float]:
+        """Rebuild net consumption, net export and self-consumption of ``[start, end)``.
+
+        Both series are read back from the archives, so the net statistics
+        follow every write of consumption or production. Sums continue from
+        ``base_sums`` or the last stored statistic, as in
+        ``_import_hourly_statistics``; meters without production are skipped.
+        Returns the final sum of every imported statistic.
+        """
+        consumption, production = await self.hass.async_add_executor_job(
+            self._read_net_records, start, end
+        )
+        if not production:
+            return {}
+
+        net = await self.offloader.run(
+            len(consumption) + len(production), merge_net, consumption, production
+        )
+        final_sums: dict[str, float] = {}
+        for kind, statistic_id in self.net_statistic_ids.items():
+            hourly = getattr(net, kind)
+            if not hourly:
+                continue
+            if base_sums and statistic_id in base_sums:
+                base_sum = base_sums[statistic_id]
+            else:
+                base_sum = await self._async_last_sum(statistic_id, min(hourly))
+            statistics, final_sums[statistic_id] = cumulative_rows(hourly, base_sum)
+            self._add_statistics(statistics, statistic_id)
+        return final_sums
+
+    def _read_net_records(
+        self, start: datetime, end: datetime
+    ) -> tuple[list[MeasurementData], list[MeasurementData]]:
+        return (
+            self.archives[PROFILE_CONSUMPTION].read_records(start, end),
+            self.archives[PROFILE_PRODUCTION].read_records(start, end),
+        )
+
+    async def _archive_data(self, profile: str, data: list[MeasurementData]) -> None:
+        """Write fetched records into the quarter-hour archive."""
+        if not data:
+            return
+        try:
+            await self.hass.async_add_executor_job(self.archives[profile].write, data)
+        except (OSError, ValueError) as err:
+            LOGGER.error("Failed to archive %s data for %s: %s", profile, self.ean, err)
+            # The indexes describe the archive, they must not count slots it lacks
+            return
+        self.completeness[profile].async_update(data)
+        if profile == PROFILE_CONSUMPTION:
+            await self.peaks.async_update(data)
+
+    async def async_settle_statistics(self) -> None:
+        """Wait until every queued statistics write of this meter is committed.
+
+        Called before progress is persisted, so a restart never skips rows that
+        were still waiting in the writer.
+        """
+        try:
+            await self.statistics_writer.async_settle(*self._statistics_meta)
+        except Exception as err:
+            LOGGER.warning("Could not settle statistics of %s: %s", self.ean, err)
+
+    async def _async_last_sum(self, statistic_id: str, before: datetime) -> float:
+        """Return the cumulative sum of the last hourly statistic before ``before``.
+
+        The last ``STATISTICS_LOOKBACK_DAYS`` are read first. When they hold no
+        row, e.g. after weeks of uptime without an import, the lookup falls
+        back to the newest row and, if that lies after ``before``, to the whole
+        history, so a sum never restarts from zero on top of stored rows.
+        """
+        try:
+            # Rows still waiting in the writer or the recorder would be missing
+            await self.statistics_writer.async_settle(statistic_id)
+            recorder = self.statistics_writer.recorder
+            instance = recorder.get_instance(self.hass)
+            rows = await self._async_sum_rows(
+                statistic_id, before - timedelta(days=STATISTICS_LOOKBACK_DAYS), before
+            )
+            if not rows:
+                last = await instance.async_add_executor_job(
+                    recorder.get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+                )
+                rows = [
+                    row for row in last.get(statistic_id, []) if row["start"] < before.timestamp()
+                ]
+                if last.get(statistic_id) and not rows:
+                    rows = await self._async_sum_rows(
+                        statistic_id, datetime.fromtimestamp(0, UTC), before
+                    )
+        except Exception as err:
+            LOGGER.debug("Could not read last sum of %s: %s", statistic_id, err)
+            return 0.0
+
+        if not rows:
+            return 0.0
+        return rows[-1].get("sum") or 0.0
+
+    async def _async_sum_rows(
+        self, statistic_id: str, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        recorder = self.statistics_writer.recorder
+        stats = await recorder.get_instance(self.hass).async_add_executor_job(
+            recorder.statistics_during_period,
+            self.hass,
+            start,
+            end,
+            {statistic_id},
+            "hour",
+            None,
+            {"sum"},
+        )
+        return stats.get(statistic_id) or []
+
+    @property
+    def sum_statistic_ids(self) -> list[str]:
+        """Statistics with a running sum that are imported from consumption."""
+        if self.tariff is None:
+            return [self.statistic_id]
+        return [self.statistic_id, self.cost_statistic_id]
+
+    @staged("import")
+    async def _import_hourly_statistics(
+        self,
+        data: list,
+        date_obj: date,
+        base_sums: Mapping[str, float] | None = None,
+    ) -> dict[str, float]:
+        """Import data as hourly statistics for Energy Dashboard.
+
+        Consumption, its power profile and, with a tariff, its cost are
+        aggregated in one pass. Sums continue from ``base_sums`` or, for statistics not in it, from the
+        last stored statistic before the first imported hour. Returns the final
+        sum of every imported statistic.
+        """
+        if not data:
+            return {}
+
+        # Filter valid data and group by hour
+        aggregate = await self.offloader.run(len(data), aggregate_hourly, data, self.tariff)
+        if not aggregate.energy:
+            LOGGER.warning("No valid hourly data to import")
+            return {}
+
+        series = {self.statistic_id: aggregate.energy}
+        if self.tariff is not None:
+            series[self.cost_statistic_id] = aggregate.cost
+
+        final_sums: dict[str, float] = {}
+        for statistic_id, hourly in series.items():
+            if base_sums and statistic_id in base_sums:
+                base_sum = base_sums[statistic_id]
+            else:
+                base_sum = await self._async_last_sum(statistic_id, min(hourly))
+            statistics, final_sums[statistic_id] = cumulative_rows(hourly, base_sum)
+            self._add_statistics(statistics, statistic_id)
+        self._add_statistics(power_rows(aggregate), self.power_statistic_id)
+
+        LOGGER.debug(
+            "Imported %d hours of statistics from %s into Energy Dashboard",
+            len(aggregate.energy),
+            date_obj.isoformat(),
+        )
+        return final_sums
+
+    async def _async_import_window(
+        self,
+        data: list[MeasurementData],
+        start_date: date,
+        end_date: date,
+    ) -> None:
+        """Import a window in the middle of existing statistics.
+
+        Rows of the window continue from the sum before it, and every later row
+        is shifted by the difference the window makes to the running sum. The
+        production of the window is fetched first, so a failure leaves the
+        window untouched for another retry.
+        """
+        start, end = day_span(start_date, end_date, self.api.time_zone)
+        production = await self._async_fetch_production(start_date, end_date)
+        old_end_sums = {
+            statistic_id: await self._async_last_sum(statistic_id, end)
+            for statistic_id in [*self.sum_statistic_ids, *self.net_statistic_ids.values()]
+        }
+        await self._archive_data(PROFILE_CONSUMPTION, data)
+        final_sums = await self._import_hourly_statistics(data, start_date)
+        if production:
+            final_sums.update(await self._import_net_statistics(start, end))
+        for statistic_id, final_sum in final_sums.items():
+            await self._async_adjust_sum(end, final_sum - old_end_sums[statistic_id], statistic_id)
+
+    def _add_statistics(
+        self,
+        statistics: list[dict[str, Any]],
+        statistic_id: str | None = None,
+    ) -> None:
+        """Queue hourly statistics for the recorder, consumption by default."""
+        metadata = self._statistics_meta[statistic_id or self.statistic_id]
+        self.statistics_writer.async_add(metadata, statistics)
+
+    @staged("recheck")
+    async def _async_recheck_corrections(self, safe_date: date) -> None:
+        """Refetch the re-check window and re-import only revised hours.
+
+        Distributor data is revised after the fact, e.g. estimated readings
+        become validated ones. Days before ``safe_date`` that the completeness
+        index reports as missing or provisional slots are fetched again in a
+        single request and compared against the archive day by day.
+        """
+        if self._recheck_days <= 0:
+            return
+
+        # Only days with missing or provisional quarter-hours are still revised
+        incomplete = self.completeness[PROFILE_CONSUMPTION].incomplete_days(
+            safe_date - timedelta(days=self._recheck_days), safe_date - timedelta(days=1)
+        )
+        if not incomplete:
+            LOGGER.debug("Skipping correction re-check, %s is complete", self.ean)
+            return
+        # The index holds UTC days, requests are meter days
+        start_date, end_date = incomplete[0], incomplete[-1]
+        try:
+            data = await self.api.get_consumption_data(
+                self.ean, *covering_days(start_date, end_date, self.api.time_zone)
+            )
+        except EGDCircuitOpenError as err:
+            LOGGER.debug("Skipping correction re-check: %s", err)
+            return
+        except EGDApiError as err:
+            LOGGER.warning("Failed to re-check %s for corrections: %s", self.ean, err)
+            return
+
+        # Partly fetched edge days would never match their digest
+        data = [item for item in data if start_date <= _utc(item.timestamp).date() <= end_date]
+
+        archive = self.archives[PROFILE_CONSUMPTION]
+        changed, corrections = await self.hass.async_add_executor_job(
+            find_corrections, archive, data, self.tariff
+        )
+        if not changed:
+            LOGGER.debug(
+                "No corrections for %s between %s and %s",
+                self.ean,
+                start_date.isoformat(),
+                end_date.isoformat(),
+            )
+            return
+
+        # Sums before hours without a stored row must be read before anything changes
+        previous_sums = {
+            (statistic_id, correction.start): await self._async_last_sum(
+                statistic_id, correction.start
+            )
+            for correction in corrections
+            if not correction.had_valid
+            for statistic_id in self.sum_statistic_ids
+        }
+        _, end = day_span(start_date, end_date)
+        net_end_sums = {
+            statistic_id: await self._async_last_sum(statistic_id, end)
+            for statistic_id in self.net_statistic_ids.values()
+        }
+        await self._archive_data(PROFILE_CONSUMPTION, changed)
+        await self._async_apply_corrections(corrections, previous_sums)
+
+        # Net statistics are rebuilt from the first revised hour on
+        first = min(item.timestamp for item in changed)
+        net_sums = await self._import_net_statistics(
+            first.replace(minute=0, second=0, microsecond=0, tzinfo=UTC), end
+        )
+        for statistic_id, final_sum in net_sums.items():
+            await self._async_adjust_sum(end, final_sum - net_end_sums[statistic_id], statistic_id)
+
+        # Power rows hold no running sum, revised hours are simply written again
+        hours = {correction.start for correction in corrections}
+        revised = [
+            item
+            for item in data
+            if item.timestamp.replace(minute=0, second=0, microsecond=0, tzinfo=UTC) in hours
+        ]
+        aggregate = await self.offloader.run(len(revised), aggregate_hourly, revised)
+        if aggregate.power:
+            self._add_statistics(power_rows(aggregate), self.power_statistic_id)
+        LOGGER.info(
+            "Applied %d revised quarter-hours (%d hours) for %s",
+            len(changed),
+            len(corrections),
+            self.ean,
+        )
+
+    async def _async_apply_corrections(
+        self,
+        corrections: list[HourCorrection],
+        previous_sums: dict[tuple[str, datetime], float],
+    ) -> None:
+        """Shift sums from each corrected hour and add rows for newly valid hours."""
+        delta_fields = {self.statistic_id: "delta"}
+        if self.tariff is not None:
+            delta_fields[self.cost_statistic_id] = "cost_delta"
+
+        for statistic_id, delta_field in delta_fields.items():
+            statistics = []
+            applied = 0.0
+            for correction in corrections:
+                delta = getattr(correction, delta_field)
+                applied += delta
+                await self._async_adjust_sum(correction.start, delta, statistic_id)
+                if not correction.had_valid:
+                    row_sum = previous_sums[statistic_id, correction.start] + applied
+                    statistics.append({"start": correction.start, "sum": row_sum, "state": row_sum})
+
+            if statistics:
+                self._add_statistics(statistics, statistic_id)
+
+    async def _async_adjust_sum(
+        self,
+        start: datetime,
+        adjustment: float,
+        statistic_id: str | None = None,
+    ) -> None:
+        """Shift the sum of every row of a statistic from ``start`` onwards."""
+        if abs(adjustment) < 1e-9:
+            return
+        statistic_id = statistic_id or self.statistic_id
+        unit = self._statistics_meta[statistic_id]["unit_of_measurement"]
+        self.statistics_writer.async_adjust(statistic_id, start, adjustment, unit)
+
+    async def close(self) -> None:
+        await self.backfill.async_stop()
+        self.statistics_writer.async_flush()
+        await self.api.close()
+        self.offloader.shutdown()
+        if self.watchdog is not None:
+            self.watchdog.release()
+        for archive in self.archives.values():
+            await self.hass.async_add_executor_job(archive.close)
@@ -0,0 +1,133 @@
+"""Detection of late corrections in already archived quarter-hour data.
+
+Fetched days are packed into the archive's own float32/uint8 layout and
+compared by digest against the stored slots, so unchanged days cost a single
+hash of a few hundred bytes. Only slots of days whose digest differs are
+compared one by one.
+"""
+
+import hashlib
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from .api import MeasurementData
+from .archive import (
+    SLOTS_PER_DAY,
+    VALID_STATUS,
+    SlotArchive,
+    encode_status,
+    slot_of_day,
+)
+from .tariff import TariffSchedule
+
+
+@dataclass
+class HourCorrection:
+    start: datetime
+    delta: float
+    total: float
+    had_valid: bool
+    cost_delta: float = 0.0
+
+
+def day_digest(values: memoryview | array, statuses: memoryview | bytearray) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(values)
+    digest.update(statuses)
+    return digest.digest()
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def _group_by_day(records: list[MeasurementData]) -> dict[date, list[MeasurementData]]:
+    days: dict[date, list[MeasurementData]] = {}
+    for item in records:
+        days.setdefault(item.timestamp.date(), []).append(item)
+    return days
+
+
+def _valid(value: float, status: int) -> float:
+    return value if status == VALID_STATUS and not math.isnan(value) else 0.0
+
+
+def find_corrections(
+    archive: SlotArchive,
+    records: list[MeasurementData],
+    tariff: TariffSchedule | None = None,
+) -> tuple[list[MeasurementData], list[HourCorrection]]:
+    """Return the changed records and the per-hour corrections they cause.
+
+    Days that were never archived are ignored; they are not corrections.
+    With a ``tariff`` the cost change of every hour is priced per slot as well.
+    Runs in the executor.
+    """
+    changed: list[MeasurementData] = []
+    hours: dict[datetime, HourCorrection] = {}
+
+    with archive.lock:
+        for day, day_records in sorted(_group_by_day(records).items()):
+            rates = tariff.rate_table(day) if tariff is not None else None
+            _compare_day(archive, day, day_records, changed, hours, rates)
+
+    return changed, [hours[start] for start in sorted(hours) if hours[start].delta]
+
+
+def _compare_day(
+    archive: SlotArchive,
+    day: date,
+    day_records: list[MeasurementData],
+    changed: list[MeasurementData],
+    hours: dict[datetime, HourCorrection],
+    rates: array | None = None,
+) -> None:
+    """Collect changed slots of one UTC day, skipping the day if its digest matches."""
+    stored_values, stored_status = archive.read_range(
+        _day_start(day), _day_start(day + timedelta(days=1))
+    )
+    with stored_values, stored_status:
+        if len(stored_status) != SLOTS_PER_DAY or not any(stored_status):
+            return
+
+        fetched_values = array("f", bytes(SLOTS_PER_DAY * 4))
+        fetched_status = bytearray(SLOTS_PER_DAY)
+        by_slot: dict[int, MeasurementData] = {}
+        for item in day_records:
+            slot = slot_of_day(item.timestamp)
+            fetched_values[slot] = math.nan if item.value is None else item.value
+            fetched_status[slot] = encode_status(item.status)
+            by_slot[slot] = item
+
+        if day_digest(fetched_values, fetched_status) == day_digest(stored_values, stored_status):
+            return
+
+        for slot, item in sorted(by_slot.items()):
+            old_value, old_status = stored_values[slot], stored_status[slot]
+            new_value, new_status = fetched_values[slot], fetched_status[slot]
+            same_value = old_value == new_value or (math.isnan(old_value) and math.isnan(new_value))
+            if same_value and old_status == new_status:
+                continue
+            changed.append(item)
+
+            hour_slot = slot - slot % 4
+            hour_start = (_day_start(day) + timedelta(hours=slot // 4)).replace(
+                tzinfo=timezone.utc  # noqa: UP017
+            )
+            if hour_start not in hours:
+                hour_values = stored_values[hour_slot : hour_slot + 4]
+                hour_status = stored_status[hour_slot : hour_slot + 4]
+                stored_total = sum(map(_valid, hour_values, hour_status))
+                hours[hour_start] = HourCorrection(
+                    start=hour_start,
+                    delta=0.0,
+                    total=stored_total,
+                    had_valid=any(status == VALID_STATUS for status in hour_status),
+                )
+            delta = _valid(new_value, new_status) - _valid(old_value, old_status)
+            hours[hour_start].delta += delta
+            hours[hour_start].total += delta
+            if rates is not None:
+                hours[hour_start].cost_delta += delta * rates[slot]
@@ -0,0 +1,151 @@
+"""Streaming export of quarter-hour history to CSV or Parquet."""
+
+import csv
+import importlib.util
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from .api import EGDClient, MeasurementData
+from .const import EVENT_EXPORT_PROGRESS, EXPORT_FORMAT_PARQUET, LOGGER
+from .watchdog import staged
+
+EXPORT_COLUMNS = ("timestamp", "ean", "profile", "value_kwh", "status")
+
+
+@dataclass
+class ExportResult:
+    path: str
+    records: int = 0
+    failed_windows: list[str] = field(default_factory=list)
+
+
+def parquet_available() -> bool:
+    """Return True if pyarrow is installed and Parquet export can be used."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _format_timestamp(item: MeasurementData) -> str:
+    return item.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class _CsvWriter:
+    """Append-only CSV writer, flushed after every chunk."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, ean: str, profile: str, records: list[MeasurementData]) -> None:
+        self._writer.writerows(
+            (_format_timestamp(item), ean, profile, item.value, item.status) for item in records
+        )
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Parquet writer emitting one row group per chunk."""
+
+    def __init__(self, path: Path) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("timestamp", pa.timestamp("s", tz="UTC")),
+                ("ean", pa.string()),
+                ("profile", pa.string()),
+                ("value_kwh", pa.float64()),
+                ("status", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+
+    def write(self, ean: str, profile: str, records: list[MeasurementData]) -> None:
+        table = self._pa.table(
+            {
+                "timestamp": [item.timestamp for item in records],
+                "ean": [ean] * len(records),
+                "profile": [profile] * len(records),
+                "value_kwh": [item.value for item in records],
+                "status": [item.status for item in records],
+            },
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+@staged("export")
+async def async_export_data(
+    hass: HomeAssistant,
+    client: EGDClient,
+    ean: str,
+    profile: str,
+    start_date: date,
+    end_date: date,
+    path: Path,
+    export_format: str,
+) -> ExportResult:
+    """Stream a date range to disk chunk by chunk.
+
+    Only one batch chunk is kept in memory at a time; rows are written in the
+    executor as soon as a chunk arrives and progress is fired on the bus.
+    """
+    writer_cls = _ParquetWriter if export_format == EXPORT_FORMAT_PARQUET else _CsvWriter
+    writer = await hass.async_add_executor_job(writer_cls, path)
+    result = ExportResult(path=str(path))
+    days_total = (end_date - start_date).days + 1
+
+    try:
+        async for chunk in client.iter_consumption_data_batch(ean, start_date, end_date, profile):
+            if chunk.error is not None:
+                LOGGER.warning(
+                    "Export of %s %s skipped %s to %s: %s",
+                    ean,
+                    profile,
+                    chunk.start_date.isoformat(),
+                    chunk.end_date.isoformat(),
+                    chunk.error,
+                )
+                result.failed_windows.append(
+                    f"{chunk.start_date.isoformat()}/{chunk.end_date.isoformat()}"
+                )
+            elif chunk.records:
+                await hass.async_add_executor_job(writer.write, ean, profile, chunk.records)
+                result.records += len(chunk.records)
+
+            hass.bus.async_fire(
+                EVENT_EXPORT_PROGRESS,
+                {
+                    "ean": ean,
+                    "profile": profile,
+                    "path": result.path,
+                    "days_done": (chunk.end_date - start_date).days + 1,
+                    "days_total": days_total,
+                    "records": result.records,
+                },
+            )
+    finally:
+        await hass.async_add_executor_job(writer.close)
+
+    LOGGER.info(
+        "Exported %d records for %s %s to %s (%d failed windows)",
+        result.records,
+        ean,
+        profile,
+        result.path,
+        len(result.failed_windows),
+    )
+    return result
@@ -0,0 +1,64 @@
+"""Aggregated parse counters and rate-limited log samples.
+
+Hot paths count problems instead of logging each record, and emit one line
+per page or job. Offending values are kept as a handful of samples, so log
+volume stays constant regardless of payload size.
+"""
+
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from .const import LOG_SAMPLE_INTERVAL, LOG_SAMPLE_LIMIT
+
+
+@dataclass
+class ParseStats:
+    records: int = 0
+    skipped: int = 0
+    malformed: int = 0
+    by_status: Counter[str] = field(default_factory=Counter)
+    samples: list[str] = field(default_factory=list)
+
+    def add_sample(self, value: object) -> None:
+        if len(self.samples) < LOG_SAMPLE_LIMIT:
+            self.samples.append(str(value)[:64])
+
+    def merge(self, other: "ParseStats") -> None:
+        self.records += other.records
+        self.skipped += other.skipped
+        self.malformed += other.malformed
+        self.by_status.update(other.by_status)
+        for sample in other.samples:
+            self.add_sample(sample)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.records} records, status {dict(self.by_status)}, "
+            f"{self.malformed} malformed, {self.skipped} skipped"
+        )
+
+
+class LogLimiter:
+    """Allow one message per key and interval, counting the suppressed ones."""
+
+    def __init__(
+        self,
+        interval: float = LOG_SAMPLE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = interval
+        self._clock = clock
+        self._last: dict[str, float] = {}
+        self._suppressed: Counter[str] = Counter()
+
+    def allow(self, key: str) -> int | None:
+        """Return the number of suppressed messages if one may be logged now."""
+        now = self._clock()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] += 1
+            return None
+        self._last[key] = now
+        return self._suppressed.pop(key, 0)
@@ -0,0 +1,80 @@
+"""Net metering statistics from aligned consumption and production series."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from .api import MeasurementData
+
+
+@dataclass
+class NetHourly:
+    net_consumption: dict[datetime, float] = field(default_factory=dict)
+    net_export: dict[datetime, float] = field(default_factory=dict)
+    self_consumption: dict[datetime, float] = field(default_factory=dict)
+
+
+def _valid(item: MeasurementData) -> bool:
+    return item.value is not None and item.status == "IU012"
+
+
+def merge_net(
+    consumption: list[MeasurementData],
+    production: list[MeasurementData],
+) -> NetHourly:
+    """Net both series per quarter-hour and sum the results into UTC hours.
+
+    The series are merge-joined by timestamp in one linear sweep. A slot
+    present in only one series counts the other side as zero; a slot where a
+    present side is not valid (e.g. estimated) is skipped entirely so
+    mismatched statuses never produce a half-netted value.
+    """
+    consumption = sorted(consumption, key=lambda item: item.timestamp)
+    production = sorted(production, key=lambda item: item.timestamp)
+    result = NetHourly()
+
+    hour: datetime | None = None
+    net_in = net_out = own = 0.0
+    i = j = 0
+    while i < len(consumption) or j < len(production):
+        used = consumption[i] if i < len(consumption) else None
+        made = production[j] if j < len(production) else None
+        if made is None or (used is not None and used.timestamp < made.timestamp):
+            timestamp, made = used.timestamp, None
+            i += 1
+        elif used is None or made.timestamp < used.timestamp:
+            timestamp, used = made.timestamp, None
+            j += 1
+        else:
+            timestamp = used.timestamp
+            i += 1
+            j += 1
+
+        if (used is not None and not _valid(used)) or (made is not None and not _valid(made)):
+            continue
+        used_kwh = used.value if used is not None else 0.0
+        made_kwh = made.value if made is not None else 0.0
+
+        slot_hour = timestamp.replace(
+            minute=0,
+            second=0,
+            microsecond=0,
+            tzinfo=timezone.utc,  # noqa: UP017
+        )
+        if slot_hour != hour:
+            if hour is not None:
+                _flush(result, hour, net_in, net_out, own)
+            hour = slot_hour
+            net_in = net_out = own = 0.0
+        net_in += max(used_kwh - made_kwh, 0.0)
+        net_out += max(made_kwh - used_kwh, 0.0)
+        own += min(used_kwh, made_kwh)
+
+    if hour is not None:
+        _flush(result, hour, net_in, net_out, own)
+    return result
+
+
+def _flush(result: NetHourly, hour: datetime, net_in: float, net_out: float, own: float) -> None:
+    result.net_consumption[hour] = net_in
+    result.net_export[hour] = net_out
+    result.self_consumption[hour] = own
@@ -0,0 +1,66 @@
+"""Offloading of CPU-heavy stages away from the event loop."""
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_OFFLOAD_THRESHOLD, LOGGER
+from .watchdog import blocking
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+_T = TypeVar("_T")
+
+
+async def run_inline(size: int, func: Callable[..., _T], *args: Any) -> _T:
+    """Run ``func`` on the event loop; the default when no offloader is set."""
+    return func(*args)
+
+
+class Offloader:
+    """Run work of ``size`` records in an executor once it reaches a threshold.
+
+    Small payloads stay on the event loop, where a thread hop would cost more
+    than the work itself. With ``process_pool`` the work runs in a separate
+    process, so it does not compete for the GIL either; ``func`` and its
+    arguments must then be picklable.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        process_pool: bool = False,
+    ) -> None:
+        self.hass = hass
+        self.threshold = threshold
+        self._process_pool = process_pool
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def run(self, size: int, func: Callable[..., _T], *args: Any) -> _T:
+        if size < self.threshold:
+            with blocking(getattr(func, "__name__", "offload")):
+                return func(*args)
+        if not self._process_pool:
+            return await self.hass.async_add_executor_job(func, *args)
+        if self._pool is None:
+            # Pulls in multiprocessing, so only imported when the option is on
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Forking the multi-threaded HA process can deadlock the child
+            method = (
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            )
+            LOGGER.debug("Starting %s process pool for offloaded parsing", method)
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context(method)
+            )
+        return await self.hass.loop.run_in_executor(self._pool, func, *args)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,141 @@
+"""Incremental monthly peak-demand tracking."""
+
+import heapq
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import MeasurementData
+from .const import DOMAIN, PEAK_MONTHS, PEAK_TOP_K, STORAGE_VERSION
+from .watchdog import blocking
+
+
+class PeakTracker:
+    """Top-k quarter-hour demand peaks per local calendar month.
+
+    Every month keeps a min-heap of ``(kw, timestamp)`` bounded to ``k``
+    entries, so a new reading costs O(log k) and the month is never rescanned.
+    Readings below the smallest kept peak are rejected before any formatting,
+    which is the common case. A re-fetched quarter-hour replaces its previous
+    value instead of being counted twice. Demand in kW is the quarter-hour
+    energy times four.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ean: str,
+        time_zone: str = "UTC",
+        k: int = PEAK_TOP_K,
+    ) -> None:
+        self.k = k
+        self._zone = ZoneInfo(time_zone)
+        self._months: dict[str, list[tuple[float, str]]] = {}
+        # Naive UTC timestamps of the kept peaks, for the duplicate check
+        self._members: dict[str, set[datetime]] = {}
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.peaks.{ean}")
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self._months = {
+            month: [(kw, timestamp) for kw, timestamp in peaks] for month, peaks in data.items()
+        }
+        for month, heap in self._months.items():
+            heapq.heapify(heap)
+            self._members[month] = {
+                datetime.fromisoformat(timestamp).replace(tzinfo=None) for _, timestamp in heap
+            }
+
+    async def async_update(self, records: list[MeasurementData]) -> None:
+        """Fold new readings into the heaps and persist them if anything changed."""
+        with blocking("peaks"):
+            changed = self.update(records)
+        if changed:
+            await self._store.async_save(
+                {month: list(heap) for month, heap in self._months.items()}
+            )
+
+    def update(self, records: list[MeasurementData]) -> bool:
+        changed = False
+        k = self.k
+        month_start = month_end = None
+        heap: list[tuple[float, str]] = []
+        members: set[datetime] = set()
+
+        for item in records:
+            if item.value is None or item.status != "IU012":
+                continue
+            timestamp = item.timestamp
+            if month_start is None or not month_start <= timestamp < month_end:
+                month, month_start, month_end = self._month_of(timestamp)
+                heap = self._months.setdefault(month, [])
+                members = self._members.setdefault(month, set())
+
+            kw = item.value * 4
+            if len(heap) >= k and kw <= heap[0][0] and timestamp not in members:
+                continue
+            changed |= self._push(heap, members, kw, timestamp)
+
+        # Drop the oldest months beyond the retention window
+        for month in sorted(self._months)[:-PEAK_MONTHS]:
+            del self._months[month]
+            self._members.pop(month, None)
+        return changed
+
+    def _month_of(self, timestamp: datetime) -> tuple[str, datetime, datetime]:
+        """Local month of a naive UTC timestamp and its bounds in naive UTC."""
+        local = timestamp.replace(tzinfo=UTC).astimezone(self._zone)
+        start = local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return (
+            start.strftime("%Y-%m"),
+            start.astimezone(UTC).replace(tzinfo=None),
+            end.astimezone(UTC).replace(tzinfo=None),
+        )
+
+    def _push(
+        self,
+        heap: list[tuple[float, str]],
+        members: set[datetime],
+        kw: float,
+        timestamp: datetime,
+    ) -> bool:
+        key = timestamp.replace(tzinfo=UTC).isoformat()
+        if timestamp in members:
+            for index, (old_kw, old_key) in enumerate(heap):
+                if old_key == key:
+                    if old_kw == kw:
+                        return False
+                    heap[index] = (kw, key)
+                    heapq.heapify(heap)
+                    return True
+
+        members.add(timestamp)
+        if len(heap) < self.k:
+            heapq.heappush(heap, (kw, key))
+            return True
+        _, dropped = heapq.heapreplace(heap, (kw, key))
+        members.discard(datetime.fromisoformat(dropped).replace(tzinfo=None))
+        return True
+
+    @property
+    def latest_month(self) -> str | None:
+        return max(self._months, default=None)
+
+    def peaks(self, month: str) -> list[dict[str, Any]]:
+        """Peaks of ``month``, highest first."""
+        return [
+            {"timestamp": timestamp, "kw": round(kw, 3)}
+            for kw, timestamp in sorted(self._months.get(month, []), reverse=True)
+        ]
+
+    def peak(self, month: str) -> float | None:
+        heap = self._months.get(month)
+        return max(heap)[0] if heap else None
+
+    @property
+    def months(self) -> list[str]:
+        return sorted(self._months)
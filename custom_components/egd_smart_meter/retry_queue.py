@@ -0,0 +1,146 @@
+"""Persistent queue of data windows whose fetch failed."""
+
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import EGDApiError, EGDCircuitOpenError
+from .breaker import CircuitState
+from .const import (
+    DOMAIN,
+    LOGGER,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+    STORAGE_VERSION,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import EGDCoordinator
+
+
+@dataclass
+class RetryWindow:
+    start_date: date
+    end_date: date
+    attempts: int = 0
+    # Wall-clock timestamp, so the schedule survives restarts
+    next_try: float = 0.0
+    error: str = ""
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for key in ("start_date", "end_date"):
+            data[key] = data[key].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RetryWindow":
+        data = dict(data)
+        for key in ("start_date", "end_date"):
+            data[key] = date.fromisoformat(data[key])
+        return cls(**data)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait after ``attempts`` failures, doubling up to a cap."""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+class RetryQueue:
+    """Failed consumption windows, retried with backoff until they import.
+
+    Windows are persisted in HA storage per EAN. ``async_drain`` retries the
+    windows that are due, but only while the API circuit is closed and no
+    backfill is running, so retries never compete with a busy or failing API.
+    A window is dropped after ``RETRY_MAX_ATTEMPTS`` failed attempts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: "EGDCoordinator",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.windows: list[RetryWindow] = []
+        self._clock = clock
+        self._store: Store[list[dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.retry.{coordinator.ean}"
+        )
+
+    async def async_load(self) -> None:
+        if (data := await self._store.async_load()) is not None:
+            self.windows = [RetryWindow.from_dict(item) for item in data]
+
+    async def async_add(self, start_date: date, end_date: date, error: Exception) -> None:
+        """Queue a failed window; a window that is already queued keeps its schedule."""
+        if any(w.start_date == start_date and w.end_date == end_date for w in self.windows):
+            return
+        self.windows.append(
+            RetryWindow(start_date, end_date, 1, self._clock() + retry_delay(1), str(error))
+        )
+        self.windows.sort(key=lambda window: window.start_date)
+        await self._async_save()
+
+    async def async_drain(self) -> None:
+        """Retry every due window once."""
+        coordinator = self.coordinator
+        if not self.windows or coordinator.backfill.running:
+            return
+        if coordinator.api.breaker.state != CircuitState.CLOSED:
+            return
+
+        now = self._clock()
+        for window in [w for w in self.windows if w.next_try <= now]:
+            try:
+                records = await coordinator.api.get_consumption_data(
+                    ean=coordinator.ean,
+                    start_date=window.start_date,
+                    end_date=window.end_date,
+                )
+                # Fetches the production of the window as well, which may fail too
+                await coordinator._async_import_window(records, window.start_date, window.end_date)
+                # The window is only forgotten once its rows are committed
+                await coordinator.async_settle_statistics()
+            except EGDCircuitOpenError:
+                break
+            except EGDApiError as err:
+                window.attempts += 1
+                window.error = str(err)
+                if window.attempts >= RETRY_MAX_ATTEMPTS:
+                    LOGGER.warning(
+                        "Giving up on %s from %s to %s after %d attempts: %s",
+                        coordinator.ean,
+                        window.start_date.isoformat(),
+                        window.end_date.isoformat(),
+                        window.attempts,
+                        err,
+                    )
+                    self.windows.remove(window)
+                else:
+                    window.next_try = now + retry_delay(window.attempts)
+                continue
+
+            self.windows.remove(window)
+            LOGGER.info(
+                "Recovered %d records for %s from %s to %s",
+                len(records),
+                coordinator.ean,
+                window.start_date.isoformat(),
+                window.end_date.isoformat(),
+            )
+
+        await self._async_save()
+
+    async def _async_save(self) -> None:
+        if self.windows:
+            await self._store.async_save([window.as_dict() for window in self.windows])
+        else:
+            await self._store.async_remove()
@@ -1,5 +1,6 @@
 """Sensor platform for EGD Smart Meter integration."""
 
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
@@ -8,15 +9,29 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 
-from .const import DOMAIN, SENSOR_TYPES
+from .breaker import CircuitState
+from .const import (
+    ATTR_CONSUMPTION,
+    DOMAIN,
+    PROFILE_CONSUMPTION,
+    PROFILE_PRODUCTION,
+    SENSOR_TYPES,
+)
+from .windows import local_today
 
 if TYPE_CHECKING:
-    from . import EGDCoordinator
+    from .coordinator import EGDCoordinator
 
 
 async def async_setup_entry(
@@ -29,6 +44,11 @@ async def async_setup_entry(
     entities = []
     for sensor_type in SENSOR_TYPES:
         entities.append(EGDSensor(coordinator, sensor_type, entry.entry_id))
+    entities.append(EGDApiStatusSensor(coordinator, entry.entry_id))
+    entities.append(EGDBackfillSensor(coordinator, entry.entry_id))
+    entities.append(EGDPeakSensor(coordinator, entry.entry_id))
+    if coordinator.watchdog is not None:
+        entities.append(EGDLoopLagSensor(coordinator, entry.entry_id))
 
     async_add_entities(entities)
 
@@ -61,10 +81,138 @@ class EGDSensor(SensorEntity):
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
+        profile = (
+            PROFILE_CONSUMPTION if self.sensor_type == ATTR_CONSUMPTION else PROFILE_PRODUCTION
+        )
+        # Data quality of the meter days up to yesterday, the latest one the API serves
+        completeness = self.coordinator.completeness[profile]
         return {
             "ean": self.coordinator.ean,
             "last_updated": self.coordinator.last_update_success,
+            "completeness": completeness.summary(
+                local_today(self.coordinator.api.time_zone) - timedelta(days=1)
+            ),
         }
 
     async def async_update(self) -> None:
         await self.coordinator.async_request_refresh()
+
+
+class EGDApiStatusSensor(SensorEntity):
+    """Diagnostic sensor exposing the circuit breaker state of the EGD API."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_options = [state.value for state in CircuitState]
+
+    def __init__(self, coordinator: "EGDCoordinator", entry_id: str) -> None:
+        self.coordinator = coordinator
+
+        ean = coordinator.ean
+        self._attr_unique_id = f"{entry_id}_{ean}_api_status"
+        self._attr_name = f"EGD {ean} API status"
+
+    @property
+    def native_value(self) -> StateType:
+        return self.coordinator.api.breaker.state.value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        breaker = self.coordinator.api.breaker
+        return {
+            "host": breaker.host,
+            "consecutive_failures": breaker.failures,
+            "retry_in": round(breaker.retry_in),
+        }
+
+
+class EGDBackfillSensor(SensorEntity):
+    """Diagnostic sensor with the progress of the historical backfill job."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_icon = "mdi:database-import"
+
+    def __init__(self, coordinator: "EGDCoordinator", entry_id: str) -> None:
+        self.coordinator = coordinator
+
+        ean = coordinator.ean
+        self._attr_unique_id = f"{entry_id}_{ean}_backfill"
+        self._attr_name = f"EGD {ean} Backfill progress"
+
+    @property
+    def native_value(self) -> StateType:
+        return self.coordinator.backfill.progress.get("percent")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        progress = dict(self.coordinator.backfill.progress)
+        progress.pop("percent", None)
+        progress["retry_windows"] = len(self.coordinator.retry_queue.windows)
+        return progress
+
+
+class EGDPeakSensor(SensorEntity):
+    """Highest quarter-hour demand of the latest month with data."""
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
+    _attr_icon = "mdi:chart-bell-curve"
+
+    def __init__(self, coordinator: "EGDCoordinator", entry_id: str) -> None:
+        self.coordinator = coordinator
+
+        ean = coordinator.ean
+        self._attr_unique_id = f"{entry_id}_{ean}_peak_demand"
+        self._attr_name = f"EGD {ean} Peak demand"
+
+    @property
+    def native_value(self) -> StateType:
+        peaks = self.coordinator.peaks
+        month = peaks.latest_month
+        return peaks.peak(month) if month else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        peaks = self.coordinator.peaks
+        months = peaks.months
+        if not months:
+            return None
+        attributes: dict[str, Any] = {"month": months[-1], "peaks": peaks.peaks(months[-1])}
+        if len(months) > 1:
+            attributes["previous_month"] = months[-2]
+            attributes["previous_month_peaks"] = peaks.peaks(months[-2])
+        return attributes
+
+
+class EGDLoopLagSensor(SensorEntity):
+    """Diagnostic sensor with the worst recent event-loop lag and its stages."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-alert-outline"
+
+    def __init__(self, coordinator: "EGDCoordinator", entry_id: str) -> None:
+        self.coordinator = coordinator
+
+        ean = coordinator.ean
+        self._attr_unique_id = f"{entry_id}_{ean}_loop_lag"
+        self._attr_name = f"EGD {ean} Event loop lag"
+
+    @property
+    def native_value(self) -> StateType:
+        return round(self.coordinator.watchdog.recent_max_lag * 1000, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        watchdog = self.coordinator.watchdog
+        return {
+            "threshold_ms": round(watchdog.threshold * 1000),
+            "max_lag_ms": round(watchdog.max_lag * 1000, 1),
+            "blocks": watchdog.blocks,
+            "last_block": watchdog.last_block,
+            "stages": watchdog.by_stage,
+        }
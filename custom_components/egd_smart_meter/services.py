@@ -0,0 +1,258 @@
+"""Services for EGD Smart Meter integration."""
+
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONSUMPTION,
+    ATTR_EAN,
+    ATTR_END,
+    ATTR_END_DATE,
+    ATTR_FILENAME,
+    ATTR_FORMAT,
+    ATTR_GRANULARITY,
+    ATTR_PRODUCTION,
+    ATTR_PROFILE,
+    ATTR_START,
+    ATTR_START_DATE,
+    ATTR_THROTTLE,
+    DEFAULT_BACKFILL_THROTTLE,
+    DOMAIN,
+    EXPORT_DIR,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    GRANULARITY_DAY,
+    GRANULARITY_HOUR,
+    GRANULARITY_MONTH,
+    GRANULARITY_WEEK,
+    PROFILE_CONSUMPTION,
+    PROFILE_PRODUCTION,
+    SERVICE_CANCEL_BACKFILL,
+    SERVICE_EXPORT_DATA,
+    SERVICE_GET_USAGE,
+    SERVICE_START_BACKFILL,
+)
+from .usage import bucket_bounds, query_usage
+from .windows import local_today
+
+if TYPE_CHECKING:
+    from .coordinator import EGDCoordinator
+
+EXPORT_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_EAN): cv.string,
+        vol.Optional(ATTR_PROFILE, default=PROFILE_CONSUMPTION): vol.In(
+            [PROFILE_CONSUMPTION, PROFILE_PRODUCTION]
+        ),
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(
+            [EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET]
+        ),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+GET_USAGE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_EAN): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_GRANULARITY, default=GRANULARITY_DAY): vol.In(
+            [GRANULARITY_HOUR, GRANULARITY_DAY, GRANULARITY_WEEK, GRANULARITY_MONTH]
+        ),
+    }
+)
+
+START_BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_EAN): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_THROTTLE, default=DEFAULT_BACKFILL_THROTTLE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=3600)
+        ),
+    }
+)
+
+CANCEL_BACKFILL_SCHEMA = vol.Schema({vol.Required(ATTR_EAN): cv.string})
+
+USAGE_PROFILES = {
+    ATTR_CONSUMPTION: PROFILE_CONSUMPTION,
+    ATTR_PRODUCTION: PROFILE_PRODUCTION,
+}
+
+
+def _get_coordinator(hass: HomeAssistant, ean: str) -> "EGDCoordinator":
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if getattr(coordinator, "ean", None) == ean:
+            return coordinator
+    raise HomeAssistantError(f"No EGD Smart Meter configured for EAN {ean}")
+
+
+async def _async_export_data(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    from .export import async_export_data, parquet_available
+
+    data = call.data
+    ean = data[ATTR_EAN]
+    profile = data[ATTR_PROFILE]
+    start_date = data[ATTR_START_DATE]
+    end_date = data[ATTR_END_DATE]
+    export_format = data[ATTR_FORMAT]
+
+    if end_date < start_date:
+        raise HomeAssistantError("end_date must not be before start_date")
+    if export_format == EXPORT_FORMAT_PARQUET and not parquet_available():
+        raise HomeAssistantError("Parquet export requires the pyarrow package")
+
+    filename = data.get(ATTR_FILENAME) or (
+        f"{ean}_{profile}_{start_date.isoformat()}_{end_date.isoformat()}.{export_format}"
+    )
+    if Path(filename).name != filename:
+        raise HomeAssistantError("filename must not contain a directory")
+
+    coordinator = _get_coordinator(hass, ean)
+    result = await async_export_data(
+        hass,
+        coordinator.api,
+        ean,
+        profile,
+        start_date,
+        end_date,
+        Path(hass.config.path(EXPORT_DIR, filename)),
+        export_format,
+    )
+    return {
+        "path": result.path,
+        "records": result.records,
+        "failed_windows": result.failed_windows,
+    }
+
+
+async def _async_get_usage(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    data = call.data
+    coordinator = _get_coordinator(hass, data[ATTR_EAN])
+    time_zone = dt_util.get_time_zone(hass.config.time_zone)
+    start = data[ATTR_START]
+    end = data[ATTR_END]
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=time_zone)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=time_zone)
+    if end <= start:
+        raise HomeAssistantError("end must be after start")
+
+    try:
+        bounds = bucket_bounds(start, end, data[ATTR_GRANULARITY], time_zone)
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+    archives = {name: coordinator.archives[profile] for name, profile in USAGE_PROFILES.items()}
+    totals, coverage = await hass.async_add_executor_job(query_usage, archives, bounds)
+    lengths = [(end - start).total_seconds() for start, end in bounds]
+
+    return {
+        "ean": coordinator.ean,
+        "granularity": data[ATTR_GRANULARITY],
+        "buckets": [
+            {
+                ATTR_START: bucket_start.isoformat(),
+                ATTR_END: bucket_end.isoformat(),
+                **{name: round(values[index], 4) for name, values in totals.items()},
+                **{
+                    f"{name}_coverage": round(values[index], 3) for name, values in coverage.items()
+                },
+            }
+            for index, (bucket_start, bucket_end) in enumerate(bounds)
+        ],
+        **{name: round(sum(values), 4) for name, values in totals.items()},
+        # Share of the range that was archived, weighted by bucket length
+        **{
+            f"{name}_coverage": round(
+                sum(part * length for part, length in zip(values, lengths, strict=True))
+                / sum(lengths),
+                3,
+            )
+            for name, values in coverage.items()
+        },
+    }
+
+
+async def _async_start_backfill(hass: HomeAssistant, call: ServiceCall) -> None:
+    data = call.data
+    coordinator = _get_coordinator(hass, data[ATTR_EAN])
+    end_date = data.get(ATTR_END_DATE) or local_today(coordinator.api.time_zone) - timedelta(days=2)
+    try:
+        await coordinator.backfill.async_start(data[ATTR_START_DATE], end_date, data[ATTR_THROTTLE])
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+
+async def _async_cancel_backfill(hass: HomeAssistant, call: ServiceCall) -> None:
+    coordinator = _get_coordinator(hass, call.data[ATTR_EAN])
+    await coordinator.backfill.async_cancel()
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services once for all config entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_EXPORT_DATA):
+        return
+
+    async def async_export_data_service(call: ServiceCall) -> ServiceResponse:
+        return await _async_export_data(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_DATA,
+        async_export_data_service,
+        schema=EXPORT_DATA_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_get_usage_service(call: ServiceCall) -> ServiceResponse:
+        return await _async_get_usage(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_USAGE,
+        async_get_usage_service,
+        schema=GET_USAGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_start_backfill_service(call: ServiceCall) -> None:
+        await _async_start_backfill(hass, call)
+
+    async def async_cancel_backfill_service(call: ServiceCall) -> None:
+        await _async_cancel_backfill(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_BACKFILL,
+        async_start_backfill_service,
+        schema=START_BACKFILL_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CANCEL_BACKFILL,
+        async_cancel_backfill_service,
+        schema=CANCEL_BACKFILL_SCHEMA,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove integration services when the last config entry is unloaded."""
+    for service in (
+        SERVICE_EXPORT_DATA,
+        SERVICE_GET_USAGE,
+        SERVICE_START_BACKFILL,
+        SERVICE_CANCEL_BACKFILL,
+    ):
+        hass.services.async_remove(DOMAIN, service)
@@ -0,0 +1,192 @@
+"""Coalesced statistics writes shared by all config entries.
+
+Every ``async_add_external_statistics`` and ``async_adjust_statistics`` call
+becomes its own recorder task and database transaction. The writer collects
+the writes of all coordinators for a short delay and hands them to the
+recorder as few, bounded jobs: the rows of one statistic are merged into one
+import per batch. HA offers no public API that imports several statistics in
+one task, so a job still covers a single statistic.
+
+Writes of a statistic keep their order, so a sum adjustment is only queued
+after the rows imported before it. Before a statistic is read back,
+``async_settle`` hands over only the writes of the given statistics and waits
+for the recorder to commit them; the writes of other statistics keep
+coalescing.
+"""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_STATISTICS_WRITER,
+    LOGGER,
+    STATISTICS_BATCH_SIZE,
+    STATISTICS_FLUSH_DELAY,
+    STATISTICS_MAX_PENDING,
+)
+
+
+class RecorderApi(NamedTuple):
+    get_instance: Callable[..., Any]
+    statistics_during_period: Callable[..., Any]
+    async_add_external_statistics: Callable[..., Any]
+    get_last_statistics: Callable[..., Any]
+
+
+def load_recorder_api() -> RecorderApi:
+    """Import the recorder functions the integration uses.
+
+    The recorder is a heavy import and only needed once statistics are read
+    or written, so it is resolved on first use instead of at import time.
+    """
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+        get_last_statistics,
+        statistics_during_period,
+    )
+
+    return RecorderApi(
+        get_instance,
+        statistics_during_period,
+        async_add_external_statistics,
+        get_last_statistics,
+    )
+
+
+@dataclass
+class _Import:
+    metadata: dict[str, Any]
+    # Keyed by start, so a row written twice before a flush is imported once
+    rows: dict[datetime, dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class _Adjust:
+    start: datetime
+    adjustment: float
+    unit: str
+
+
+class StatisticsWriter:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        delay: float = STATISTICS_FLUSH_DELAY,
+        batch_size: int = STATISTICS_BATCH_SIZE,
+        max_pending: int = STATISTICS_MAX_PENDING,
+    ) -> None:
+        self.hass = hass
+        self.delay = delay
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.jobs = 0
+        self._pending: dict[str, list[_Import | _Adjust]] = {}
+        self._pending_rows = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._recorder: RecorderApi | None = None
+        # Statistics with writes handed to the recorder that may not be committed yet
+        self._unsettled: set[str] = set()
+
+    @property
+    def recorder(self) -> RecorderApi:
+        """Recorder functions, imported once per HA instance."""
+        if self._recorder is None:
+            self._recorder = load_recorder_api()
+        return self._recorder
+
+    def async_add(self, metadata: dict[str, Any], statistics: list[dict[str, Any]]) -> None:
+        """Queue rows of an external statistic."""
+        if not statistics:
+            return
+        ops = self._pending.setdefault(metadata["statistic_id"], [])
+        if not ops or not isinstance(ops[-1], _Import):
+            ops.append(_Import(metadata))
+        pending = ops[-1]
+        pending.metadata = metadata
+        queued = len(pending.rows)
+        for row in statistics:
+            pending.rows[row["start"]] = row
+        # Counted once per start, as handed over, so a settle takes off the same amount
+        self._pending_rows += len(pending.rows) - queued
+        self._schedule()
+
+    def async_adjust(
+        self, statistic_id: str, start: datetime, adjustment: float, unit: str
+    ) -> None:
+        """Queue a shift of the sum of every row from ``start`` onwards."""
+        self._pending.setdefault(statistic_id, []).append(_Adjust(start, adjustment, unit))
+        self._schedule()
+
+    def async_flush(self) -> None:
+        """Hand every pending write to the recorder now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        self._pending_rows = 0
+
+        for statistic_id, ops in pending.items():
+            self._write(statistic_id, ops)
+
+    async def async_settle(self, *statistic_ids: str) -> None:
+        """Make every write of ``statistic_ids`` visible to the next read.
+
+        Only those statistics' pending writes are handed over. Imports and
+        adjustments are queued recorder tasks, while reads run on the database
+        executor, so the recorder queue is drained before returning.
+        """
+        for statistic_id in statistic_ids:
+            if (ops := self._pending.pop(statistic_id, None)) is not None:
+                self._pending_rows -= sum(len(op.rows) for op in ops if isinstance(op, _Import))
+                self._write(statistic_id, ops)
+        if self._unsettled.isdisjoint(statistic_ids):
+            return
+        # Writes handed over while waiting are not covered by this drain
+        settled = set(self._unsettled)
+        await self.recorder.get_instance(self.hass).async_block_till_done()
+        self._unsettled -= settled
+
+    def _write(self, statistic_id: str, ops: list[_Import | _Adjust]) -> None:
+        self._unsettled.add(statistic_id)
+        for op in ops:
+            if isinstance(op, _Adjust):
+                self._adjust(statistic_id, op.start, op.adjustment, op.unit)
+                continue
+            rows = [op.rows[start] for start in sorted(op.rows)]
+            for index in range(0, len(rows), self.batch_size):
+                self._import(op.metadata, rows[index : index + self.batch_size])
+
+    def _schedule(self) -> None:
+        if self._pending_rows >= self.max_pending:
+            self.async_flush()
+        elif self._timer is None:
+            self._timer = self.hass.loop.call_later(self.delay, self.async_flush)
+
+    def _import(self, metadata: dict[str, Any], statistics: list[dict[str, Any]]) -> None:
+        self.jobs += 1
+        try:
+            self.recorder.async_add_external_statistics(self.hass, metadata, statistics)
+        except Exception as err:
+            LOGGER.error("Failed to import statistics of %s: %s", metadata["statistic_id"], err)
+
+    def _adjust(self, statistic_id: str, start: datetime, adjustment: float, unit: str) -> None:
+        self.jobs += 1
+        try:
+            self.recorder.get_instance(self.hass).async_adjust_statistics(
+                statistic_id, start, adjustment, unit
+            )
+        except Exception as err:
+            LOGGER.error("Failed to adjust statistics of %s: %s", statistic_id, err)
+
+
+def get_statistics_writer(hass: HomeAssistant) -> StatisticsWriter:
+    """Return the writer shared by all config entries."""
+    if DATA_STATISTICS_WRITER not in hass.data:
+        hass.data[DATA_STATISTICS_WRITER] = StatisticsWriter(hass)
+    return hass.data[DATA_STATISTICS_WRITER]
@@ -0,0 +1,87 @@
+"""Time-of-use tariff schedule and per-slot rate tables."""
+
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from .archive import SLOTS_PER_DAY
+from .const import (
+    CONF_TARIFF_CURRENCY,
+    CONF_TARIFF_HIGH_PRICE,
+    CONF_TARIFF_LOW_PRICE,
+    CONF_TARIFF_LOW_WINDOWS,
+    DEFAULT_TARIFF_CURRENCY,
+)
+
+SLOT = timedelta(minutes=15)
+
+
+def parse_windows(text: str) -> tuple[tuple[time, time], ...]:
+    """Parse low-rate windows like ``"22:00-06:00, 13:00-15:00"``.
+
+    A window whose end is not after its start wraps over midnight. Raises
+    ValueError on malformed input.
+    """
+    windows = []
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        start, sep, end = part.partition("-")
+        if not sep:
+            raise ValueError(f"Invalid tariff window: {part.strip()}")
+        windows.append((time.fromisoformat(start.strip()), time.fromisoformat(end.strip())))
+    return tuple(windows)
+
+
+@dataclass(frozen=True)
+class TariffSchedule:
+    """High/low rate prices per kWh with low-rate windows in local time."""
+
+    high_price: float
+    low_price: float
+    low_windows: tuple[tuple[time, time], ...] = ()
+    time_zone: str = "UTC"
+    currency: str = DEFAULT_TARIFF_CURRENCY
+
+    def is_low(self, local: time) -> bool:
+        for start, end in self.low_windows:
+            if start < end:
+                if start <= local < end:
+                    return True
+            elif local >= start or local < end:
+                return True
+        return False
+
+    def rate_table(self, day: date) -> array:
+        """Price of each quarter-hour of the UTC day ``day``."""
+        return _rate_table(self, day)
+
+
+@lru_cache(maxsize=64)
+def _rate_table(schedule: TariffSchedule, day: date) -> array:
+    zone = ZoneInfo(schedule.time_zone)
+    start = datetime.combine(day, time.min, UTC)
+    rates = array("d", bytes(SLOTS_PER_DAY * 8))
+    for slot in range(SLOTS_PER_DAY):
+        local = (start + slot * SLOT).astimezone(zone).time()
+        rates[slot] = schedule.low_price if schedule.is_low(local) else schedule.high_price
+    return rates
+
+
+def schedule_from_options(options: Mapping[str, Any], time_zone: str) -> TariffSchedule | None:
+    """Build the configured schedule; None when no prices are set."""
+    high_price = options.get(CONF_TARIFF_HIGH_PRICE, 0.0)
+    low_price = options.get(CONF_TARIFF_LOW_PRICE, high_price)
+    if not high_price and not low_price:
+        return None
+    return TariffSchedule(
+        high_price=high_price,
+        low_price=low_price,
+        low_windows=parse_windows(options.get(CONF_TARIFF_LOW_WINDOWS, "")),
+        time_zone=time_zone,
+        currency=options.get(CONF_TARIFF_CURRENCY, DEFAULT_TARIFF_CURRENCY),
+    )
@@ -0,0 +1,86 @@
+"""Persistent, encrypted cache of OAuth access tokens."""
+
+import base64
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any
+
+from cryptography.fernet import Fernet, InvalidToken
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import EGDClient
+from .const import DATA_TOKEN_STORE, DOMAIN, LOGGER, STORAGE_VERSION, TOKEN_EXPIRY_MARGIN
+
+
+def _fernet(client_id: str, client_secret: str) -> Fernet:
+    """Derive the encryption key from the credentials the token belongs to."""
+    digest = hashlib.sha256(f"{client_id}:{client_secret}".encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
+class EGDTokenStore:
+    """Tokens keyed by client_id, encrypted with a key derived from the secret.
+
+    HA storage is plain JSON, so tokens are never written in clear text and
+    can only be decrypted with the client secret of the config entry.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.tokens")
+        self._tokens: dict[str, Any] | None = None
+
+    async def _async_tokens(self) -> dict[str, Any]:
+        if self._tokens is None:
+            self._tokens = await self._store.async_load() or {}
+        return self._tokens
+
+    async def async_restore(self, client: EGDClient) -> bool:
+        """Load a still valid token into ``client``; return True on success."""
+        entry = (await self._async_tokens()).get(client.client_id)
+        if not entry:
+            return False
+
+        expires = datetime.fromtimestamp(entry["expires"])
+        if expires - timedelta(seconds=TOKEN_EXPIRY_MARGIN) <= datetime.now():
+            return False
+        try:
+            token = _fernet(client.client_id, client.client_secret).decrypt(entry["token"]).decode()
+        except (InvalidToken, ValueError):
+            LOGGER.debug("Stored token for %s could not be decrypted", client.client_id)
+            return False
+
+        client.set_token(token, expires)
+        return True
+
+    async def async_save(self, client: EGDClient) -> None:
+        """Persist the current token of ``client``."""
+        if client.access_token is None or client.token_expires is None:
+            return
+        tokens = await self._async_tokens()
+        tokens[client.client_id] = {
+            "token": _fernet(client.client_id, client.client_secret)
+            .encrypt(client.access_token.encode())
+            .decode(),
+            "expires": client.token_expires.timestamp(),
+        }
+        await self._store.async_save(tokens)
+
+    async def async_attach(self, client: EGDClient) -> None:
+        """Restore the stored token and persist every token the client fetches."""
+        if client.access_token is None and await self.async_restore(client):
+            LOGGER.debug("Reusing stored access token for %s", client.client_id)
+
+        @callback
+        def _token_updated() -> None:
+            self.hass.async_create_task(self.async_save(client))
+
+        client.token_callback = _token_updated
+
+
+def get_token_store(hass: HomeAssistant) -> EGDTokenStore:
+    """Return the token store shared by all config entries and flows."""
+    if DATA_TOKEN_STORE not in hass.data:
+        hass.data[DATA_TOKEN_STORE] = EGDTokenStore(hass)
+    return hass.data[DATA_TOKEN_STORE]
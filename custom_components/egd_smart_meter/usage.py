@@ -0,0 +1,87 @@
+"""Range aggregate queries over the quarter-hour archives."""
+
+from datetime import datetime, timedelta, tzinfo
+
+from .archive import SlotArchive
+from .const import (
+    GRANULARITY_DAY,
+    GRANULARITY_HOUR,
+    GRANULARITY_MONTH,
+    GRANULARITY_WEEK,
+)
+
+MAX_BUCKETS = 10000
+
+
+def _floor(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == GRANULARITY_HOUR:
+        return moment
+    moment = moment.replace(hour=0)
+    if granularity == GRANULARITY_WEEK:
+        return moment - timedelta(days=moment.weekday())
+    if granularity == GRANULARITY_MONTH:
+        return moment.replace(day=1)
+    return moment
+
+
+def _next(moment: datetime, granularity: str) -> datetime:
+    if granularity == GRANULARITY_HOUR:
+        return moment + timedelta(hours=1)
+    if granularity == GRANULARITY_DAY:
+        return moment + timedelta(days=1)
+    if granularity == GRANULARITY_WEEK:
+        return moment + timedelta(weeks=1)
+    if moment.month == 12:
+        return moment.replace(year=moment.year + 1, month=1)
+    return moment.replace(month=moment.month + 1)
+
+
+def bucket_bounds(
+    start: datetime,
+    end: datetime,
+    granularity: str,
+    time_zone: tzinfo,
+) -> list[tuple[datetime, datetime]]:
+    """Split ``[start, end)`` into calendar buckets of the local time zone.
+
+    Bucket edges are computed on local wall-clock time and returned as aware
+    datetimes, so days and months stay aligned across DST changes.
+    """
+    local_start = start.astimezone(time_zone).replace(tzinfo=None)
+    local_end = end.astimezone(time_zone).replace(tzinfo=None)
+
+    bounds: list[tuple[datetime, datetime]] = []
+    current = _floor(local_start, granularity)
+    while current < local_end:
+        following = _next(current, granularity)
+        bounds.append(
+            (
+                max(current, local_start).replace(tzinfo=time_zone),
+                min(following, local_end).replace(tzinfo=time_zone),
+            )
+        )
+        if len(bounds) > MAX_BUCKETS:
+            raise ValueError(f"Range produces more than {MAX_BUCKETS} buckets")
+        current = following
+    return bounds
+
+
+def query_usage(
+    archives: dict[str, SlotArchive],
+    bounds: list[tuple[datetime, datetime]],
+) -> tuple[dict[str, list[float]], dict[str, list[float]]]:
+    """Return per-bucket totals and covered fractions for each archive.
+
+    Totals are one prefix-sum lookup per edge. Slots that were never
+    archived count as zero, so the coverage tells a real zero from a gap.
+    """
+    totals = {
+        name: [archive.sum_range(start, end) for start, end in bounds]
+        for name, archive in archives.items()
+    }
+    coverage = {
+        name: [archive.coverage_range(start, end) for start, end in bounds]
+        for name, archive in archives.items()
+    }
+    return totals, coverage
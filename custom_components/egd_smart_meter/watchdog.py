@@ -0,0 +1,186 @@
+"""Event-loop lag watchdog with stage attribution.
+
+A ticker task sleeps for a fixed interval and measures how late it wakes up;
+that overshoot is the time the loop was blocked. Integration code tags its
+work in two ways:
+
+* ``stage(name)`` marks a logical stage (update, backfill, ...) in a context
+  variable. It may span awaits and only names the work in progress.
+* ``blocking(name)`` wraps a synchronous CPU section on the loop and records
+  its exact duration under the current stage.
+
+A lag above the threshold is attributed to the slowest blocking section that
+ran since the previous tick, or else to the stages active at the time.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from functools import wraps
+from typing import Any, ParamSpec, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_WATCHDOG,
+    DOMAIN,
+    LOGGER,
+    WATCHDOG_INTERVAL,
+    WATCHDOG_THRESHOLD,
+    WATCHDOG_WARN_INTERVAL,
+    WATCHDOG_WINDOW,
+)
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+_STAGE: ContextVar[str | None] = ContextVar(f"{DOMAIN}_stage", default=None)
+_ACTIVE_STAGES: Counter[str] = Counter()
+_WATCHDOG: "LoopWatchdog | None" = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Tag the work of the current task, nesting as ``outer/inner``."""
+    parent = _STAGE.get()
+    name = f"{parent}/{name}" if parent else name
+    token = _STAGE.set(name)
+    _ACTIVE_STAGES[name] += 1
+    try:
+        yield
+    finally:
+        _ACTIVE_STAGES[name] -= 1
+        if not _ACTIVE_STAGES[name]:
+            del _ACTIVE_STAGES[name]
+        _STAGE.reset(token)
+
+
+def staged(name: str) -> Callable[[Callable[_P, Awaitable[_T]]], Callable[_P, Awaitable[_T]]]:
+    """Run a coroutine function inside ``stage(name)``."""
+
+    def decorator(func: Callable[_P, Awaitable[_T]]) -> Callable[_P, Awaitable[_T]]:
+        @wraps(func)
+        async def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _T:
+            with stage(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def blocking(name: str) -> Iterator[None]:
+    """Measure a synchronous section that runs on the event loop."""
+    if _WATCHDOG is None:
+        yield
+        return
+    parent = _STAGE.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _WATCHDOG.record(f"{parent}/{name}" if parent else name, time.perf_counter() - started)
+
+
+class LoopWatchdog:
+    """Shared per HA instance; started by the first entry that enables it."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        threshold: float = WATCHDOG_THRESHOLD,
+        interval: float = WATCHDOG_INTERVAL,
+    ) -> None:
+        self.hass = hass
+        self.threshold = threshold
+        self.interval = interval
+        self.blocks = 0
+        self.max_lag = 0.0
+        self.last_block: dict[str, Any] | None = None
+        self.by_stage: dict[str, dict[str, float]] = {}
+        self._samples: deque[tuple[float, float]] = deque()
+        self._touched: dict[str, float] = {}
+        self._warned: dict[str, float] = {}
+        self._users = 0
+        self._task: asyncio.Task | None = None
+
+    def acquire(self) -> None:
+        global _WATCHDOG
+        self._users += 1
+        if self._task is None:
+            _WATCHDOG = self
+            self._task = self.hass.async_create_background_task(
+                self._run(), f"{DOMAIN} loop watchdog"
+            )
+
+    def release(self) -> None:
+        global _WATCHDOG
+        self._users -= 1
+        if self._users <= 0 and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            if _WATCHDOG is self:
+                _WATCHDOG = None
+
+    def record(self, name: str, duration: float) -> None:
+        self._touched[name] = max(duration, self._touched.get(name, 0.0))
+
+    @property
+    def recent_max_lag(self) -> float:
+        """Largest lag in seconds within the reporting window."""
+        return max((lag for _, lag in self._samples), default=0.0)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.tick(max(loop.time() - expected, 0.0), loop.time())
+
+    def tick(self, lag: float, now: float) -> None:
+        """Account one sample of ``lag`` seconds taken at monotonic ``now``."""
+        touched, self._touched = self._touched, {}
+        self._samples.append((now, lag))
+        while self._samples and self._samples[0][0] < now - WATCHDOG_WINDOW:
+            self._samples.popleft()
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.threshold:
+            return
+
+        if touched:
+            culprit = max(touched, key=touched.__getitem__)
+        elif _ACTIVE_STAGES:
+            culprit = "+".join(sorted(_ACTIVE_STAGES))
+        else:
+            culprit = "unattributed"
+
+        self.blocks += 1
+        stats = self.by_stage.setdefault(culprit, {"count": 0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["max_ms"] = max(stats["max_ms"], round(lag * 1000, 1))
+        self.last_block = {
+            "stage": culprit,
+            "lag_ms": round(lag * 1000, 1),
+            "at": datetime.now(UTC).isoformat(),
+        }
+
+        if now - self._warned.get(culprit, -WATCHDOG_WARN_INTERVAL) >= WATCHDOG_WARN_INTERVAL:
+            self._warned[culprit] = now
+            LOGGER.warning(
+                "Event loop blocked for %.0f ms during %s (%d blocks so far)",
+                lag * 1000,
+                culprit,
+                stats["count"],
+            )
+
+
+def get_watchdog(hass: HomeAssistant) -> LoopWatchdog:
+    """Return the watchdog shared by all config entries."""
+    if DATA_WATCHDOG not in hass.data:
+        hass.data[DATA_WATCHDOG] = LoopWatchdog(hass)
+    return hass.data[DATA_WATCHDOG]
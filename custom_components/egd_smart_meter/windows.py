@@ -0,0 +1,88 @@
+"""Request window planning for the quarter-hour data API."""
+
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+
+from .const import PAGE_SIZE
+
+SLOT_SECONDS = 15 * 60
+
+
+def slots_in_day(day: date, time_zone: tzinfo | None = None) -> int:
+    """Return the number of quarter-hours in a day.
+
+    UTC days always have 96 slots; local days have 92 or 100 on DST changes.
+    """
+    if time_zone is None:
+        return 96
+    start = datetime.combine(day, time.min, time_zone).astimezone(UTC)
+    end = datetime.combine(day + timedelta(days=1), time.min, time_zone).astimezone(UTC)
+    return int((end - start).total_seconds()) // SLOT_SECONDS
+
+
+def day_span(
+    start_date: date,
+    end_date: date,
+    time_zone: tzinfo | None = None,
+) -> tuple[datetime, datetime]:
+    """Return the UTC start and exclusive end of the days ``[start_date, end_date]``.
+
+    Days are local to ``time_zone``, so a DST change yields a 23 or 25 hour
+    day; without a time zone they are UTC days.
+    """
+    zone = time_zone or UTC
+    start = datetime.combine(start_date, time.min, zone).astimezone(UTC)
+    end = datetime.combine(end_date + timedelta(days=1), time.min, zone).astimezone(UTC)
+    return start, end
+
+
+def covering_days(
+    start_date: date,
+    end_date: date,
+    time_zone: tzinfo | None = None,
+) -> tuple[date, date]:
+    """Return the first and last day local to ``time_zone`` that cover UTC days.
+
+    The result spans every hour of the UTC days ``[start_date, end_date]``; in a
+    zone east of UTC that takes the local day after ``end_date`` as well.
+    """
+    start, end = day_span(start_date, end_date)
+    zone = time_zone or UTC
+    return start.astimezone(zone).date(), (end - timedelta(microseconds=1)).astimezone(zone).date()
+
+
+def local_today(time_zone: tzinfo | None = None) -> date:
+    """Return the current date in ``time_zone``, or the system date without one."""
+    if time_zone is None:
+        return date.today()
+    return datetime.now(time_zone).date()
+
+
+def plan_windows(
+    start_date: date,
+    end_date: date,
+    page_size: int = PAGE_SIZE,
+    time_zone: tzinfo | None = None,
+) -> list[tuple[date, date]]:
+    """Pack consecutive days into windows that each fit a single page.
+
+    Each request covers one profile, so a window holds as many whole days as
+    their exact slot counts allow without exceeding ``page_size``. A day that
+    alone exceeds the page size still gets its own window.
+    """
+    windows: list[tuple[date, date]] = []
+    window_start = start_date
+    window_slots = 0
+    day = start_date
+
+    while day <= end_date:
+        slots = slots_in_day(day, time_zone)
+        if window_slots and window_slots + slots > page_size:
+            windows.append((window_start, day - timedelta(days=1)))
+            window_start = day
+            window_slots = 0
+        window_slots += slots
+        day += timedelta(days=1)
+
+    if window_slots:
+        windows.append((window_start, end_date))
+    return windows
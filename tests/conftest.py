@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from aiohttp import ClientSession
@@ -17,6 +17,7 @@ def mock_aiohttp_response():
         response.json = AsyncMock(return_value=json_data)
         response.text = AsyncMock(return_value="")
         return response
+
     return _make_response
 
 
@@ -28,6 +29,17 @@ def mock_client_session(mock_aiohttp_response):
     return session
 
 
+@pytest.fixture
+def store(request):
+    """Patch HA's Store in the module named by the test module's ``STORE_MODULE``."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    store.async_save = AsyncMock()
+    store.async_remove = AsyncMock()
+    with patch(f"{request.module.STORE_MODULE}.Store", return_value=store):
+        yield store
+
+
 @pytest.fixture
 def mock_hass():
     hass = MagicMock()
@@ -1,15 +1,25 @@
+import asyncio
+import json
 from datetime import date, datetime, timedelta
 from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
 
 import pytest
 
 from custom_components.egd_smart_meter.api import (
+    EGDApiError,
     EGDAuthError,
     EGDClient,
     MeasurementData,
+    parse_body,
 )
 
 
+def _parsed(page):
+    """A page as the data request returns it once decoded and parsed."""
+    return parse_body(json.dumps(page).encode())
+
+
 class TestEGDClient:
     @pytest.fixture
     def client(self):
@@ -54,7 +64,7 @@ class TestEGDClient:
         ]
 
         with patch.object(client, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_response
+            mock_request.return_value = _parsed(mock_response)
             results = await client.get_consumption_data(
                 ean="859182400100366666",
                 start_date=date(2023, 3, 1),
@@ -92,7 +102,7 @@ class TestEGDClient:
         ]
 
         with patch.object(client, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_response
+            mock_request.return_value = _parsed(mock_response)
             results = await client.get_consumption_data(
                 ean="859182400100366666",
                 start_date=date(2023, 3, 1),
@@ -142,7 +152,7 @@ class TestEGDClient:
             call_count += 1
             if call_count == 1:
                 raise EGDAuthError("Token expired")
-            return mock_response
+            return _parsed(mock_response)
 
         with (
             patch.object(client, "_request", side_effect=mock_request),
@@ -208,9 +218,9 @@ class TestEGDClient:
             call_count += 1
             page_start = kwargs.get("params", {}).get("PageStart", 0)
             if page_start == 0:
-                return mock_response_page1
+                return _parsed(mock_response_page1)
             else:
-                return mock_response_page2
+                return _parsed(mock_response_page2)
 
         with patch.object(client, "_request", side_effect=mock_request):
             results = await client.get_consumption_data(
@@ -269,6 +279,70 @@ class TestEGDClient:
         assert results[0].value == 1.0
         assert results[1].value == 2.0
 
+    @pytest.mark.asyncio
+    async def test_request_covers_local_day(self, client):
+        client.time_zone = ZoneInfo("Europe/Prague")
+
+        with patch.object(client, "_request", new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = _parsed([])
+            await client.get_consumption_data(
+                "859182400100366666", date(2023, 3, 26), date(2023, 3, 26)
+            )
+
+        assert mock_request.call_args.kwargs["parse"] is parse_body
+        params = mock_request.call_args.kwargs["params"]
+        assert params["from"] == "2023-03-25T23:00:00.000Z"
+        assert params["to"] == "2023-03-26T21:59:59.999Z"
+        assert mock_request.call_args.kwargs["size"] == 92
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_fetch(self, client):
+        page = [{"total": 1, "data": [{"timestamp": "2023-03-01T00:00:00.000Z", "value": 1.0}]}]
+
+        async def slow_request(*args, **kwargs):
+            await asyncio.sleep(0)
+            return _parsed(page)
+
+        with patch.object(client, "_request", side_effect=slow_request) as mock_request:
+            first, second = await asyncio.gather(
+                client.get_consumption_data(
+                    "859182400100366666", date(2023, 3, 1), date(2023, 3, 1)
+                ),
+                client.get_consumption_data(
+                    "859182400100366666", date(2023, 3, 1), date(2023, 3, 1)
+                ),
+            )
+            assert mock_request.await_count == 1
+            assert first == second
+            assert first is not second
+
+            # Finalised days are served from the cache afterwards
+            await client.get_consumption_data(
+                "859182400100366666", date(2023, 3, 1), date(2023, 3, 1)
+            )
+            assert mock_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_recent_days_and_errors_are_not_cached(self, client):
+        yesterday = date.today() - timedelta(days=1)
+
+        with patch.object(client, "_request", new_callable=AsyncMock) as mock_request:
+            mock_request.side_effect = EGDApiError("down")
+            with pytest.raises(EGDApiError):
+                await client.get_consumption_data(
+                    "859182400100366666", date(2023, 3, 1), date(2023, 3, 1)
+                )
+
+            mock_request.side_effect = None
+            mock_request.return_value = _parsed([])
+            await client.get_consumption_data(
+                "859182400100366666", date(2023, 3, 1), date(2023, 3, 1)
+            )
+            await client.get_consumption_data("859182400100366666", yesterday, yesterday)
+            await client.get_consumption_data("859182400100366666", yesterday, yesterday)
+
+        assert mock_request.await_count == 4
+
 
 class TestDataClasses:
     def test_measurement_data_creation(self):
@@ -0,0 +1,147 @@
+"""Tests for the memory-mapped quarter-hour archive."""
+
+import math
+from datetime import UTC, date, datetime
+
+import pytest
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.archive import (
+    SlotArchive,
+    decode_status,
+    encode_status,
+)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = SlotArchive(tmp_path, "859182400100366666", "ICC1")
+    yield archive
+    archive.close()
+
+
+class TestSlotArchive:
+    def test_status_round_trip(self):
+        assert decode_status(encode_status("IU012")) == "IU012"
+        assert decode_status(encode_status("IU140")) == "IU140"
+        assert decode_status(encode_status("W")) == "UNKNOWN"
+        assert decode_status(0) is None
+
+    def test_write_and_point_lookup(self, archive):
+        archive.write(
+            [
+                MeasurementData(datetime(2023, 3, 1, 0, 45), 0.125, "IU012"),
+                MeasurementData(datetime(2023, 3, 2, 23, 45), None, "IU011"),
+            ]
+        )
+
+        assert archive.base_day == date(2023, 3, 1)
+        assert archive.get(datetime(2023, 3, 1, 0, 45)) == (0.125, "IU012")
+        assert archive.get(datetime(2023, 3, 2, 23, 45)) == (None, "IU011")
+        assert archive.get(datetime(2023, 3, 1, 1, 0)) == (None, None)
+        assert archive.get(datetime(2024, 1, 1)) == (None, None)
+
+    def test_aware_timestamps_map_to_utc_slots(self, archive):
+        archive.write([MeasurementData(datetime(2023, 3, 1, 10, 0, tzinfo=UTC), 1.0, "IU012")])
+
+        assert archive.index_of(datetime(2023, 3, 1, 10, 0)) == 40
+        assert archive.timestamp_of(40) == datetime(2023, 3, 1, 10, 0)
+
+    def test_rebase_keeps_existing_slots(self, archive):
+        archive.write([MeasurementData(datetime(2023, 3, 2, 0, 0), 2.0, "IU012")])
+        archive.write([MeasurementData(datetime(2023, 2, 28, 0, 0), 1.0, "IU012")])
+
+        assert archive.base_day == date(2023, 2, 28)
+        assert archive.get(datetime(2023, 3, 2, 0, 0)) == (2.0, "IU012")
+        assert archive.get(datetime(2023, 2, 28, 0, 0)) == (1.0, "IU012")
+
+    def test_read_range_is_zero_copy_view(self, archive):
+        archive.write(
+            [
+                MeasurementData(datetime(2023, 3, 1, 0, 0), 0.5, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 15), 0.25, "IU012"),
+            ]
+        )
+
+        values, statuses = archive.read_range(datetime(2023, 3, 1), datetime(2023, 3, 1, 1, 0))
+        assert isinstance(values, memoryview)
+        assert values.format == "f"
+        assert list(values) == [0.5, 0.25, 0.0, 0.0]
+        assert list(statuses) == [12, 12, 0, 0]
+        values.release()
+        statuses.release()
+
+    def test_reopen_persists_data(self, tmp_path):
+        archive = SlotArchive(tmp_path, "ean", "ICC1")
+        archive.write([MeasurementData(datetime(2023, 3, 1, 12, 0), 0.75, "IU012")])
+        archive.close()
+
+        reopened = SlotArchive(tmp_path, "ean", "ICC1")
+        value, status = reopened.get(datetime(2023, 3, 1, 12, 0))
+        reopened.close()
+
+        assert math.isclose(value, 0.75)
+        assert status == "IU012"
+
+    def test_sum_range_uses_prefix_index(self, archive):
+        archive.write(
+            [
+                MeasurementData(datetime(2023, 3, 1, 0, 0), 0.5, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 15), 0.25, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 30), 9.0, "IU011"),
+                MeasurementData(datetime(2023, 3, 2, 12, 0), 1.0, "IU012"),
+            ]
+        )
+
+        assert archive.sum_range(datetime(2023, 3, 1), datetime(2023, 3, 2)) == 0.75
+        assert archive.sum_range(datetime(2023, 3, 1, 0, 15), datetime(2023, 3, 1, 1)) == 0.25
+        assert archive.sum_range(datetime(2023, 2, 1), datetime(2024, 1, 1)) == 1.75
+
+        # Late insert before existing data shifts the running totals
+        archive.write([MeasurementData(datetime(2023, 2, 28, 23, 45), 2.0, "IU012")])
+        assert archive.sum_range(datetime(2023, 2, 1), datetime(2024, 1, 1)) == 3.75
+        assert archive.sum_range(datetime(2023, 3, 2), datetime(2023, 3, 3)) == 1.0
+
+    def test_valid_slot_without_value_does_not_poison_index(self, archive):
+        archive.write(
+            [
+                MeasurementData(datetime(2023, 3, 1, 0, 0), 1.0, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 15), None, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 30), 2.0, "IU012"),
+                MeasurementData(datetime(2023, 3, 2, 0, 0), 4.0, "IU012"),
+            ]
+        )
+
+        assert archive.sum_range(datetime(2023, 3, 1), datetime(2023, 3, 2)) == 3.0
+        assert archive.sum_range(datetime(2023, 3, 2), datetime(2023, 3, 3)) == 4.0
+
+    def test_coverage_range_counts_archived_slots(self, archive):
+        archive.write(
+            [
+                MeasurementData(datetime(2023, 3, 1, 0, 0), 0.5, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 15), None, "IU011"),
+            ]
+        )
+
+        assert archive.coverage_range(datetime(2023, 3, 1), datetime(2023, 3, 1, 1)) == 0.5
+        assert archive.coverage_range(datetime(2023, 2, 28, 23), datetime(2023, 3, 1)) == 0.0
+        assert archive.coverage_range(datetime(2023, 3, 1), datetime(2023, 3, 1)) == 0.0
+
+        # A rebase and a reopen keep the running count in step
+        archive.write([MeasurementData(datetime(2023, 2, 28, 23, 45), 0.5, "IU012")])
+        archive.close()
+        assert archive.coverage_range(datetime(2023, 2, 28, 23), datetime(2023, 3, 1, 1)) == 0.375
+
+    def test_read_records_skips_empty_slots(self, archive):
+        archive.write(
+            [
+                MeasurementData(datetime(2023, 3, 1, 0, 15), 0.5, "IU012"),
+                MeasurementData(datetime(2023, 3, 1, 0, 45), None, "IU021"),
+            ]
+        )
+
+        assert archive.read_records(datetime(2023, 3, 1), datetime(2023, 3, 1, 1)) == [
+            MeasurementData(datetime(2023, 3, 1, 0, 15), 0.5, "IU012"),
+            MeasurementData(datetime(2023, 3, 1, 0, 45), None, "IU021"),
+        ]
+        assert archive.read_records(datetime(2023, 3, 5), datetime(2023, 3, 6)) == []
@@ -0,0 +1,240 @@
+"""Tests for the resumable backfill job."""
+
+import asyncio
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import (
+    BatchChunk,
+    EGDApiError,
+    EGDCircuitOpenError,
+    MeasurementData,
+)
+from custom_components.egd_smart_meter.backfill import (
+    BackfillCheckpoint,
+    BackfillJob,
+    BackfillState,
+)
+
+STORE_MODULE = "custom_components.egd_smart_meter.backfill"
+
+
+class FakeApi:
+    time_zone = None
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = []
+
+    async def iter_consumption_data_batch(self, ean, start_date, end_date):
+        self.calls.append(start_date)
+        for chunk in self.chunks:
+            if chunk.start_date >= start_date:
+                yield chunk
+
+
+def _chunk(start, end, value=1.0):
+    return BatchChunk(
+        start, end, [MeasurementData(datetime.combine(start, datetime.min.time()), value, "IU012")]
+    )
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = MagicMock()
+    coordinator.ean = "859182400100366666"
+    coordinator.statistic_id = "egd_smart_meter:859182400100366666_consumption"
+    coordinator.sum_statistic_ids = [coordinator.statistic_id]
+    coordinator.net_statistic_ids = {}
+    coordinator._archive_data = AsyncMock()
+    coordinator._async_last_sum = AsyncMock(return_value=0.0)
+    coordinator._async_adjust_sum = AsyncMock()
+
+    async def import_statistics(records, start_date, base_sums):
+        base_sum = base_sums.get(coordinator.statistic_id, 0.0)
+        return {coordinator.statistic_id: base_sum + sum(item.value for item in records)}
+
+    coordinator._import_hourly_statistics = AsyncMock(side_effect=import_statistics)
+    coordinator._async_fetch_production = AsyncMock(return_value=[])
+    coordinator._import_net_statistics = AsyncMock(return_value={})
+    coordinator.async_settle_statistics = AsyncMock()
+    return coordinator
+
+
+@pytest.fixture
+def hass():
+    hass = MagicMock()
+    hass.async_create_background_task = lambda coro, name: asyncio.create_task(coro)
+    return hass
+
+
+class TestBackfill:
+    def test_checkpoint_round_trip(self):
+        checkpoint = BackfillCheckpoint(date(2023, 1, 1), date(2023, 3, 31), date(2023, 2, 1))
+        checkpoint.base_sums = {"egd_smart_meter:859182400100366666_consumption": 12.5}
+        checkpoint.old_end_sums = {"egd_smart_meter:859182400100366666_consumption": 3.0}
+
+        assert BackfillCheckpoint.from_dict(checkpoint.as_dict()) == checkpoint
+
+    @pytest.mark.asyncio
+    async def test_runs_chunks_and_checkpoints(self, hass, coordinator, store):
+        coordinator.api = FakeApi(
+            [
+                _chunk(date(2023, 1, 1), date(2023, 1, 31), 2.0),
+                _chunk(date(2023, 2, 1), date(2023, 2, 28), 3.0),
+            ]
+        )
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_start(date(2023, 1, 1), date(2023, 2, 28), throttle=0)
+        await job._task
+
+        assert job.state == BackfillState.DONE
+        saved = [call.args[0] for call in store.async_save.call_args_list]
+        assert [data["next_date"] for data in saved] == [
+            "2023-01-01",
+            "2023-02-01",
+            "2023-03-01",
+            "2023-03-01",
+        ]
+        assert saved[-1]["base_sums"] == {coordinator.statistic_id: 5.0}
+        assert saved[-1]["shifted"]
+        # Once per chunk before its checkpoint, and once after the shift
+        assert coordinator.async_settle_statistics.await_count == 3
+        store.async_remove.assert_awaited()
+        coordinator._async_adjust_sum.assert_awaited_once()
+        assert coordinator._async_adjust_sum.call_args.args[1] == 5.0
+        assert job.progress["percent"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_resume_continues_from_checkpoint(self, hass, coordinator, store):
+        checkpoint = BackfillCheckpoint(
+            date(2023, 1, 1),
+            date(2023, 2, 28),
+            date(2023, 2, 1),
+            throttle=0,
+            base_sums={coordinator.statistic_id: 2.0},
+            old_end_sums={coordinator.statistic_id: 0.0},
+        )
+        store.async_load.return_value = checkpoint.as_dict()
+        coordinator.api = FakeApi(
+            [
+                _chunk(date(2023, 1, 1), date(2023, 1, 31), 2.0),
+                _chunk(date(2023, 2, 1), date(2023, 2, 28), 3.0),
+            ]
+        )
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_resume()
+        await job._task
+
+        assert coordinator.api.calls == [date(2023, 2, 1)]
+        assert coordinator._import_hourly_statistics.await_count == 1
+        assert job.progress["records"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resume_after_shift_does_not_shift_again(self, hass, coordinator, store):
+        checkpoint = BackfillCheckpoint(
+            date(2023, 1, 1),
+            date(2023, 1, 31),
+            date(2023, 2, 1),
+            base_sums={coordinator.statistic_id: 2.0},
+            old_end_sums={coordinator.statistic_id: 0.0},
+            shifted=True,
+        )
+        store.async_load.return_value = checkpoint.as_dict()
+        coordinator.api = FakeApi([])
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_resume()
+        await job._task
+
+        assert job.state == BackfillState.DONE
+        coordinator._async_adjust_sum.assert_not_awaited()
+        store.async_remove.assert_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_fails_and_keeps_checkpoint(self, hass, coordinator, store):
+        coordinator._archive_data.side_effect = RuntimeError("disk gone")
+        coordinator.api = FakeApi([_chunk(date(2023, 1, 1), date(2023, 1, 31))])
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_start(date(2023, 1, 1), date(2023, 1, 31), throttle=0)
+        await job._task
+
+        assert job.state == BackfillState.FAILED
+        store.async_remove.assert_not_awaited()
+        coordinator.statistics_writer.async_flush.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_window_is_queued_and_skipped(self, hass, coordinator, store):
+        error = EGDApiError("down")
+        coordinator.retry_queue.async_add = AsyncMock()
+        coordinator.api = FakeApi(
+            [
+                BatchChunk(date(2023, 1, 1), date(2023, 1, 31), [], error),
+                _chunk(date(2023, 2, 1), date(2023, 2, 28), 3.0),
+            ]
+        )
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_start(date(2023, 1, 1), date(2023, 2, 28), throttle=0)
+        await job._task
+
+        assert job.state == BackfillState.DONE
+        coordinator.retry_queue.async_add.assert_awaited_once_with(
+            date(2023, 1, 1), date(2023, 1, 31), error
+        )
+        assert coordinator._async_adjust_sum.call_args.args[1] == 3.0
+
+    @pytest.mark.asyncio
+    async def test_net_statistics_follow_production_windows(self, hass, coordinator, store):
+        net_id = "egd_smart_meter:859182400100366666_net_export"
+        error = EGDApiError("production down")
+        coordinator.net_statistic_ids = {"net_export": net_id}
+        coordinator.retry_queue.async_add = AsyncMock()
+        coordinator._async_fetch_production.side_effect = [
+            [MeasurementData(datetime(2023, 1, 1), 1.0, "IU012")],
+            error,
+        ]
+
+        async def import_net(start, end, base_sums):
+            return {net_id: base_sums.get(net_id, 0.0) + 1.0}
+
+        coordinator._import_net_statistics.side_effect = import_net
+        coordinator.api = FakeApi(
+            [
+                _chunk(date(2023, 1, 1), date(2023, 1, 31), 2.0),
+                _chunk(date(2023, 2, 1), date(2023, 2, 28), 3.0),
+            ]
+        )
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_start(date(2023, 1, 1), date(2023, 2, 28), throttle=0)
+        await job._task
+
+        coordinator._import_net_statistics.assert_awaited_once()
+        coordinator.retry_queue.async_add.assert_awaited_once_with(
+            date(2023, 2, 1), date(2023, 2, 28), error
+        )
+        adjusted = {call.args[2]: call.args[1] for call in coordinator._async_adjust_sum.mock_calls}
+        assert adjusted == {coordinator.statistic_id: 5.0, net_id: 1.0}
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_pauses_and_cancel_forgets(self, hass, coordinator, store):
+        coordinator.api = FakeApi(
+            [BatchChunk(date(2023, 1, 1), date(2023, 1, 31), [], EGDCircuitOpenError("open"))]
+        )
+        job = BackfillJob(hass, coordinator)
+
+        await job.async_start(date(2023, 1, 1), date(2023, 1, 31), throttle=0)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert job.state == BackfillState.WAITING
+
+        await job.async_cancel()
+        assert job.state == BackfillState.CANCELLED
+        store.async_remove.assert_awaited()
+        coordinator._import_hourly_statistics.assert_not_awaited()
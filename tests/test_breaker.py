@@ -0,0 +1,95 @@
+"""Tests for the EGD API circuit breaker."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.egd_smart_meter.api import EGDCircuitOpenError, EGDClient
+from custom_components.egd_smart_meter.breaker import (
+    _BREAKERS,
+    CircuitBreaker,
+    CircuitState,
+    get_breaker,
+)
+from custom_components.egd_smart_meter.const import BASE_URL_DATA
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("data.example", failure_threshold=3, recovery_timeout=60, clock=clock)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self, breaker):
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+    def test_half_open_allows_single_probe(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now += 60
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request()
+
+    def test_failed_probe_doubles_timeout(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now += 60
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.retry_in == 120
+        clock.now += 119
+        assert breaker.state == CircuitState.OPEN
+
+    def test_breaker_is_shared_per_host(self):
+        assert get_breaker(f"{BASE_URL_DATA}/spotreby") is get_breaker(BASE_URL_DATA)
+        assert get_breaker(BASE_URL_DATA) is not get_breaker("https://idm.distribuce24.cz")
+
+    @pytest.mark.asyncio
+    async def test_client_fails_fast_while_open(self):
+        client = EGDClient("test_client_id", "test_client_secret")
+        client._access_token = "token"
+        client._token_expires = datetime.now() + timedelta(hours=1)
+        breaker = get_breaker(BASE_URL_DATA)
+        try:
+            breaker._state = CircuitState.OPEN
+            breaker._opened_at = float("inf")
+
+            with pytest.raises(EGDCircuitOpenError, match="retrying in"):
+                await client._request("GET", f"{BASE_URL_DATA}/spotreby")
+
+            # Half-open with the probe already out
+            breaker._opened_at = float("-inf")
+            assert breaker.allow_request()
+            with pytest.raises(EGDCircuitOpenError, match="probe is in progress"):
+                await client._request("GET", f"{BASE_URL_DATA}/spotreby")
+        finally:
+            _BREAKERS.clear()
+            await client.close()
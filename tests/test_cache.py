@@ -0,0 +1,26 @@
+"""Tests for the TTL LRU cache."""
+
+from custom_components.egd_smart_meter.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = TTLCache(4, 10, clock=lambda: now[0])
+        cache.put("a", 1)
+
+        assert cache.get("a") == 1
+        now[0] = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(2, 60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
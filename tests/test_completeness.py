@@ -0,0 +1,63 @@
+"""Tests for the per-day completeness index."""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.completeness import FULL_DAY, CompletenessIndex
+
+STORE_MODULE = "custom_components.egd_smart_meter.completeness"
+
+DAY = date(2023, 3, 1)
+
+
+def _day(day, status="IU012"):
+    start = datetime.combine(day, datetime.min.time())
+    return [
+        MeasurementData(start + timedelta(minutes=15 * slot), 0.1, status) for slot in range(96)
+    ]
+
+
+@pytest.fixture
+def index(store):
+    return CompletenessIndex(MagicMock(), "859182400100366666", "ICC1")
+
+
+class TestCompletenessIndex:
+    def test_masks_track_present_and_valid_slots(self, index):
+        records = _day(DAY)
+        records[5] = MeasurementData(records[5].timestamp, 0.1, "IU021")
+        del records[10]
+
+        assert index.update(records)
+        present, valid = index.day(DAY)
+        assert present == FULL_DAY & ~(1 << 10)
+        assert valid == present & ~(1 << 5)
+
+        # A revised reading turns the provisional slot valid
+        assert index.update([MeasurementData(records[5].timestamp, 0.2, "IU012")])
+        assert index.day(DAY)[1] == FULL_DAY & ~(1 << 10)
+        assert not index.update([MeasurementData(records[5].timestamp, 0.2, "IU012")])
+
+    def test_incomplete_days_and_summary(self, index):
+        index.update(_day(DAY) + _day(DAY + timedelta(days=1), "IU021"))
+
+        # The third day was never archived, so a re-check would not fill it in
+        assert index.incomplete_days(DAY, DAY + timedelta(days=2)) == [DAY + timedelta(days=1)]
+        summary = index.summary(DAY + timedelta(days=2), days=3)
+        assert summary["days_complete"] == 1
+        assert summary["valid_slots"] == 96
+        assert summary["provisional_slots"] == 96
+        assert summary["missing_slots"] == 96
+        assert summary["incomplete_days"] == ["2023-03-02", "2023-03-03"]
+
+    async def test_round_trip_through_store(self, index, store):
+        index.update(_day(DAY)[:4])
+        store.async_load.return_value = index._data_to_save()
+
+        loaded = CompletenessIndex(MagicMock(), "859182400100366666", "ICC1")
+        await loaded.async_load()
+
+        assert loaded.day(DAY) == (0b1111, 0b1111)
@@ -0,0 +1,247 @@
+"""Tests for statistics bookkeeping of the coordinator."""
+
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.coordinator import EGDCoordinator
+from custom_components.egd_smart_meter.corrections import HourCorrection
+from custom_components.egd_smart_meter.statistics_writer import RecorderApi, StatisticsWriter
+
+EAN = "859182400100366666"
+NOW = datetime(2024, 6, 10, tzinfo=UTC)
+
+
+class FakeRecorder:
+    """Hourly sum rows per statistic, served like the recorder's statistics API."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, list[dict]] = {}
+
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+    def statistics_during_period(self, hass, start, end, statistic_ids, *args):
+        return {
+            statistic_id: [
+                row
+                for row in self.rows.get(statistic_id, [])
+                if start.timestamp() <= row["start"] < end.timestamp()
+            ]
+            for statistic_id in statistic_ids
+        }
+
+    def get_last_statistics(self, hass, number_of_stats, statistic_id, *args):
+        return {statistic_id: self.rows.get(statistic_id, [])[-number_of_stats:]}
+
+    def add(self, statistic_id: str, start: datetime, total: float) -> None:
+        self.rows.setdefault(statistic_id, []).append({"start": start.timestamp(), "sum": total})
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def recorder():
+    return FakeRecorder()
+
+
+@pytest.fixture
+def coordinator(hass, recorder):
+    client = MagicMock()
+    client.get_consumption_data = AsyncMock(return_value=[])
+    coordinator = EGDCoordinator(hass, "client", "secret", EAN, client=client)
+    coordinator.statistics_writer._recorder = RecorderApi(
+        lambda hass: recorder,
+        recorder.statistics_during_period,
+        MagicMock(),
+        recorder.get_last_statistics,
+    )
+    return coordinator
+
+
+@pytest.fixture
+def writer(coordinator):
+    """A mocked writer that records every queued write in order."""
+    writer = MagicMock(spec=StatisticsWriter)
+    writer.recorder = coordinator.statistics_writer.recorder
+    coordinator.statistics_writer = writer
+    return writer
+
+
+def _writes(writer):
+    return [entry for entry in writer.mock_calls if entry[0] in ("async_add", "async_adjust")]
+
+
+def _quarters(start: datetime, values: list[float]) -> list[MeasurementData]:
+    # Naive UTC timestamps, as parsed from the API
+    start = start.replace(tzinfo=None)
+    return [
+        MeasurementData(start + timedelta(minutes=15 * index), value, "IU012")
+        for index, value in enumerate(values)
+    ]
+
+
+class TestLastSum:
+    async def test_reads_last_row_of_lookback_window(self, coordinator, recorder):
+        recorder.add(coordinator.statistic_id, NOW - timedelta(days=3), 10.0)
+        recorder.add(coordinator.statistic_id, NOW - timedelta(days=1), 12.0)
+        recorder.add(coordinator.statistic_id, NOW + timedelta(days=1), 14.0)
+
+        assert await coordinator._async_last_sum(coordinator.statistic_id, NOW) == 12.0
+
+    async def test_falls_back_to_newest_row_beyond_lookback(self, coordinator, recorder):
+        recorder.add(coordinator.statistic_id, NOW - timedelta(days=45), 120.0)
+
+        assert await coordinator._async_last_sum(coordinator.statistic_id, NOW) == 120.0
+
+    async def test_falls_back_to_full_history_before_a_gap(self, coordinator, recorder):
+        recorder.add(coordinator.statistic_id, NOW - timedelta(days=90), 80.0)
+        recorder.add(coordinator.statistic_id, NOW + timedelta(days=5), 95.0)
+
+        assert await coordinator._async_last_sum(coordinator.statistic_id, NOW) == 80.0
+
+    async def test_starts_from_zero_without_rows(self, coordinator):
+        assert await coordinator._async_last_sum(coordinator.statistic_id, NOW) == 0.0
+
+
+class TestApplyCorrections:
+    async def test_adjusts_every_hour_and_adds_rows_for_new_hours(self, coordinator, writer):
+        statistic_id = coordinator.statistic_id
+        hours = [NOW + timedelta(hours=hour) for hour in (1, 3, 5)]
+        corrections = [
+            HourCorrection(hours[0], delta=0.5, total=1.5, had_valid=True),
+            HourCorrection(hours[1], delta=1.0, total=1.0, had_valid=False),
+            HourCorrection(hours[2], delta=0.25, total=0.25, had_valid=False),
+        ]
+        # Sums before the hours without a row, read before any change
+        previous_sums = {(statistic_id, hours[1]): 10.0, (statistic_id, hours[2]): 12.0}
+
+        await coordinator._async_apply_corrections(corrections, previous_sums)
+
+        metadata = coordinator._statistics_meta[statistic_id]
+        assert _writes(writer) == [
+            call.async_adjust(statistic_id, hours[0], 0.5, "kWh"),
+            call.async_adjust(statistic_id, hours[1], 1.0, "kWh"),
+            call.async_adjust(statistic_id, hours[2], 0.25, "kWh"),
+            # New rows carry every correction up to them; adjustments skip them
+            call.async_add(
+                metadata,
+                [
+                    {"start": hours[1], "sum": 11.5, "state": 11.5},
+                    {"start": hours[2], "sum": 13.75, "state": 13.75},
+                ],
+            ),
+        ]
+
+
+class TestImportWindow:
+    async def test_window_continues_sum_and_shifts_later_rows(self, coordinator, writer, recorder):
+        statistic_id = coordinator.statistic_id
+        # 2024-06-10 in Prague is 06-09 22:00Z to 06-10 22:00Z
+        recorder.add(statistic_id, datetime(2024, 6, 9, 21, tzinfo=UTC), 100.0)
+        recorder.add(statistic_id, datetime(2024, 6, 10, 21, tzinfo=UTC), 103.0)
+        first = datetime(2024, 6, 10, 8, tzinfo=UTC)
+        data = _quarters(first, [0.25] * 4 + [0.75] * 4)
+
+        await coordinator._async_import_window(data, date(2024, 6, 10), date(2024, 6, 10))
+
+        writes = _writes(writer)
+        assert writes[0] == call.async_add(
+            coordinator._statistics_meta[statistic_id],
+            [
+                {"start": first, "sum": 101.0, "state": 101.0},
+                {"start": first + timedelta(hours=1), "sum": 104.0, "state": 104.0},
+            ],
+        )
+        assert writes[1][1][0] == coordinator._statistics_meta[coordinator.power_statistic_id]
+        assert writes[2:] == [
+            call.async_adjust(statistic_id, datetime(2024, 6, 10, 22, tzinfo=UTC), 1.0, "kWh")
+        ]
+
+    async def test_net_statistics_are_rebuilt_with_the_window(self, coordinator, writer, recorder):
+        net_id = coordinator.net_statistic_ids["net_consumption"]
+        recorder.add(net_id, datetime(2024, 6, 9, 21, tzinfo=UTC), 50.0)
+        recorder.add(net_id, datetime(2024, 6, 10, 21, tzinfo=UTC), 50.5)
+        first = datetime(2024, 6, 10, 8, tzinfo=UTC)
+        coordinator.api.get_consumption_data.return_value = _quarters(first, [0.25] * 4)
+
+        await coordinator._async_import_window(
+            _quarters(first, [0.5] * 4), date(2024, 6, 10), date(2024, 6, 10)
+        )
+
+        writes = _writes(writer)
+        assert (
+            call.async_add(
+                coordinator._statistics_meta[net_id],
+                [{"start": first, "sum": 51.0, "state": 51.0}],
+            )
+            in writes
+        )
+        assert (
+            call.async_adjust(net_id, datetime(2024, 6, 10, 22, tzinfo=UTC), 0.5, "kWh") in writes
+        )
+
+
+class TestArchiveData:
+    async def test_failed_write_leaves_indexes_alone(self, coordinator):
+        day = datetime(2024, 6, 9, tzinfo=UTC)
+        coordinator.archives["ICC1"].write = MagicMock(side_effect=OSError("disk full"))
+        coordinator.peaks.async_update = AsyncMock()
+
+        await coordinator._archive_data("ICC1", _quarters(day, [0.25] * 96))
+
+        assert coordinator.completeness["ICC1"].day(day.date()) == (0, 0)
+        coordinator.peaks.async_update.assert_not_awaited()
+
+
+class TestRecheck:
+    async def test_corrections_rebuild_net_statistics(self, coordinator, writer, recorder):
+        net_id = coordinator.net_statistic_ids["net_consumption"]
+        day = datetime(2024, 6, 9, tzinfo=UTC)
+        stored = _quarters(day, [0.25] * 96)
+        stored[40] = MeasurementData(stored[40].timestamp, 0.1, "IU021")
+        await coordinator._archive_data("ICC1", stored)
+        await coordinator._archive_data("ISC1", _quarters(day, [0.0] * 96))
+        recorder.add(net_id, day + timedelta(hours=9), 10.0)
+        recorder.add(net_id, day + timedelta(hours=23), 23.75)
+        revised = _quarters(day, [0.25] * 96)
+        revised[40] = MeasurementData(revised[40].timestamp, 0.5, "IU012")
+        coordinator.api.get_consumption_data.return_value = revised
+
+        await coordinator._async_recheck_corrections(date(2024, 6, 10))
+
+        net_rows = [
+            entry[1][1]
+            for entry in _writes(writer)
+            if entry[0] == "async_add" and entry[1][0]["statistic_id"] == net_id
+        ]
+        assert net_rows[0][0] == {"start": day + timedelta(hours=10), "sum": 11.25, "state": 11.25}
+        assert call.async_adjust(net_id, day + timedelta(days=1), 0.5, "kWh") in _writes(writer)
+
+    async def test_hole_late_in_a_utc_day_is_refetched(self, coordinator, writer):
+        day = datetime(2024, 6, 9, tzinfo=UTC)
+        stored = _quarters(day, [0.25] * 96)
+        del stored[92]
+        await coordinator._archive_data("ICC1", stored)
+        # 06-09 and 06-10 in Prague run from 06-08 22:00 to 06-10 22:00 UTC
+        revised = _quarters(day - timedelta(hours=2), [0.25] * 192)
+        revised[100] = MeasurementData(revised[100].timestamp, 0.5, "IU012")
+        coordinator.api.get_consumption_data.return_value = revised
+
+        await coordinator._async_recheck_corrections(date(2024, 6, 10))
+
+        coordinator.api.get_consumption_data.assert_awaited_once_with(
+            EAN, date(2024, 6, 9), date(2024, 6, 10)
+        )
+        assert _writes(writer)[0] == call.async_adjust(
+            coordinator.statistic_id, day + timedelta(hours=23), 0.5, "kWh"
+        )
+        assert coordinator.completeness["ICC1"].incomplete_days(day.date(), day.date()) == []
@@ -0,0 +1,80 @@
+"""Tests for late-correction detection."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.archive import SlotArchive
+from custom_components.egd_smart_meter.corrections import find_corrections
+from custom_components.egd_smart_meter.tariff import TariffSchedule, parse_windows
+
+
+def _day(day, value=0.25, status="IU012"):
+    start = datetime(2023, 3, day)
+    return [
+        MeasurementData(start + timedelta(minutes=15 * slot), value, status) for slot in range(96)
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = SlotArchive(tmp_path, "859182400100366666", "ICC1")
+    yield archive
+    archive.close()
+
+
+class TestFindCorrections:
+    def test_unchanged_days_are_skipped(self, archive):
+        archive.write(_day(1) + _day(2))
+
+        changed, corrections = find_corrections(archive, _day(1) + _day(2))
+
+        assert changed == []
+        assert corrections == []
+
+    def test_only_revised_hours_are_reported(self, archive):
+        stored = _day(1)
+        stored[8] = MeasurementData(stored[8].timestamp, 0.5, "IU011")
+        stored[9] = MeasurementData(stored[9].timestamp, None, "IU011")
+        stored[10] = MeasurementData(stored[10].timestamp, None, "IU011")
+        stored[11] = MeasurementData(stored[11].timestamp, None, "IU011")
+        archive.write(stored)
+
+        fetched = _day(1)
+        fetched[40] = MeasurementData(fetched[40].timestamp, 0.75, "IU012")
+
+        changed, corrections = find_corrections(archive, fetched)
+
+        assert [item.timestamp.hour for item in changed] == [2, 2, 2, 2, 10]
+        assert [correction.start for correction in corrections] == [
+            datetime(2023, 3, 1, 2, tzinfo=UTC),
+            datetime(2023, 3, 1, 10, tzinfo=UTC),
+        ]
+        hour_two, hour_ten = corrections
+        assert hour_two.delta == 1.0
+        assert hour_two.total == 1.0
+        assert not hour_two.had_valid
+        assert hour_ten.delta == 0.5
+        assert hour_ten.total == 1.5
+        assert hour_ten.had_valid
+
+    def test_days_not_in_archive_are_ignored(self, archive):
+        archive.write(_day(1))
+
+        changed, corrections = find_corrections(archive, _day(5, value=1.0))
+
+        assert changed == []
+        assert corrections == []
+
+    def test_cost_delta_uses_slot_rates(self, archive):
+        archive.write(_day(1))
+        fetched = _day(1)
+        # 04:45 UTC is 05:45 local (low rate), 05:00 UTC is 06:00 local (high rate)
+        fetched[19] = MeasurementData(fetched[19].timestamp, 1.25, "IU012")
+        fetched[20] = MeasurementData(fetched[20].timestamp, 1.25, "IU012")
+        tariff = TariffSchedule(4.0, 2.0, parse_windows("22:00-06:00"), "Europe/Prague")
+
+        _, corrections = find_corrections(archive, fetched, tariff)
+
+        assert [correction.cost_delta for correction in corrections] == [2.0, 4.0]
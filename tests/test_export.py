@@ -0,0 +1,75 @@
+"""Tests for streaming data export."""
+
+import csv
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import BatchChunk, EGDApiError, MeasurementData
+from custom_components.egd_smart_meter.export import async_export_data
+
+
+class FakeClient:
+    """Client yielding pre-built chunks instead of calling the API."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def iter_consumption_data_batch(self, ean, start_date, end_date, profile):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.fixture
+def hass():
+    hass = MagicMock()
+
+    async def run_job(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = run_job
+    return hass
+
+
+class TestExport:
+    @pytest.mark.asyncio
+    async def test_csv_export_streams_chunks(self, hass, tmp_path):
+        chunks = [
+            BatchChunk(
+                date(2023, 1, 1),
+                date(2023, 1, 31),
+                [MeasurementData(datetime(2023, 1, 1, 0, 15), 0.25, "IU012")],
+            ),
+            BatchChunk(date(2023, 2, 1), date(2023, 2, 28), [], EGDApiError("boom")),
+            BatchChunk(
+                date(2023, 3, 1),
+                date(2023, 3, 31),
+                [MeasurementData(datetime(2023, 3, 1, 0, 0), None, "IU011")],
+            ),
+        ]
+        path = tmp_path / "out" / "export.csv"
+
+        result = await async_export_data(
+            hass,
+            FakeClient(chunks),
+            "859182400100366666",
+            "ICC1",
+            date(2023, 1, 1),
+            date(2023, 3, 31),
+            path,
+            "csv",
+        )
+
+        with path.open(encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+
+        assert rows[0] == ["timestamp", "ean", "profile", "value_kwh", "status"]
+        assert rows[1] == ["2023-01-01T00:15:00Z", "859182400100366666", "ICC1", "0.25", "IU012"]
+        assert rows[2] == ["2023-03-01T00:00:00Z", "859182400100366666", "ICC1", "", "IU011"]
+        assert result.records == 2
+        assert result.failed_windows == ["2023-02-01/2023-02-28"]
+
+        progress = [call.args[1] for call in hass.bus.async_fire.call_args_list]
+        assert [event["days_done"] for event in progress] == [31, 59, 90]
+        assert progress[-1]["days_total"] == 90
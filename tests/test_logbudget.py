@@ -0,0 +1,58 @@
+"""Tests for aggregated parse counters and rate-limited log samples."""
+
+import logging
+from datetime import date, timedelta
+
+from custom_components.egd_smart_meter.api import EGDClient
+from custom_components.egd_smart_meter.logbudget import LogLimiter, ParseStats
+
+
+class TestParseStats:
+    def test_merge_caps_samples(self):
+        job = ParseStats()
+        for index in range(5):
+            page = ParseStats(records=10, malformed=1, samples=[f"bad-{index}"])
+            page.by_status["IU012"] = 10
+            job.merge(page)
+
+        assert job.records == 50
+        assert job.malformed == 5
+        assert job.by_status == {"IU012": 50}
+        assert job.samples == ["bad-0", "bad-1", "bad-2"]
+
+
+class TestLogLimiter:
+    def test_suppresses_within_interval(self):
+        now = [0.0]
+        limiter = LogLimiter(60, clock=lambda: now[0])
+
+        assert limiter.allow("ean") == 0
+        assert limiter.allow("ean") is None
+        assert limiter.allow("ean") is None
+        assert limiter.allow("other") == 0
+
+        now[0] = 61
+        assert limiter.allow("ean") == 2
+        assert limiter.allow("ean") is None
+
+
+async def test_batch_logs_one_summary_per_job(caplog):
+    client = EGDClient("id", "secret")
+    calls = 0
+
+    async def fake_get(ean, start_date, end_date, profile, stats):
+        nonlocal calls
+        calls += 1
+        stats.merge(ParseStats(records=96, malformed=1, samples=["x"]))
+        return []
+
+    client.get_consumption_data = fake_get
+    end = date.today() - timedelta(days=2)
+
+    with caplog.at_level(logging.INFO):
+        await client.get_consumption_data_batch("ean", end - timedelta(days=60), end)
+
+    infos = [r for r in caplog.records if r.levelno >= logging.INFO]
+    assert calls > 1
+    assert len(infos) == 1
+    assert f"{96 * calls} records" in infos[0].getMessage()
@@ -0,0 +1,56 @@
+"""Tests for the consumption/production merge-join."""
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.netmetering import merge_net
+
+START = datetime(2023, 6, 1, 10)
+HOUR = datetime(2023, 6, 1, 10, tzinfo=UTC)
+
+
+def _series(values, status="IU012"):
+    return [
+        MeasurementData(START + timedelta(minutes=15 * slot), value, status)
+        for slot, value in enumerate(values)
+        if value is not ...
+    ]
+
+
+class TestMergeNet:
+    def test_nets_each_quarter_hour(self):
+        consumption = _series([1.0, 0.5, 0.25, 0.0])
+        production = _series([0.25, 0.5, 1.0, 0.5])
+
+        net = merge_net(consumption, production)
+
+        assert net.net_consumption == {HOUR: 0.75}
+        assert net.net_export == {HOUR: 1.25}
+        assert net.self_consumption == {HOUR: 1.0}
+
+    def test_missing_side_counts_as_zero(self):
+        consumption = _series([1.0, ..., 0.5, ...])
+        production = _series([..., 0.25, ..., ...])
+
+        net = merge_net(consumption, production)
+
+        assert net.net_consumption == {HOUR: 1.5}
+        assert net.net_export == {HOUR: 0.25}
+        assert net.self_consumption == {HOUR: 0.0}
+
+    def test_invalid_status_skips_the_slot(self):
+        consumption = _series([1.0, 1.0])
+        production = _series([0.5]) + [MeasurementData(START + timedelta(minutes=15), 5.0, "IU021")]
+
+        net = merge_net(consumption, production)
+
+        assert net.net_consumption == {HOUR: 0.5}
+        assert net.net_export == {HOUR: 0.0}
+        assert net.self_consumption == {HOUR: 0.5}
+
+    def test_hours_are_split(self):
+        consumption = _series([0.25] * 8)
+
+        net = merge_net(consumption, [])
+
+        assert net.net_consumption == {HOUR: 1.0, HOUR + timedelta(hours=1): 1.0}
@@ -0,0 +1,104 @@
+"""Tests for offloading parsing and aggregation off the event loop."""
+
+import asyncio
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import (
+    MeasurementData,
+    parse_body,
+    parse_measurements,
+)
+from custom_components.egd_smart_meter.importer import aggregate_hourly, power_rows
+from custom_components.egd_smart_meter.offload import Offloader
+
+PAGE = [
+    {
+        "total": 3,
+        "data": [
+            {"timestamp": "2023-01-01T00:00:00.000Z", "value": 2.0, "status": "IU012"},
+            {"timestamp": "2023-01-01T00:15:00.000Z", "value": 4.0, "status": "IU012"},
+            {"timestamp": "not-a-timestamp", "value": 1.0, "status": "IU012"},
+        ],
+    }
+]
+
+
+@pytest.fixture
+def hass():
+    hass = MagicMock()
+    hass.async_add_executor_job = AsyncMock(side_effect=lambda func, *args: func(*args))
+    return hass
+
+
+class TestOffload:
+    def test_parse_measurements(self):
+        records, total, stats = parse_measurements(PAGE)
+
+        assert total == 3
+        assert [record.value for record in records] == [0.5, 1.0]
+        assert stats.malformed == 1
+        assert stats.samples == ["not-a-timestamp"]
+        assert stats.by_status == {"IU012": 2}
+
+    def test_parse_body_decodes_and_parses_in_one_call(self):
+        records, total, _ = parse_body(json.dumps(PAGE).encode())
+
+        assert total == 3
+        assert len(records) == 2
+        with pytest.raises(ValueError):
+            parse_body(b'{"error": "maintenance"}')
+        with pytest.raises(ValueError):
+            parse_body(b"<html>")
+
+    def test_aggregate_hourly(self):
+        records = [
+            MeasurementData(datetime(2023, 1, 1, 0, 15), 0.5, "IU012"),
+            MeasurementData(datetime(2023, 1, 1, 0, 30), 0.25, "IU012"),
+            MeasurementData(datetime(2023, 1, 1, 1, 0), 9.0, "IU021"),
+        ]
+
+        assert aggregate_hourly(records).energy == {datetime(2023, 1, 1, tzinfo=UTC): 0.75}
+
+    def test_power_rows_from_same_pass(self):
+        records = [
+            MeasurementData(datetime(2023, 1, 1, 0, 0), 0.5, "IU012"),
+            MeasurementData(datetime(2023, 1, 1, 0, 15), 0.25, "IU012"),
+            MeasurementData(datetime(2023, 1, 1, 0, 30), 1.0, "IU012"),
+            MeasurementData(datetime(2023, 1, 1, 0, 45), 9.0, "IU021"),
+        ]
+
+        assert power_rows(aggregate_hourly(records)) == [
+            {"start": datetime(2023, 1, 1, tzinfo=UTC), "mean": 7 / 3, "min": 1.0, "max": 4.0}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_small_work_stays_inline(self, hass):
+        offloader = Offloader(hass, threshold=100)
+
+        assert await offloader.run(10, sum, [1, 2]) == 3
+        hass.async_add_executor_job.assert_not_awaited()
+
+        assert await offloader.run(100, sum, [1, 2]) == 3
+        hass.async_add_executor_job.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self, hass):
+        hass.loop = asyncio.get_running_loop()
+        offloader = Offloader(hass, threshold=0, process_pool=True)
+        try:
+            # The worker gets the raw body and decodes it along with the parse
+            records, total, _ = await offloader.run(3, parse_body, json.dumps(PAGE).encode())
+            start_method = offloader._pool._mp_context.get_start_method()
+            aggregate = await offloader.run(2, aggregate_hourly, records)
+        finally:
+            offloader.shutdown()
+
+        assert start_method in ("forkserver", "spawn")
+        assert total == 3
+        assert len(records) == 2
+        assert aggregate.energy == {datetime(2023, 1, 1, tzinfo=UTC): 1.5}
+        hass.async_add_executor_job.assert_not_awaited()
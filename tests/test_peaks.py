@@ -0,0 +1,63 @@
+"""Tests for the monthly peak-demand tracker."""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.peaks import PeakTracker
+
+STORE_MODULE = "custom_components.egd_smart_meter.peaks"
+
+
+def _reading(timestamp, kwh, status="IU012"):
+    return MeasurementData(timestamp, kwh, status)
+
+
+class TestPeakTracker:
+    def test_keeps_top_k_per_month(self, store):
+        tracker = PeakTracker(MagicMock(), "859182400100366666", k=2)
+
+        tracker.update(
+            [
+                _reading(datetime(2023, 1, 10, 8), 1.0),
+                _reading(datetime(2023, 1, 10, 9), 2.0),
+                _reading(datetime(2023, 1, 10, 10), 0.5),
+                _reading(datetime(2023, 1, 10, 11), 3.0, "IU021"),
+                _reading(datetime(2023, 2, 1, 8), 0.25),
+            ]
+        )
+
+        assert tracker.months == ["2023-01", "2023-02"]
+        assert tracker.peaks("2023-01") == [
+            {"timestamp": "2023-01-10T09:00:00+00:00", "kw": 8.0},
+            {"timestamp": "2023-01-10T08:00:00+00:00", "kw": 4.0},
+        ]
+        assert tracker.peak("2023-02") == 1.0
+
+    def test_months_follow_local_time(self, store):
+        tracker = PeakTracker(MagicMock(), "859182400100366666", "Europe/Prague")
+
+        tracker.update([_reading(datetime(2023, 1, 31, 23, 30), 1.0)])
+
+        assert tracker.months == ["2023-02"]
+
+    def test_refetched_slot_replaces_its_value(self, store):
+        tracker = PeakTracker(MagicMock(), "859182400100366666", k=2)
+        tracker.update([_reading(datetime(2023, 1, 10, 8), 1.0)])
+
+        assert not tracker.update([_reading(datetime(2023, 1, 10, 8), 1.0)])
+        assert tracker.update([_reading(datetime(2023, 1, 10, 8), 1.5)])
+        assert tracker.peaks("2023-01") == [{"timestamp": "2023-01-10T08:00:00+00:00", "kw": 6.0}]
+
+    @pytest.mark.asyncio
+    async def test_persists_and_restores(self, store):
+        tracker = PeakTracker(MagicMock(), "859182400100366666")
+        await tracker.async_update([_reading(datetime(2023, 1, 10, 8), 1.0)])
+
+        store.async_load.return_value = store.async_save.call_args.args[0]
+        restored = PeakTracker(MagicMock(), "859182400100366666")
+        await restored.async_load()
+
+        assert restored.peak("2023-01") == 4.0
@@ -0,0 +1,96 @@
+"""Tests for the persistent retry queue of failed windows."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import EGDApiError
+from custom_components.egd_smart_meter.breaker import CircuitState
+from custom_components.egd_smart_meter.const import RETRY_BASE_DELAY, RETRY_MAX_ATTEMPTS
+from custom_components.egd_smart_meter.retry_queue import RetryQueue, RetryWindow, retry_delay
+
+STORE_MODULE = "custom_components.egd_smart_meter.retry_queue"
+
+JAN = (date(2023, 1, 1), date(2023, 1, 31))
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = MagicMock()
+    coordinator.ean = "859182400100366666"
+    coordinator.backfill.running = False
+    coordinator.api.breaker.state = CircuitState.CLOSED
+    coordinator.api.get_consumption_data = AsyncMock(return_value=["record"])
+    coordinator._async_import_window = AsyncMock()
+    coordinator.async_settle_statistics = AsyncMock()
+    return coordinator
+
+
+@pytest.fixture
+def clock():
+    return [1000.0]
+
+
+@pytest.fixture
+def queue(coordinator, store, clock):
+    return RetryQueue(MagicMock(), coordinator, clock=lambda: clock[0])
+
+
+class TestRetryQueue:
+    def test_window_round_trip(self):
+        window = RetryWindow(*JAN, attempts=2, next_try=5.0, error="down")
+
+        assert RetryWindow.from_dict(window.as_dict()) == window
+
+    def test_backoff_doubles_up_to_cap(self):
+        assert retry_delay(1) == RETRY_BASE_DELAY
+        assert retry_delay(3) == 4 * RETRY_BASE_DELAY
+        assert retry_delay(30) == 86400
+
+    async def test_add_persists_once(self, queue, store):
+        await queue.async_add(*JAN, EGDApiError("down"))
+        await queue.async_add(*JAN, EGDApiError("again"))
+
+        assert len(queue.windows) == 1
+        assert queue.windows[0].next_try == 1000.0 + RETRY_BASE_DELAY
+        store.async_save.assert_awaited_once()
+
+    async def test_drain_waits_for_next_try(self, queue, coordinator, clock):
+        await queue.async_add(*JAN, EGDApiError("down"))
+
+        await queue.async_drain()
+        coordinator.api.get_consumption_data.assert_not_awaited()
+
+        clock[0] += RETRY_BASE_DELAY
+        await queue.async_drain()
+        coordinator._async_import_window.assert_awaited_once_with(["record"], *JAN)
+        coordinator.async_settle_statistics.assert_awaited_once()
+        assert queue.windows == []
+
+    async def test_drain_skipped_while_busy(self, queue, coordinator, clock):
+        await queue.async_add(*JAN, EGDApiError("down"))
+        clock[0] += RETRY_BASE_DELAY
+
+        coordinator.backfill.running = True
+        await queue.async_drain()
+        coordinator.backfill.running = False
+        coordinator.api.breaker.state = CircuitState.OPEN
+        await queue.async_drain()
+
+        coordinator.api.get_consumption_data.assert_not_awaited()
+
+    async def test_failure_backs_off_then_gives_up(self, queue, coordinator, clock):
+        coordinator.api.get_consumption_data.side_effect = EGDApiError("down")
+        await queue.async_add(*JAN, EGDApiError("down"))
+
+        clock[0] += RETRY_BASE_DELAY
+        await queue.async_drain()
+        assert queue.windows[0].attempts == 2
+        assert queue.windows[0].next_try == clock[0] + 2 * RETRY_BASE_DELAY
+
+        queue.windows[0].attempts = RETRY_MAX_ATTEMPTS - 1
+        clock[0] += 86400
+        await queue.async_drain()
+        assert queue.windows == []
+        coordinator._async_import_window.assert_not_awaited()
@@ -0,0 +1,125 @@
+"""Tests for the coalescing statistics writer."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.statistics_writer import RecorderApi, StatisticsWriter
+
+START = datetime(2023, 1, 1, tzinfo=UTC)
+
+
+def _meta(statistic_id):
+    return {"statistic_id": statistic_id}
+
+
+def _rows(first, count):
+    return [
+        {"start": START + timedelta(hours=hour), "sum": float(hour)}
+        for hour in range(first, first + count)
+    ]
+
+
+@pytest.fixture
+async def writer():
+    hass = MagicMock()
+    hass.loop = asyncio.get_running_loop()
+    writer = StatisticsWriter(hass, delay=0.01, batch_size=3, max_pending=10)
+    writer.calls = []
+    writer._import = lambda metadata, rows: writer.calls.append(
+        ("import", metadata["statistic_id"], [row["start"].hour for row in rows])
+    )
+    writer._adjust = lambda statistic_id, start, adjustment, unit: writer.calls.append(
+        ("adjust", statistic_id, adjustment)
+    )
+    return writer
+
+
+class TestStatisticsWriter:
+    async def test_rows_are_coalesced_and_batched(self, writer):
+        writer.async_add(_meta("a"), _rows(0, 2))
+        writer.async_add(_meta("b"), _rows(0, 1))
+        writer.async_add(_meta("a"), _rows(1, 3))
+        assert writer.calls == []
+
+        await asyncio.sleep(0.05)
+
+        assert writer.calls == [
+            ("import", "a", [0, 1, 2]),
+            ("import", "a", [3]),
+            ("import", "b", [0]),
+        ]
+
+    async def test_adjustment_follows_earlier_rows(self, writer):
+        writer.async_add(_meta("a"), _rows(0, 1))
+        writer.async_adjust("a", START, 2.0, "kWh")
+        writer.async_add(_meta("a"), _rows(1, 1))
+        writer.async_flush()
+
+        assert writer.calls == [
+            ("import", "a", [0]),
+            ("adjust", "a", 2.0),
+            ("import", "a", [1]),
+        ]
+
+    async def test_flushes_early_when_too_much_is_pending(self, writer):
+        writer.async_add(_meta("a"), _rows(0, 10))
+
+        assert len(writer.calls) == 4
+        assert writer._timer is None
+
+    async def test_rows_queued_after_adjustments_are_not_shifted(self, writer):
+        # Corrections shift existing rows first, then add rows that already hold the shift
+        writer.async_adjust("a", START, 0.5, "kWh")
+        writer.async_adjust("a", START + timedelta(hours=2), 1.0, "kWh")
+        writer.async_add(_meta("a"), _rows(2, 1))
+        writer.async_flush()
+
+        assert writer.calls == [
+            ("adjust", "a", 0.5),
+            ("adjust", "a", 1.0),
+            ("import", "a", [2]),
+        ]
+
+    async def test_settle_hands_over_one_statistic_and_drains_recorder(self, writer):
+        instance = MagicMock()
+        instance.async_block_till_done = AsyncMock()
+        writer._recorder = RecorderApi(lambda hass: instance, None, None, None)
+        writer.async_add(_meta("a"), _rows(0, 2))
+        writer.async_add(_meta("b"), _rows(0, 1))
+
+        await writer.async_settle("a")
+
+        assert writer.calls == [("import", "a", [0, 1])]
+        assert list(writer._pending) == ["b"]
+        instance.async_block_till_done.assert_awaited_once()
+
+        # Nothing new was written for "a", and "c" was never written
+        await writer.async_settle("a")
+        await writer.async_settle("c")
+        instance.async_block_till_done.assert_awaited_once()
+
+    async def test_settle_several_statistics_drains_once(self, writer):
+        instance = MagicMock()
+        instance.async_block_till_done = AsyncMock()
+        writer._recorder = RecorderApi(lambda hass: instance, None, None, None)
+        writer.async_add(_meta("a"), _rows(0, 2))
+        writer.async_add(_meta("b"), _rows(0, 1))
+
+        await writer.async_settle("a", "b")
+
+        assert writer.calls == [("import", "a", [0, 1]), ("import", "b", [0])]
+        instance.async_block_till_done.assert_awaited_once()
+
+    async def test_rows_written_twice_are_counted_once(self, writer):
+        instance = MagicMock()
+        instance.async_block_till_done = AsyncMock()
+        writer._recorder = RecorderApi(lambda hass: instance, None, None, None)
+        writer.async_add(_meta("a"), _rows(0, 3))
+        writer.async_add(_meta("a"), _rows(1, 3))
+        assert writer._pending_rows == 4
+
+        await writer.async_settle("a")
+        assert writer._pending_rows == 0
@@ -0,0 +1,71 @@
+"""Tests for the time-of-use tariff cost engine."""
+
+from datetime import UTC, date, datetime, time
+
+import pytest
+
+from custom_components.egd_smart_meter.api import MeasurementData
+from custom_components.egd_smart_meter.importer import aggregate_hourly, cumulative_rows
+from custom_components.egd_smart_meter.tariff import (
+    TariffSchedule,
+    parse_windows,
+    schedule_from_options,
+)
+
+SCHEDULE = TariffSchedule(
+    high_price=4.0,
+    low_price=2.0,
+    low_windows=parse_windows("22:00-06:00, 13:00-14:00"),
+    time_zone="Europe/Prague",
+)
+
+
+class TestTariff:
+    def test_parse_windows(self):
+        assert parse_windows("22:00-06:00, 13:00-14:00") == (
+            (time(22), time(6)),
+            (time(13), time(14)),
+        )
+        assert parse_windows("") == ()
+        with pytest.raises(ValueError):
+            parse_windows("22:00")
+
+    def test_rate_table_is_local_time(self):
+        # CET is UTC+1 in January: local 06:00 is 05:00 UTC
+        winter = SCHEDULE.rate_table(date(2023, 1, 10))
+        assert winter[4 * 4] == 2.0
+        assert winter[5 * 4] == 4.0
+        assert winter[12 * 4] == 2.0
+        assert winter[21 * 4] == 2.0
+
+        # CEST is UTC+2 in July: local 06:00 is 04:00 UTC
+        summer = SCHEDULE.rate_table(date(2023, 7, 10))
+        assert summer[4 * 4] == 4.0
+        assert summer[11 * 4] == 2.0
+        assert summer[20 * 4] == 2.0
+
+    def test_cost_is_priced_in_the_import_pass(self):
+        records = [
+            MeasurementData(datetime(2023, 1, 10, 4, 45), 1.0, "IU012"),
+            MeasurementData(datetime(2023, 1, 10, 5, 0), 1.0, "IU012"),
+            MeasurementData(datetime(2023, 1, 10, 5, 15), 0.5, "IU012"),
+            MeasurementData(datetime(2023, 1, 10, 5, 30), 9.0, "IU021"),
+        ]
+
+        aggregate = aggregate_hourly(records, SCHEDULE)
+
+        hour_4 = datetime(2023, 1, 10, 4, tzinfo=UTC)
+        hour_5 = datetime(2023, 1, 10, 5, tzinfo=UTC)
+        assert aggregate.energy == {hour_4: 1.0, hour_5: 1.5}
+        assert aggregate.cost == {hour_4: 2.0, hour_5: 6.0}
+
+        rows, final_sum = cumulative_rows(aggregate.cost, 10.0)
+        assert [row["sum"] for row in rows] == [12.0, 18.0]
+        assert final_sum == 18.0
+
+    def test_schedule_from_options(self):
+        assert schedule_from_options({}, "Europe/Prague") is None
+
+        schedule = schedule_from_options({"tariff_high_price": 4.0}, "Europe/Prague")
+        assert schedule.low_price == 4.0
+        assert schedule.low_windows == ()
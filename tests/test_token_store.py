@@ -0,0 +1,59 @@
+"""Tests for the persisted OAuth token cache."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter.api import EGDClient
+from custom_components.egd_smart_meter.token_store import EGDTokenStore
+
+STORE_MODULE = "custom_components.egd_smart_meter.token_store"
+
+
+def _client(secret="test_client_secret"):
+    return EGDClient("test_client_id", secret)
+
+
+class TestTokenStore:
+    @pytest.mark.asyncio
+    async def test_round_trip_is_encrypted(self, store):
+        client = _client()
+        expires = datetime.now().replace(microsecond=0) + timedelta(days=30)
+        client.set_token("secret-token", expires)
+        await EGDTokenStore(MagicMock()).async_save(client)
+
+        saved = store.async_save.call_args.args[0]
+        assert "secret-token" not in str(saved)
+
+        store.async_load.return_value = saved
+        restored = _client()
+        assert await EGDTokenStore(MagicMock()).async_restore(restored)
+        assert restored.access_token == "secret-token"
+        assert restored.token_expires == expires
+
+    @pytest.mark.asyncio
+    async def test_expired_or_foreign_token_is_ignored(self, store):
+        client = _client()
+        client.set_token("secret-token", datetime.now() + timedelta(days=30))
+        await EGDTokenStore(MagicMock()).async_save(client)
+        store.async_load.return_value = store.async_save.call_args.args[0]
+
+        other_secret = _client("rotated_secret")
+        assert not await EGDTokenStore(MagicMock()).async_restore(other_secret)
+        assert other_secret.access_token is None
+
+        client.set_token("secret-token", datetime.now() + timedelta(seconds=10))
+        await EGDTokenStore(MagicMock()).async_save(client)
+        store.async_load.return_value = store.async_save.call_args.args[0]
+        assert not await EGDTokenStore(MagicMock()).async_restore(_client())
+
+    @pytest.mark.asyncio
+    async def test_attach_persists_new_tokens(self, store):
+        hass = MagicMock()
+        client = _client()
+        await EGDTokenStore(hass).async_attach(client)
+
+        client.token_callback()
+        hass.async_create_task.assert_called_once()
+        hass.async_create_task.call_args.args[0].close()
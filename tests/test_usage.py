@@ -0,0 +1,43 @@
+"""Tests for range aggregate bucketing."""
+
+from datetime import UTC, datetime
+from zoneinfo import ZoneInfo
+
+from custom_components.egd_smart_meter.usage import bucket_bounds
+
+PRAGUE = ZoneInfo("Europe/Prague")
+
+
+class TestBucketBounds:
+    def test_daily_buckets_follow_local_midnight_across_dst(self):
+        bounds = bucket_bounds(
+            datetime(2023, 3, 25, tzinfo=PRAGUE),
+            datetime(2023, 3, 27, tzinfo=PRAGUE),
+            "day",
+            PRAGUE,
+        )
+
+        assert len(bounds) == 2
+        start, end = bounds[1]
+        assert (end.astimezone(UTC) - start.astimezone(UTC)).total_seconds() == 23 * 3600
+
+    def test_month_buckets_are_clipped_to_range(self):
+        bounds = bucket_bounds(
+            datetime(2023, 1, 15, tzinfo=PRAGUE),
+            datetime(2023, 3, 10, tzinfo=PRAGUE),
+            "month",
+            PRAGUE,
+        )
+
+        assert [(start.month, start.day) for start, _ in bounds] == [(1, 15), (2, 1), (3, 1)]
+        assert bounds[-1][1] == datetime(2023, 3, 10, tzinfo=PRAGUE)
+
+    def test_week_buckets_start_on_monday(self):
+        bounds = bucket_bounds(
+            datetime(2023, 3, 1, tzinfo=PRAGUE),
+            datetime(2023, 3, 14, tzinfo=PRAGUE),
+            "week",
+            PRAGUE,
+        )
+
+        assert [start.day for start, _ in bounds] == [1, 6, 13]
@@ -0,0 +1,61 @@
+"""Tests for the event-loop lag watchdog."""
+
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.egd_smart_meter import watchdog as watchdog_module
+from custom_components.egd_smart_meter.watchdog import LoopWatchdog, blocking, stage, staged
+
+
+@pytest.fixture
+def watchdog():
+    watchdog = LoopWatchdog(MagicMock(), threshold=0.1)
+    watchdog_module._WATCHDOG = watchdog
+    yield watchdog
+    watchdog_module._WATCHDOG = None
+
+
+class TestWatchdog:
+    def test_lag_is_attributed_to_slowest_blocking_section(self, watchdog):
+        with stage("update"):
+            watchdog.record("update/parse_measurements", 0.02)
+            watchdog.record("update/peaks", 0.3)
+
+        watchdog.tick(0.35, now=10.0)
+
+        assert watchdog.blocks == 1
+        assert watchdog.last_block["stage"] == "update/peaks"
+        assert watchdog.by_stage == {"update/peaks": {"count": 1, "max_ms": 350.0}}
+
+    def test_lag_without_sections_names_active_stages(self, watchdog):
+        with stage("backfill"):
+            watchdog.tick(0.2, now=10.0)
+        watchdog.tick(0.2, now=11.0)
+        watchdog.tick(0.05, now=12.0)
+
+        assert list(watchdog.by_stage) == ["backfill", "unattributed"]
+        assert watchdog.blocks == 2
+        assert watchdog.recent_max_lag == 0.2
+
+    def test_warnings_are_rate_limited(self, watchdog, caplog):
+        caplog.set_level(logging.WARNING)
+        for now in (10.0, 20.0, 400.0):
+            watchdog.record("export", 0.5)
+            watchdog.tick(0.5, now=now)
+
+        assert len(caplog.records) == 2
+        assert watchdog.by_stage["export"]["count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_stages_nest_across_awaits(self, watchdog):
+        @staged("update")
+        async def update():
+            with stage("recheck"), blocking("compare"):
+                pass
+
+        await update()
+
+        assert list(watchdog._touched) == ["update/recheck/compare"]
+        assert not watchdog_module._ACTIVE_STAGES
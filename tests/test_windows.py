@@ -0,0 +1,76 @@
+"""Tests for request window planning."""
+
+from datetime import UTC, date, datetime
+from zoneinfo import ZoneInfo
+
+from custom_components.egd_smart_meter.windows import (
+    covering_days,
+    day_span,
+    plan_windows,
+    slots_in_day,
+)
+
+PRAGUE = ZoneInfo("Europe/Prague")
+
+
+class TestPlanWindows:
+    def test_slots_in_day_handles_dst(self):
+        assert slots_in_day(date(2023, 3, 26)) == 96
+        assert slots_in_day(date(2023, 3, 26), PRAGUE) == 92
+        assert slots_in_day(date(2023, 10, 29), PRAGUE) == 100
+        assert slots_in_day(date(2023, 7, 1), PRAGUE) == 96
+
+    def test_windows_pack_up_to_page_size(self):
+        windows = plan_windows(date(2023, 1, 1), date(2023, 3, 31))
+
+        assert windows == [
+            (date(2023, 1, 1), date(2023, 1, 31)),
+            (date(2023, 2, 1), date(2023, 3, 3)),
+            (date(2023, 3, 4), date(2023, 3, 31)),
+        ]
+        for start, end in windows:
+            assert ((end - start).days + 1) * 96 <= 3000
+
+    def test_dst_days_change_window_length(self):
+        # 31 days * 96 slots fill the page exactly; DST changes shift that
+        page_size = 31 * 96
+
+        windows = plan_windows(date(2023, 3, 1), date(2023, 4, 30), page_size, PRAGUE)
+        assert windows[0] == (date(2023, 3, 1), date(2023, 3, 31))
+
+        windows = plan_windows(date(2023, 10, 1), date(2023, 11, 30), page_size, PRAGUE)
+        assert windows[0] == (date(2023, 10, 1), date(2023, 10, 30))
+
+        windows = plan_windows(date(2023, 10, 1), date(2023, 11, 30), page_size)
+        assert windows[0] == (date(2023, 10, 1), date(2023, 10, 31))
+
+    def test_single_day_range(self):
+        assert plan_windows(date(2023, 5, 5), date(2023, 5, 5)) == [
+            (date(2023, 5, 5), date(2023, 5, 5))
+        ]
+
+    def test_day_span_covers_local_days(self):
+        assert day_span(date(2023, 7, 1), date(2023, 7, 1)) == (
+            datetime(2023, 7, 1, tzinfo=UTC),
+            datetime(2023, 7, 2, tzinfo=UTC),
+        )
+        assert day_span(date(2023, 7, 1), date(2023, 7, 1), PRAGUE) == (
+            datetime(2023, 6, 30, 22, tzinfo=UTC),
+            datetime(2023, 7, 1, 22, tzinfo=UTC),
+        )
+        # The autumn DST change makes a 25 hour day
+        assert day_span(date(2023, 10, 29), date(2023, 10, 29), PRAGUE) == (
+            datetime(2023, 10, 28, 22, tzinfo=UTC),
+            datetime(2023, 10, 29, 23, tzinfo=UTC),
+        )
+
+    def test_covering_days_span_whole_utc_days(self):
+        assert covering_days(date(2024, 6, 10), date(2024, 6, 12)) == (
+            date(2024, 6, 10),
+            date(2024, 6, 12),
+        )
+        # The last UTC hours of a day fall on the next day in Prague
+        assert covering_days(date(2024, 6, 10), date(2024, 6, 12), PRAGUE) == (
+            date(2024, 6, 10),
+            date(2024, 6, 13),
+        )